@@ -0,0 +1,66 @@
+"""
+Compare the task file codecs on large files.
+
+    uv run python -m benchmarks.bench_codec --sizes 10000 100000
+
+`legacy` is what Database did before: `json.load` + `Task(**task)` per task
+to read, `json.dump(indent=4)` of `model_dump()` dicts to write. `pretty`
+and `compact` validate/serialize the whole list with a pydantic TypeAdapter
+(`decode_tasks`/`encode_tasks`), with and without indentation.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DB_DIR", tempfile.gettempdir())
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from benchmarks.bench_storage import make_tasks  # noqa: E402
+from ramon.models import Task, decode_tasks, encode_tasks  # noqa: E402
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def legacy_write(tasks: list[Task]) -> bytes:
+    return json.dumps([task.model_dump() for task in tasks], ensure_ascii=False, indent=4).encode()
+
+
+def legacy_read(data: bytes) -> list[Task]:
+    return [Task(**task) for task in json.loads(data)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'codec':<9}{'tasks':>10}{'read ms':>11}{'write ms':>11}{'size KB':>10}")
+    for size in args.sizes:
+        tasks = make_tasks(size)
+        codecs = {
+            "legacy": (legacy_write, legacy_read),
+            "pretty": (lambda tasks: encode_tasks(tasks, indent=4), decode_tasks),
+            "compact": (lambda tasks: encode_tasks(tasks, indent=None), decode_tasks),
+        }
+        for name, (write, read) in codecs.items():
+            data = write(tasks)
+            assert read(data) == tasks
+            print(
+                f"{name:<9}{size:>10}{timed(lambda: read(data), args.repeat):>11.1f}"
+                f"{timed(lambda: write(tasks), args.repeat):>11.1f}{len(data) // 1024:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
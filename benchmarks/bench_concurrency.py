@@ -0,0 +1,69 @@
+"""
+Write throughput with several ramon processes sharing one DB_DIR.
+
+    uv run python -m benchmarks.bench_concurrency --processes 1 2 4 8
+
+Every process upserts its own tasks one `write_tasks` call at a time into a
+database seeded with `--seed` tasks; the run fails if any write is lost.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DB_DIR", tempfile.gettempdir())
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from benchmarks.bench_storage import make_tasks  # noqa: E402
+from ramon.models import Database  # noqa: E402
+
+
+def open_database(directory: Path, journal: bool) -> Database:
+    return Database(
+        tasks_file=directory / "tasks.json",
+        archived_tasks_file=directory / "archived_tasks.json",
+        journal=journal,
+        max_write_retries=1000,
+    )
+
+
+def writer(directory: Path, journal: bool, worker: int, writes: int) -> None:
+    database = open_database(directory, journal)
+    for i, task in enumerate(make_tasks(writes)):
+        database.write_tasks([task.model_copy(update={"id": f"w{worker}-{i}"})])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--writes", type=int, default=50, help="writes per process")
+    parser.add_argument("--seed", type=int, default=1_000)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("fork")
+    print(f"{'mode':<10}{'processes':>10}{'writes/s':>10}")
+    for journal in (False, True):
+        for count in args.processes:
+            with tempfile.TemporaryDirectory() as tmp:
+                directory = Path(tmp)
+                open_database(directory, journal=False).write_tasks(make_tasks(args.seed))
+                processes = [
+                    context.Process(target=writer, args=(directory, journal, worker, args.writes))
+                    for worker in range(count)
+                ]
+                start = time.perf_counter()
+                for process in processes:
+                    process.start()
+                for process in processes:
+                    process.join()
+                elapsed = time.perf_counter() - start
+                total = len(open_database(directory, journal).read_tasks())
+                assert total == args.seed + count * args.writes, f"lost {args.seed + count * args.writes - total} writes"
+                mode = "journal" if journal else "snapshot"
+                print(f"{mode:<10}{count:>10}{count * args.writes / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
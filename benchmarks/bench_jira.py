@@ -0,0 +1,140 @@
+"""
+Load `ramon.plugins.jira` against the local JIRA stand-in (`tests.jira_server`).
+
+    uv run python -m benchmarks.bench_jira --concurrency 1 4 16 --latency 0.02
+    uv run python -m benchmarks.bench_jira --error-rate 0.01 --rate-limit-rate 0.01
+
+Each run calls one operation `--calls` times from `--concurrency` threads
+sharing the pooled client, and reports calls per second, p50/p99 latency,
+failed calls, and the TCP connections the server saw. The issue cache is
+off unless `--cache` is given, so every call reaches the server:
+
+- status: `get_task_status_in_jira` of one issue
+- search: `get_jira_statuses` of `--batch` issues, paged by SEARCH_PAGE_SIZE
+- comments: `load_comments_for_jira_issue` of one issue
+- create: `create_issue_in_jira` of one task
+
+Note that the `jira` library waits at least 1s (up to 2 * Retry-After) before
+retrying a 429, so with `--rate-limit-rate` latencies jump accordingly.
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+os.environ.setdefault("DB_DIR", tempfile.gettempdir())
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from ramon.models import StatusEnum, Task  # noqa: E402
+from ramon.plugins import jira  # noqa: E402
+from tests.jira_server import JiraStandIn  # noqa: E402
+
+PROJECT = "LOAD"
+
+
+def operations(keys: list[str], batch: int) -> dict[str, Callable[[int], object]]:
+    def status(n: int) -> object:
+        return jira.get_task_status_in_jira(keys[n % len(keys)])
+
+    def search(n: int) -> object:
+        start = n * batch % len(keys)
+        return jira.get_jira_statuses((keys[start:] + keys[:start])[:batch])
+
+    def comments(n: int) -> object:
+        return jira.load_comments_for_jira_issue(keys[n % len(keys)])
+
+    def create(n: int) -> object:
+        task = Task(
+            id=f"bench-{n}", task=f"Benchmark task {n}", owner="User", priority="Medium",
+            description="Created by bench_jira", due_date="", completed_at="", metadata="",
+            status=StatusEnum.to_do,
+        )
+        ok, key = jira.create_issue_in_jira(PROJECT, task)
+        if not ok:
+            raise RuntimeError("create failed")
+        return key
+
+    return {"status": status, "search": search, "comments": comments, "create": create}
+
+
+def run(operation: Callable[[int], object], calls: int, concurrency: int) -> tuple[float, list[float], int]:
+    """Wall time, per-call latencies and failed calls of `calls` calls from `concurrency` threads."""
+
+    def timed(n: int) -> tuple[float, bool]:
+        start = time.perf_counter()
+        try:
+            operation(n)
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    # create_issue_in_jira prints every issue
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(concurrency) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(timed, range(calls)))
+        elapsed = time.perf_counter() - start
+    return elapsed, [latency for latency, _ in results], sum(not ok for _, ok in results)
+
+
+def percentile(values: list[float], p: float) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1] if len(values) > 1 else values[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--operations", nargs="+", default=["status", "search", "comments", "create"])
+    parser.add_argument("--calls", type=int, default=200, help="calls per run")
+    parser.add_argument("--issues", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=250, help="issues per search")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds the server adds to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--cache", action="store_true", help="keep the issue cache on")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = JiraStandIn(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    ).start()
+    keys = server.add_issues(PROJECT, args.issues, comments=5)
+    os.environ.update(JIRA_SERVER=server.url, JIRA_EMAIL="bench@example.com", JIRA_TOKEN="bench")
+    os.environ.setdefault("JIRA_POOL_SIZE", str(max(args.concurrency)))
+    if not args.cache:
+        jira.issue_cache.max_issues = 0
+
+    print(f"server latency {args.latency * 1000:.0f}ms, error rate {args.error_rate:.1%}, 429 rate {args.rate_limit_rate:.1%}")
+    print(f"{'operation':<10}{'threads':>8}{'calls/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'failed':>8}{'requests':>10}{'conns':>7}")
+    try:
+        for name in args.operations:
+            operation = operations(keys, args.batch)[name]
+            for concurrency in args.concurrency:
+                jira.close_jira_instances()
+                jira.issue_cache.clear()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    operation(0)  # open the client outside the timing
+                requests, connections = len(server.requests), server.connections
+                elapsed, latencies, failed = run(operation, args.calls, concurrency)
+                print(
+                    f"{name:<10}{concurrency:>8}{args.calls / elapsed:>10.1f}"
+                    f"{percentile(latencies, 50) * 1000:>9.1f}{percentile(latencies, 99) * 1000:>9.1f}"
+                    f"{failed:>8}{len(server.requests) - requests:>10}{server.connections - connections:>7}"
+                )
+    finally:
+        jira.close_jira_instances()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare the JSON and SQLite task engines as the database grows.
+
+    uv run python -m benchmarks.bench_storage --sizes 1000 10000 50000
+
+For every size it seeds a fresh database and reports the median time of a
+status filter (`read_tasks(status=[...])`), of a single-task upsert
+(`write_tasks([task])`) and of indexed lookups on a warm database
+(`get(id)` and `query(status=..., owner=...)`).
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# ramon.models reads DB_DIR at import time and the agent needs an API key to be
+# constructed, neither matters for these measurements.
+os.environ.setdefault("DB_DIR", tempfile.gettempdir())
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from ramon.models import Database, StatusEnum, Task  # noqa: E402
+
+# A fixed number of blocked tasks keeps the filter's result size constant, so
+# the timings only reflect how the engine scales with the database size.
+BLOCKED = 50
+STATUSES = [status for status in StatusEnum if status != StatusEnum.blocked]
+
+
+def make_tasks(count: int) -> list[Task]:
+    return [
+        Task(
+            id=f"t{i}",
+            task=f"Task number {i}",
+            owner=f"owner-{i % 25}",
+            priority="medium",
+            description="Lorem ipsum dolor sit amet " * 4,
+            due_date=f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            completed_at="",
+            metadata="",
+            status=StatusEnum.blocked if i < BLOCKED else STATUSES[i % len(STATUSES)],
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def make_database(engine: str, directory: Path, tasks: list[Task]) -> Database:
+    database = Database(
+        tasks_file=directory / "tasks.json",
+        archived_tasks_file=directory / "archived_tasks.json",
+        sqlite_file=directory / "tasks.db",
+        engine=engine,
+    )
+    database.write_tasks(tasks)
+    return database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'engine':<8}{'tasks':>10}{'filter ms':>12}{'upsert ms':>12}{'get ms':>10}{'query ms':>10}")
+    for size in args.sizes:
+        tasks = make_tasks(size)
+        for engine in ("json", "sqlite"):
+            with tempfile.TemporaryDirectory() as tmp:
+                database = make_database(engine, Path(tmp), tasks)
+                blocked = lambda: database.read_tasks(status=[StatusEnum.blocked])  # noqa: E731
+                upsert = lambda: database.write_tasks([tasks[size // 2].model_copy(update={"priority": "high"})])  # noqa: E731
+                get = lambda: database.get(f"t{size // 3}")  # noqa: E731
+                query = lambda: database.query(status=[StatusEnum.blocked], owner="owner-7")  # noqa: E731
+                print(
+                    f"{engine:<8}{size:>10}{timed(blocked, args.repeat):>12.2f}{timed(upsert, args.repeat):>12.2f}"
+                    f"{timed(get, args.repeat):>10.3f}{timed(query, args.repeat):>10.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
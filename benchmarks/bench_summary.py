@@ -0,0 +1,69 @@
+"""
+Time `summarize_tasks` on large task lists.
+
+    uv run python -m benchmarks.bench_summary --sizes 10000 100000
+
+`legacy` is what summarize_tasks did before: `datetime.strptime` on every
+due date and `+=` to build the output. `tasks` builds a `TaskColumns` from
+the task list on each call; `columns` reuses a snapshot, as `Database.columns`
+does while the cache is warm. Half of the due dates are in the future so the
+smart summary has priorities to list.
+"""
+import argparse
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("DB_DIR", tempfile.gettempdir())
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from benchmarks.bench_storage import make_tasks, timed  # noqa: E402
+from ramon.models import Task, TaskColumns, summarize_tasks  # noqa: E402
+
+
+def legacy_summarize(tasks: list[Task], smart: bool) -> str:
+    summary = ""
+    if smart:
+        today = datetime.now().date()
+        summary += "Immediate Priorities:\n"
+        for task in tasks:
+            if task.status == 'to_do' and datetime.strptime(task.due_date, '%Y-%m-%d').date() > today:
+                due_date = datetime.strptime(task.due_date, '%Y-%m-%d').strftime('%b %d, %Y')
+                summary += f"- {task.task}, due {due_date}\n"
+        summary += "\nRecurring Reminders:\nNone currently scheduled.\n"
+        summary += "\nContextual Relevance:\n"
+        for task in tasks:
+            if task.status == 'in_progress':
+                summary += f"- {task.task}, ongoing task.\n"
+    else:
+        for task in tasks:
+            summary += f"- {task.task} (ID: {task.id}, Owner: {task.owner}), due {task.due_date}\n"
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    today = date.today()
+    print(f"{'summary':<9}{'tasks':>10}{'legacy ms':>12}{'tasks ms':>11}{'columns ms':>13}")
+    for size in args.sizes:
+        tasks = [
+            task.model_copy(update={"due_date": (today + timedelta(days=i % 60 - 30)).isoformat()})
+            for i, task in enumerate(make_tasks(size))
+        ]
+        columns = TaskColumns(tasks)
+        for smart in (False, True):
+            assert summarize_tasks(columns, smart) == legacy_summarize(tasks, smart)
+            print(
+                f"{'smart' if smart else 'plain':<9}{size:>10}"
+                f"{timed(lambda: legacy_summarize(tasks, smart), args.repeat):>12.1f}"
+                f"{timed(lambda: summarize_tasks(tasks, smart), args.repeat):>11.1f}"
+                f"{timed(lambda: summarize_tasks(columns, smart), args.repeat):>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,81 @@
-from dataclasses import dataclass
-from pydantic_ai import Agent, RunContext
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from pydantic_ai import Agent, ModelRetry, RunContext
+from pydantic_ai.messages import Message
 from pathlib import Path
+from collections import Counter
 from nanoid import generate
 import datetime
-from .models import Task, Database, summarize_tasks
-import ramon.plugins.jira as jira_client
+import functools
+from .models import Task, Database
+from .prompt import TaskPromptBuilder
+from .tool_runner import ToolRunner
+import ramon.plugins.jira_async as jira_client
+from ramon.plugins.jira import IssueCacheInfo, _normalize_key, issue_cache
+from ramon.plugins.jira_mirror import JiraMirror
 import os
 
 @dataclass
 class JiraClient:
-    def create_ticket(self, project_key: str, task: Task) -> tuple[bool, str]:
-        return jira_client.create_issue_in_jira(project_key, task)
+    """
+    Async Jira access for the agent tools, see `ramon.plugins.jira_async`.
+    Lookups are answered from `mirror`, when given and fresh, and only the
+    issues missing from it are asked to Jira.
+    """
+
+    mirror: Optional[JiraMirror] = None
+
+    async def create_ticket(self, project_key: str, task: Task) -> tuple[bool, str]:
+        return await jira_client.create_issue_in_jira(project_key, task)
+
+    async def create_tickets(self, project_key: str, tasks: list[Task]) -> list[tuple[bool, str]]:
+        return await jira_client.create_issues_in_jira(project_key, tasks)
+
+    async def get_task_status(self, task_key: str) -> str:
+        if mirrored := self._mirrored([task_key], ['status']):
+            return next(iter(mirrored.values()))['status']
+        return await jira_client.get_task_status_in_jira(task_key)
+
+    async def get_task_assignee(self, task_key: str) -> str:
+        if mirrored := self._mirrored([task_key], ['assignee']):
+            return next(iter(mirrored.values()))['assignee']
+        return await jira_client.get_task_assignee_in_jira(task_key)
+
+    async def get_statuses(self, task_keys: list[str]) -> dict[str, str]:
+        mirrored = self._mirrored(task_keys, ['status'])
+        missing = [key for key in task_keys if _normalize_key(key) not in mirrored]
+        statuses = await jira_client.get_jira_statuses(missing) if missing else {}
+        for key, values in mirrored.items():
+            statuses[key] = values['status']
+        return {key: statuses[key] for key in map(_normalize_key, task_keys)}
+
+    async def get_issues(self, task_keys: list[str], fields: list[str] | None = None) -> dict[str, dict]:
+        mirrored = self._mirrored(task_keys, fields or ['status', 'assignee'])
+        missing = [key for key in task_keys if key.strip() and _normalize_key(key) not in mirrored]
+        issues = await jira_client.get_jira_issues(missing, fields) if missing else {}
+        issues.update(mirrored)
+        keys = dict.fromkeys(_normalize_key(key) for key in task_keys if key.strip())
+        return {key: issues[key] for key in keys if key in issues}
+
+    async def open_jira_issue(self, task_key: str) -> None:
+        return await jira_client.open_jira_issue(task_key)
 
-    def get_task_status(self, task_key: str) -> str:
-        return jira_client.get_task_status_in_jira(task_key)
+    async def load_comments_for_jira_issue(self, task_key: str, limit: int = 20, since: str | None = None) -> list[str]:
+        return await jira_client.load_comments_for_jira_issue(task_key, limit, since)
 
-    def get_task_assignee(self, task_key: str) -> str:
-        return jira_client.get_task_assignee_in_jira(task_key)
+    async def add_comment_to_jira_issue(self, task_key: str, comment: str) -> None:
+        return await jira_client.add_comment_to_jira_issue(task_key, comment)
 
-    def open_jira_issue(self, task_key: str) -> None:
-        return jira_client.open_jira_issue(task_key)
+    def _mirrored(self, task_keys: list[str], fields: list[str]) -> dict[str, dict]:
+        return self.mirror.lookup(task_keys, fields) if self.mirror else {}
 
-    def load_comments_for_jira_issue(self, task_key: str) -> list[str]:
-        return jira_client.load_comments_for_jira_issue(task_key)
+    def cache_info(self) -> IssueCacheInfo:
+        """Hits, revalidations and misses of the shared Jira issue cache."""
+        return issue_cache.info()
 
-    def add_comment_to_jira_issue(self, task_key: str, comment: str) -> None:
-        return jira_client.add_comment_to_jira_issue(task_key, comment)
+    async def close(self) -> None:
+        """Close the connections of the running event loop."""
+        await jira_client.aclose_jira_instances()
 
 
 THIS_DIR = Path(__file__).parent
@@ -35,6 +85,10 @@ SYSTEM_PROMPT = (THIS_DIR / 'prompts' / 'v2.txt').read_text()
 class Deps:
         tasks_db: Database
         jira_client: JiraClient
+        prompt_builder: TaskPromptBuilder = field(default_factory=TaskPromptBuilder)
+        # Called with the name of each tool as it starts, e.g. to show progress
+        on_tool: Optional[Callable[[str], None]] = None
+        tool_runner: ToolRunner = field(default_factory=ToolRunner)
 
 gpt4omini = "openai:gpt-4o-mini"
 agent = Agent(
@@ -42,13 +96,51 @@ agent = Agent(
     deps_type=Deps,
 )
 
+# What `get_tasks` returns by default: a page of compact rows
+TASK_SUMMARY_FIELDS = ["id", "task", "owner", "status", "due_date"]
+TASKS_PAGE_SIZE = 50
+
+# Seconds of streamed text grouped into one write
+STREAM_DEBOUNCE = 0.05
+
+async def stream_reply(
+    prompt: str, deps: Deps, message_history: list[Message], write: Callable[[str], None]
+) -> list[Message]:
+    """
+    Run the agent on `prompt`, passing the text of the reply to `write` as it
+    arrives. Returns the new messages of the run, like `RunResult.new_messages`.
+    """
+    async with agent.run_stream(prompt, deps=deps, message_history=message_history) as result:
+        written = 0
+        # Whole text so far rather than deltas: only then is the reply
+        # recorded in the run's messages
+        async for text in result.stream_text(debounce_by=STREAM_DEBOUNCE):
+            write(text[written:])
+            written = len(text)
+    return result.new_messages()
+
+def tool(func=None, *, writes: bool = False):
+    """
+    `agent.tool`, running the calls through `Deps.tool_runner` and reporting
+    each to `Deps.on_tool` as it starts. `writes` marks tools that change
+    the task database.
+    """
+    if func is None:
+        return functools.partial(tool, writes=writes)
+
+    @functools.wraps(func)
+    async def wrapper(ctx: RunContext[Deps], *args, **kwargs):
+        on_start = functools.partial(ctx.deps.on_tool, func.__name__) if ctx.deps.on_tool else None
+        return await ctx.deps.tool_runner.run(functools.partial(func, ctx, *args, **kwargs), writes, on_start)
+    return agent.tool(wrapper)
+
 @agent.system_prompt
 async def system_prompt(ctx: RunContext[Deps]) -> str:
-    tasks_summary = summarize_tasks(ctx.deps.tasks_db.read_tasks())
+    tasks_summary = ctx.deps.prompt_builder.render(ctx.deps.tasks_db)
     return f"{SYSTEM_PROMPT}\n\n{os.getenv('PROMPT_EXTENSION')}\ncurrent tasks:\n{tasks_summary} "
 
-@agent.tool
-def get_jira_task_assignee(ctx: RunContext[Deps], task_key: str) -> str:
+@tool
+async def get_jira_task_assignee(ctx: RunContext[Deps], task_key: str) -> str:
     """Get the assignee of a task in Jira.
 
     Args:
@@ -58,10 +150,10 @@ def get_jira_task_assignee(ctx: RunContext[Deps], task_key: str) -> str:
     Returns:
         The assignee of the task.
     """
-    return ctx.deps.jira_client.get_task_assignee(task_key)
+    return await ctx.deps.jira_client.get_task_assignee(task_key)
 
-@agent.tool
-def get_jira_task_status(ctx: RunContext[Deps], task_key: str) -> str:
+@tool
+async def get_jira_task_status(ctx: RunContext[Deps], task_key: str) -> str:
     """Get the status of a task in Jira.
 
     Args:
@@ -71,9 +163,33 @@ def get_jira_task_status(ctx: RunContext[Deps], task_key: str) -> str:
     Returns:
         The status of the task.
     """
-    return ctx.deps.jira_client.get_task_status(task_key)
+    return await ctx.deps.jira_client.get_task_status(task_key)
 
-@agent.tool
+@tool
+async def get_jira_statuses(ctx: RunContext[Deps], task_keys: list[str]) -> dict[str, str]:
+    """Get the status of several tasks in Jira at once, by key ('Not found' for
+    unknown keys). Prefer it over calling get_jira_task_status once per task.
+
+    Args:
+        ctx: The context.
+        task_keys: The keys of the tasks to get the status of.
+    """
+    return await ctx.deps.jira_client.get_statuses(task_keys)
+
+@tool
+async def get_jira_issues(ctx: RunContext[Deps], task_keys: list[str], fields: list[str] | None = None) -> dict[str, dict]:
+    """Get some fields of several Jira issues at once, e.g. status, assignee,
+    priority, summary or comment, by key of the issues found. Prefer it over
+    calling a single-issue tool once per task.
+
+    Args:
+        ctx: The context.
+        task_keys: The keys of the issues to get.
+        fields: The Jira fields to return, status and assignee if not given.
+    """
+    return await ctx.deps.jira_client.get_issues(task_keys, fields)
+
+@tool
 async def create_jira_ticket(ctx: RunContext[Deps], project_key: str, task: Task) -> str:
     """Create a new Jira ticket.
 
@@ -81,30 +197,70 @@ async def create_jira_ticket(ctx: RunContext[Deps], project_key: str, task: Task
         ctx: The context.
         task: The task to create a ticket for.
     """
-    return ctx.deps.jira_client.create_ticket(project_key, task)
+    return await ctx.deps.jira_client.create_ticket(project_key, task)
 
-@agent.tool
-def open_jira_issue_in_browser(ctx: RunContext[Deps], task_key: str) -> None:
+@tool(writes=True)
+async def create_jira_tickets(ctx: RunContext[Deps], project_key: str, task_ids: list[str]) -> dict[str, str]:
+    """Create a Jira ticket for each of several tasks at once and add
+    "JIRA Reference: {ticket_id}" to the metadata of each task created.
+    Tasks that already have a JIRA Reference are skipped. Gives the new ticket
+    key, or why no ticket was created, by task id.
+
+    Args:
+        ctx: The context.
+        project_key: The Jira project to create the tickets in.
+        task_ids: The ids of the tasks to create tickets for.
+    """
+    db = ctx.deps.tasks_db
+    task_ids = list(dict.fromkeys(task_ids))
+    results: dict[str, str] = {}
+    to_create: list[Task] = []
+    for task_id in task_ids:
+        task = db.get(task_id)
+        if task is None:
+            results[task_id] = "Task not found"
+        elif "JIRA Reference" in task.metadata:
+            results[task_id] = f"Skipped, it already has a ticket: {task.metadata}"
+        else:
+            to_create.append(task)
+
+    created = await ctx.deps.jira_client.create_tickets(project_key, to_create)
+    updated = []
+    for task, (ok, value) in zip(to_create, created):
+        results[task.id] = value
+        if ok:
+            metadata = "; ".join(filter(None, [task.metadata, f"JIRA Reference: {value}"]))
+            updated.append(task.model_copy(update={"metadata": metadata}))
+    if updated:
+        db.write_tasks(updated)
+    return {task_id: results[task_id] for task_id in task_ids}
+
+@tool
+async def open_jira_issue_in_browser(ctx: RunContext[Deps], task_key: str) -> None:
     """Open a Jira issue in the default web browser.
 
     Args:
         ctx: The context.
         task_key: The key of the task to open.
     """
-    ctx.deps.jira_client.open_jira_issue(task_key)
+    await ctx.deps.jira_client.open_jira_issue(task_key)
 
-@agent.tool
-def load_all_comments_for_jira_issue(ctx: RunContext[Deps], task_key: str) -> list[str]:
-    """Load all comments from a Jira issue.
+@tool
+async def load_all_comments_for_jira_issue(
+    ctx: RunContext[Deps], task_key: str, limit: int = 20, since: str | None = None
+) -> list[str]:
+    """Load the latest comments from a Jira issue, newest first. Long comments are cut short.
 
     Args:
         ctx: The context.
         task_key: The key of the task to load comments from.
+        limit: The most comments to load; ask for more only if needed.
+        since: Only comments created on or after this date (YYYY-MM-DD).
     """
-    return ctx.deps.jira_client.load_comments_for_jira_issue(task_key)
+    return await ctx.deps.jira_client.load_comments_for_jira_issue(task_key, limit, since)
 
-@agent.tool
-def add_comment_to_jira_issue(ctx: RunContext[Deps], task_key: str, comment: str) -> None:
+@tool
+async def add_comment_to_jira_issue(ctx: RunContext[Deps], task_key: str, comment: str) -> None:
     """Add a comment to a Jira issue.
 
     Args:
@@ -112,58 +268,102 @@ def add_comment_to_jira_issue(ctx: RunContext[Deps], task_key: str, comment: str
         task_key: The key of the task to add a comment to.
         comment: The comment to add.
     """
-    return ctx.deps.jira_client.add_comment_to_jira_issue(task_key, comment)
+    return await ctx.deps.jira_client.add_comment_to_jira_issue(task_key, comment)
 
-@agent.tool
-def archive_task(ctx: RunContext[Deps], task_id: str) -> None:
-    """Archive a task.
+@tool(writes=True)
+def archive_task(ctx: RunContext[Deps], task_ids: list[str]) -> None:
+    """Archive one or more tasks.
 
     Args:
         ctx: The context.
-        task_id: The id of the task to archive.
+        task_ids: The ids of the tasks to archive.
     """
-    ctx.deps.tasks_db.archive_task(task_id)
+    ctx.deps.tasks_db.archive_tasks(task_ids)
 
-@agent.tool
-async def get_task_by_id(ctx: RunContext[Deps], task_id: str) -> Task:
+@tool
+def get_task_by_id(ctx: RunContext[Deps], task_id: str) -> Task:
     """Get a task by its id.
 
     Args:
         ctx: The context.
         task_id: The id of the task to get.
     """
-    tasks = ctx.deps.tasks_db.read_tasks()
-    return next((task for task in tasks if task.id == task_id), None)
-
-@agent.tool
-async def get_tasks(ctx: RunContext[Deps], status: list[str] = None, db: str = "tasks") -> list[Task]:
-    """Get all tasks from the database. By default we should load 'to_do' tasks.
+    return ctx.deps.tasks_db.get(task_id)
+
+@tool
+def get_tasks(
+    ctx: RunContext[Deps],
+    status: list[str] = None,
+    owner: str = None,
+    db: str = "tasks",
+    archived_since: str = None,
+    fields: list[str] = None,
+    limit: int = TASKS_PAGE_SIZE,
+    cursor: str = None,
+    sort_by: str = None,
+) -> dict:
+    """Get tasks from the database, a page at a time. By default we should load 'to_do' tasks.
     Only load 'in_progress', 'blocked', 'on_hold', canceled and completed tasks if explicitly asked.
+    Gives the total of matching tasks, their status_counts, this page of tasks, and the
+    next_cursor for the next page (null on the last one).
 
     Args:
         ctx: The context.
         status: The status of the tasks to get. It can be a list of statuses. Valid statuses are: {', '.join(Task.Status.values())}
+        owner: Only return tasks owned by this person.
         db: The database to read the tasks from. It can be 'tasks' or 'archived_tasks'.
+        archived_since: For 'archived_tasks', only load tasks archived on or after this date (YYYY-MM-DD).
+            Use it when the question is about recent history.
+        fields: The task fields to return, id, task, owner, status and due_date if not given.
+            Ask for description, metadata, priority or completed_at only when needed.
+        limit: The most tasks to return.
+        cursor: The next_cursor of the previous page, to get the next one.
+        sort_by: A task field to sort by, e.g. due_date (tasks without one go last). Prefix it
+            with '-' for descending order. In database order if not given.
     """
-    print("filtering by status", status)
-    tasks = ctx.deps.tasks_db.read_tasks(db)
-    if status:
-        tasks = [task for task in tasks if task.status in status]
+    fields = fields or TASK_SUMMARY_FIELDS
+    sort_field = sort_by.lstrip("-") if sort_by else None
+    unknown = [field for field in [*fields, sort_field] if field and field not in Task.model_fields]
+    if unknown:
+        raise ModelRetry(f"Unknown task fields {unknown}, expected some of {list(Task.model_fields)}")
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        raise ModelRetry(f"Invalid cursor {cursor!r}, pass the next_cursor of the previous page")
+
+    read = list(dict.fromkeys([*fields, "status", *([sort_field] if sort_field else [])]))
+    rows = list(ctx.deps.tasks_db.iter_tasks(db, status=status, owner=owner, fields=read, since=archived_since))
+    status_counts = dict(Counter(row["status"] for row in rows))
+    if sort_field:
+        # Empty values (e.g. no due date) go last either way
+        filled = [row for row in rows if row[sort_field] != ""]
+        filled.sort(key=lambda row: row[sort_field], reverse=sort_by.startswith("-"))
+        rows = filled + [row for row in rows if row[sort_field] == ""]
+    limit = max(limit, 1)
+    page = rows[offset:offset + limit]
+    return {
+        "total": len(rows),
+        "status_counts": status_counts,
+        "tasks": [{field: row[field] for field in fields} for row in page],
+        "next_cursor": str(offset + limit) if offset + limit < len(rows) else None,
+    }
+
+@tool
+def search_tasks(ctx: RunContext[Deps], query: str, status: list[str] = None, limit: int = 10) -> list[dict]:
+    """Find tasks by the words of their title, description, owner or metadata, best matches first,
+    with their id, task, owner, status, due_date and a relevance score. Use it to look up a task
+    the user describes (e.g. "the budget proposal task") instead of loading every task with get_tasks.
 
-    status_counts = {}
-    for task in tasks:
-        status = task.status
-        if status in status_counts:
-            status_counts[status] += 1
-        else:
-            status_counts[status] = 1
-    for status, count in status_counts.items():
-        print(f"Tasks with status '{status}': {count}")
-
-    return [task.model_dump() for task in tasks]
+    Args:
+        ctx: The context.
+        query: Words to look for.
+        status: Only return tasks with one of these statuses.
+        limit: The most tasks to return.
+    """
+    return ctx.deps.tasks_db.search(query, status=status, limit=max(limit, 1))
 
-@agent.tool
-async def update_or_create_task(ctx: RunContext[Deps], tasks: list[Task], db = "tasks") -> None:
+@tool(writes=True)
+def update_or_create_task(ctx: RunContext[Deps], tasks: list[Task], db = "tasks") -> None:
     """Write or update tasks to the database.
 
     Args:
@@ -173,7 +373,7 @@ async def update_or_create_task(ctx: RunContext[Deps], tasks: list[Task], db = "
     """
     ctx.deps.tasks_db.write_tasks(tasks)
 
-@agent.tool
+@tool
 async def current_date_time(ctx: RunContext[Deps]) -> str:
     """Get the current date and time in ISO format.
 
@@ -182,7 +382,7 @@ async def current_date_time(ctx: RunContext[Deps]) -> str:
     """
     return datetime.datetime.now().isoformat()
 
-@agent.tool
+@tool
 def generate_task_id(ctx: RunContext[Deps]) -> str:
     """Generate a new task id.
     """
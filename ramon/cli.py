@@ -1,13 +1,17 @@
+import asyncio
+import time
 import click
 from click_default_group import DefaultGroup
 from ramon import (
-    agent,
     Database,
     JiraClient,
     Deps,
-    Message,
     summarize_tasks
 )
+from ramon.agent import stream_reply
+from ramon.history import ChatHistory
+from ramon.router import IntentRouter
+from ramon.plugins.jira_mirror import JiraMirror, start_background_sync
 
 import logfire
 logfire.configure(send_to_logfire='if-token-present')
@@ -18,37 +22,124 @@ def cli():
 
 @cli.command()
 @click.argument('prompt', required=False, default='What do I need to work on?')
-def chat(prompt: str) -> None: 
+@click.option('--sync-jira', is_flag=True, help='Keep the local Jira mirror in sync while chatting.')
+def chat(prompt: str, sync_jira: bool) -> None: 
     """Start a new chat with ramon."""
     click.echo("Type 'exit' or 'quit' to exit")
+    asyncio.run(_chat(sync_jira))
+
+async def _chat(sync_jira: bool) -> None:
     database = Database()
-    jira = JiraClient()
-    deps = Deps(database, jira)
-    message_history: list[Message] = []
-    while True:
-        prompt = click.prompt("", prompt_suffix="> ")
-        if prompt.strip() in ("exit", "quit"):
-            break
-        if prompt.strip():
-            result = agent.run_sync(prompt, deps=deps, message_history=message_history)
-            print(result.data)
-            message_history.extend(result.new_messages())
+    mirror = JiraMirror()
+    jira = JiraClient(mirror=mirror)
+    deps = Deps(database, jira, on_tool=_show_tool)
+    stop_sync = start_background_sync(mirror, database, on_error=_show_sync_error) if sync_jira else None
+    history = ChatHistory()
+    router = IntentRouter()
+    try:
+        while True:
+            prompt = click.prompt("", prompt_suffix="> ")
+            if prompt.strip() in ("exit", "quit"):
+                break
+            if not prompt.strip():
+                continue
+            if routed := router.route(prompt, database):
+                click.echo(routed.reply)
+                history.add_turn(routed.messages(prompt))
+                continue
+            start = time.perf_counter()
+            new_messages = await stream_reply(prompt, deps, history.messages(), _write)
+            router.record_agent_turn(time.perf_counter() - start)
+            click.echo()
+            history.add_turn(new_messages)
+    finally:
+        stats = history.stats()
+        if stats.turns:
+            click.echo(f"{stats.turns} turns, ~{stats.tokens_sent} history tokens sent, ~{stats.tokens_saved} saved "
+                       f"({stats.folded_turns} turns summarized, {stats.elided_tool_returns} tool outputs cut short).")
+        routing = router.stats()
+        if routing.hits:
+            click.echo(f"{routing.hits} of {routing.hits + routing.misses} prompts answered locally "
+                       f"({routing.hit_rate:.0%}), ~{routing.saved_seconds:.1f}s saved.")
+        if stop_sync:
+            stop_sync()
+        await jira.close()
+
+def _show_tool(name: str) -> None:
+    click.echo(click.style(f"  running {name}...", dim=True), err=True)
+
+def _show_sync_error(error: Exception) -> None:
+    click.echo(click.style(f"  JIRA sync failed: {error}", dim=True), err=True)
+
+def _write(text: str) -> None:
+    click.echo(text, nl=False)
+
+
+@cli.command()
+def sync_jira() -> None:
+    """Pull the Jira issues changed since the last sync into the local mirror."""
+    database = Database()
+    mirror = JiraMirror()
+
+    async def sync():
+        try:
+            return await mirror.sync(database)
+        finally:
+            await JiraClient().close()
+
+    result = asyncio.run(sync())
+    click.echo(f"Synced {result.linked} linked Jira issues into {mirror.path}: "
+               f"{result.fetched} fetched, {result.removed} no longer linked.")
 
 
 @cli.command()
 def archive_completed_tasks() -> None:
     """Archive all completed tasks."""
     database = Database()
-    tasks = database.read_tasks()
-    completed_tasks = [task for task in tasks if task.status == "completed"]    
-    for task in completed_tasks:
-        database.archive_task(task.id)
+    completed_tasks = database.archive_tasks(lambda task: task.status == "completed")
     click.echo(f"Archived {len(completed_tasks)} completed tasks.")
 
+@cli.command()
+def compact() -> None:
+    """Fold the task journals into tasks.json and archived_tasks.json."""
+    database = Database()
+    database.compact()
+    database.compact("archived_tasks")
+    click.echo("Compacted task journals.")
+
+@cli.command()
+def migrate_to_sqlite() -> None:
+    """Import tasks.json and archived_tasks.json into the SQLite database."""
+    database = Database()
+    tasks, archived_tasks = database.migrate_to_sqlite()
+    click.echo(f"Imported {tasks} tasks and {archived_tasks} archived tasks into {database.sqlite_file}.")
+    click.echo("Set RAMON_DB_ENGINE=sqlite to use it.")
+
+@cli.command()
+def partition_archive() -> None:
+    """Split archived_tasks.json into monthly partitions."""
+    database = Database()
+    archived_tasks = database.partition_archive()
+    click.echo(f"Imported {archived_tasks} archived tasks into {database.archived_tasks_dir}.")
+    click.echo("Set RAMON_ARCHIVE_PARTITIONS=1 to use it.")
+
+@cli.command()
+@click.argument('query')
+@click.option('--status', multiple=True, help='Only show tasks with this status (repeatable).')
+@click.option('--limit', default=10, show_default=True, help='The most tasks to show.')
+@click.option('--archived', is_flag=True, help='Search the archived tasks instead.')
+def search(query: str, status: tuple[str, ...], limit: int, archived: bool) -> None:
+    """Find tasks by the words of their title, description, owner or metadata."""
+    database = Database()
+    db = "archived_tasks" if archived else "tasks"
+    for hit in database.search(query, db, status=list(status) or None, limit=limit):
+        click.echo(f"- {hit['task']} (ID: {hit['id']}, Owner: {hit['owner']}, {hit['status']}), due {hit['due_date']}")
+
 @cli.command()
 @click.option('--smart', is_flag=True, help='Show a smart summary of the tasks.')
 def summary(smart: bool) -> None:
     """Show a summary of the tasks."""
     database = Database()
-    tasks = database.read_tasks()
-    print(summarize_tasks(tasks, smart))
+    # The smart summary only looks at pending and ongoing work
+    status = ["to_do", "in_progress"] if smart else None
+    print(summarize_tasks(database.columns(status=status), smart))
@@ -0,0 +1,142 @@
+import json
+import os
+from dataclasses import replace
+from typing import NamedTuple, Optional
+from pydantic_ai.messages import (
+    ArgsDict,
+    Message,
+    ModelStructuredResponse,
+    ModelTextResponse,
+    RetryPrompt,
+    ToolReturn,
+    UserPrompt,
+)
+from .prompt import estimate_tokens
+
+# Characters of a folded turn's question and answer kept in the summary
+SUMMARY_SNIPPET_CHARS = 200
+
+
+class HistoryStats(NamedTuple):
+    turns: int
+    folded_turns: int
+    elided_tool_returns: int
+    # Estimated tokens of history sent with the requests so far, and how many
+    # more sending the whole transcript every time would have cost
+    tokens_sent: int
+    tokens_saved: int
+
+
+class ChatHistory:
+    """
+    Message history for `chat` that stays bounded as the session grows.
+
+    The last `keep_turns` turns (RAMON_HISTORY_TURNS, default 6) are sent
+    as they are, except that tool returns over `max_tool_chars` characters
+    (RAMON_HISTORY_TOOL_CHARS, default 2000) are cut short in all but the
+    latest turn. A `get_tasks` dump is needed for the answer that follows it,
+    not four questions later. Older turns are folded into a running summary
+    of what was asked, which tools ran and what was answered, kept under
+    `max_summary_chars` and sent as the first message.
+    """
+
+    def __init__(
+        self,
+        keep_turns: Optional[int] = None,
+        max_tool_chars: Optional[int] = None,
+        max_summary_chars: int = 4000,
+    ):
+        self.keep_turns = keep_turns if keep_turns is not None else int(os.getenv('RAMON_HISTORY_TURNS', '6'))
+        self.max_tool_chars = max_tool_chars if max_tool_chars is not None else int(os.getenv('RAMON_HISTORY_TOOL_CHARS', '2000'))
+        self.max_summary_chars = max_summary_chars
+        self._turns: list[list[Message]] = []
+        self._summary: list[str] = []
+        self._folded = 0
+        self._elided = 0
+        self._full_tokens = 0
+        self._tokens_sent = 0
+        self._tokens_saved = 0
+
+    def messages(self) -> list[Message]:
+        """The history to send with the next request."""
+        messages: list[Message] = []
+        if self._summary:
+            messages.append(UserPrompt(self._summary_text()))
+        for turn in self._turns:
+            messages += turn
+        sent = sum(map(message_tokens, messages))
+        self._tokens_sent += sent
+        self._tokens_saved += self._full_tokens - sent
+        return messages
+
+    def add_turn(self, messages: list[Message]) -> None:
+        """Record the new messages of a run, folding the oldest turn if over `keep_turns`."""
+        if not messages:
+            return
+        if self._turns:
+            # No longer the latest turn
+            self._turns[-1] = [self._elide(message) for message in self._turns[-1]]
+        self._turns.append(list(messages))
+        self._full_tokens += sum(map(message_tokens, messages))
+        while len(self._turns) > self.keep_turns:
+            self._fold(self._turns.pop(0))
+
+    def stats(self) -> HistoryStats:
+        return HistoryStats(
+            self._folded + len(self._turns), self._folded, self._elided, self._tokens_sent, self._tokens_saved
+        )
+
+    def _elide(self, message: Message) -> Message:
+        if not isinstance(message, ToolReturn):
+            return message
+        text = message.model_response_str()
+        if len(text) <= self.max_tool_chars:
+            return message
+        self._elided += 1
+        return replace(message, content=(
+            f"{text[:self.max_tool_chars]}... [{len(text) - self.max_tool_chars} more characters elided, "
+            f"call {message.tool_name} again if needed]"
+        ))
+
+    def _fold(self, turn: list[Message]) -> None:
+        self._folded += 1
+        question = next((m.content for m in turn if isinstance(m, UserPrompt)), "")
+        answer = next((m.content for m in reversed(turn) if isinstance(m, ModelTextResponse)), "")
+        tools = list(dict.fromkeys(
+            call.tool_name for m in turn if isinstance(m, ModelStructuredResponse) for call in m.calls
+        ))
+        line = f"- User: {_snippet(question)}"
+        if tools:
+            line += f" | tools: {', '.join(tools)}"
+        if answer:
+            line += f" | Ramon: {_snippet(answer)}"
+        self._summary.append(line)
+        while len(self._summary) > 1 and sum(len(line) + 1 for line in self._summary) > self.max_summary_chars:
+            self._summary.pop(0)
+
+    def _summary_text(self) -> str:
+        dropped = self._folded - len(self._summary)
+        header = f"Summary of the {self._folded} earlier turns of this conversation"
+        if dropped:
+            header += f" (the first {dropped} left out)"
+        return f"{header}:\n" + "\n".join(self._summary)
+
+
+def message_tokens(message: Message) -> int:
+    """Estimated tokens of a message as sent to the model."""
+    if isinstance(message, ToolReturn):
+        return estimate_tokens(message.model_response_str())
+    if isinstance(message, RetryPrompt):
+        return estimate_tokens(message.model_response())
+    if isinstance(message, ModelStructuredResponse):
+        return sum(
+            estimate_tokens(call.tool_name)
+            + estimate_tokens(json.dumps(call.args.args_dict, default=str) if isinstance(call.args, ArgsDict) else call.args.args_json)
+            for call in message.calls
+        )
+    return estimate_tokens(message.content)
+
+
+def _snippet(text: str) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= SUMMARY_SNIPPET_CHARS else f"{text[:SUMMARY_SNIPPET_CHARS]}..."
@@ -1,11 +1,21 @@
+import gc
 import json
 from dataclasses import dataclass
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from enum import Enum
 from pathlib import Path
-from typing import List
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, TypeVar, Union
 import os
-from datetime import datetime
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from bisect import bisect_left, insort
+from array import array
+from collections import defaultdict
+from datetime import date
+from functools import lru_cache
+from itertools import compress
 class StatusEnum(str, Enum):
         to_do = "to_do"
         in_progress = "in_progress"
@@ -25,38 +35,252 @@ class Task(BaseModel):
     metadata: str
     status: StatusEnum = StatusEnum.to_do
 
-    
-def summarize_tasks(tasks: List[Task] , smart: bool = False) -> str:
-    def get_immediate_priorities(tasks):
-        today = datetime.now().date()
-        return [task for task in tasks if task.status == 'to_do' and datetime.strptime(task.due_date, '%Y-%m-%d').date() > today]
 
-    def get_contextual_relevance(tasks):
-        return [task for task in tasks if task.status == 'in_progress']
-    
-    summary = ""
+@lru_cache(maxsize=4096)
+def parse_date(value: str) -> Optional[date]:
+    """A `due_date` as a date, None when it is empty or not YYYY-MM-DD."""
+    # Task lists share a few hundred distinct dates, so each is parsed once
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _due_ordinal(value: str) -> int:
+    due = parse_date(value)
+    return due.toordinal() if due else 0
+
+
+@lru_cache(maxsize=4096)
+def _format_due(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime('%b %d, %Y')
+
+
+TaskList = TypeAdapter(List[Task])
+T = TypeVar("T")
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:  # optional, `pip install ramon[fast]`
+    orjson = None
+
+
+def encode_tasks(tasks: Iterable[Task], indent: Optional[int] = 4) -> bytes:
+    """Serialize tasks in one pass; `indent=None` gives the compact encoding."""
+    return TaskList.dump_json(list(tasks), indent=indent)
+
+
+def decode_tasks(data: bytes) -> List[Task]:
+    """Parse and validate a whole JSON task list in one step."""
+    with _gc_paused():
+        return TaskList.validate_json(data)
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Large task lists allocate hundreds of thousands of acyclic objects, which
+    # would otherwise trigger repeated full collections along the way.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _dumps(obj) -> bytes:
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode()
+
+
+def _loads(data: bytes):
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class TaskColumns:
+    """
+    Column-oriented snapshot of a task list for bulk scans: parallel lists of
+    ids, titles, owners, statuses and raw due dates, plus due dates as date
+    ordinals (0 when missing or invalid), parsed once when the snapshot is built.
+    Accepts `Task`s or the dicts of `Database.iter_tasks(fields=...)`.
+    """
+
+    FIELDS = ["id", "task", "owner", "status", "due_date"]
+    __slots__ = ("ids", "titles", "owners", "statuses", "due_dates", "due")
+
+    def __init__(self, tasks: Iterable[Union[Task, dict]] = ()):
+        # StatusEnum members are str, so statuses compare equal to the plain
+        # strings of `iter_tasks` dicts without the cost of `.value`
+        with _gc_paused():
+            rows = [
+                (task["id"], task["task"], task["owner"], task.get("status", StatusEnum.to_do.value), task["due_date"])
+                if isinstance(task, dict) else
+                (task.id, task.task, task.owner, task.status, task.due_date)
+                for task in tasks
+            ]
+            columns = [list(column) for column in zip(*rows)] or [[] for _ in self.FIELDS]
+        self.ids, self.titles, self.owners, self.statuses, self.due_dates = columns
+        self.due = array("l", map(_due_ordinal, self.due_dates))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def where(
+        self,
+        status: Optional[List[str]] = None,
+        owner: Optional[str] = None,
+        due_after: Optional[date] = None,
+    ) -> List[int]:
+        """Positions of the rows matching every given filter, in order. `due_after` is exclusive."""
+        rows: Iterable[int] = range(len(self.ids))
+        if status:
+            statuses = {s.value if isinstance(s, StatusEnum) else s for s in status}
+            rows = compress(rows, map(statuses.__contains__, self.statuses))
+        if owner is not None:
+            rows = (i for i in rows if self.owners[i] == owner)
+        if due_after is not None:
+            after = due_after.toordinal()
+            rows = (i for i in rows if self.due[i] > after)
+        return list(rows)
+
+
+def summarize_tasks(tasks: Union[Iterable[Task], TaskColumns], smart: bool = False) -> str:
+    if not smart and not isinstance(tasks, TaskColumns):
+        return "".join(f"- {task.task} (ID: {task.id}, Owner: {task.owner}), due {task.due_date}\n" for task in tasks)
+    columns = tasks if isinstance(tasks, TaskColumns) else TaskColumns(tasks)
+    titles = columns.titles
     if smart:
-        immediate_priorities = get_immediate_priorities(tasks)
-        contextual_relevance = get_contextual_relevance(tasks)
+        immediate_priorities = columns.where(status=["to_do"], due_after=date.today())
+        contextual_relevance = columns.where(status=["in_progress"])
+        return "".join([
+            "Immediate Priorities:\n",
+            *(f"- {titles[i]}, due {_format_due(columns.due[i])}\n" for i in immediate_priorities),
+            "\nRecurring Reminders:\nNone currently scheduled.\n",
+            "\nContextual Relevance:\n",
+            *(f"- {titles[i]}, ongoing task.\n" for i in contextual_relevance),
+        ])
+    return "".join(
+        f"- {title} (ID: {task_id}, Owner: {owner}), due {due_date}\n"
+        for title, task_id, owner, due_date in zip(titles, columns.ids, columns.owners, columns.due_dates)
+    )
 
-        summary += "Immediate Priorities:\n"
-        for task in immediate_priorities:
-            due_date = datetime.strptime(task.due_date, '%Y-%m-%d').strftime('%b %d, %Y')
-            summary += f"- {task.task}, due {due_date}\n"
 
-        summary += "\nRecurring Reminders:\nNone currently scheduled.\n"
+DB_DIR = Path(os.getenv('DB_DIR'))
 
-        summary += "\nContextual Relevance:\n"
-        for task in contextual_relevance:
-            summary += f"- {task.task}, ongoing task.\n"
-    else:
+class TaskIndex:
+    """
+    In-memory indexes over a task list: id -> task, status -> ids,
+    owner -> ids and (due_date, id) pairs sorted for range scans.
+    Iteration and query results keep the order tasks were first inserted in,
+    which is the order of the JSON file.
+    """
+
+    def __init__(self, tasks: Iterable[Task] = ()):
+        self._tasks: dict[str, Task] = {}
+        self._seq: dict[str, int] = {}
+        self._by_status: dict[str, set[str]] = defaultdict(set)
+        self._by_owner: dict[str, set[str]] = defaultdict(set)
+        self._by_due_date: list[tuple[str, str]] = []
+        self._next_seq = 0
+        self._columns: Optional[TaskColumns] = None
+        # In bulk, with one sort rather than an insort per task; later
+        # changes go through `upsert`
         for task in tasks:
-            summary += f"- {task.task} (ID: {task.id}, Owner: {task.owner}), due {task.due_date}\n"
+            if task.id not in self._seq:
+                self._seq[task.id] = self._next_seq
+                self._next_seq += 1
+            self._tasks[task.id] = task
+        for task in self._tasks.values():
+            self._by_status[task.status.value].add(task.id)
+            self._by_owner[task.owner].add(task.id)
+        self._by_due_date = sorted((task.due_date, task.id) for task in self._tasks.values() if task.due_date)
 
-    return summary
+    def __len__(self) -> int:
+        return len(self._tasks)
 
+    def tasks(self) -> List[Task]:
+        return list(self._tasks.values())
+
+    def get(self, task_id: str) -> Optional[Task]:
+        return self._tasks.get(task_id)
+
+    def columns(self) -> TaskColumns:
+        """Columnar snapshot of all tasks, rebuilt after the next change."""
+        if self._columns is None:
+            self._columns = TaskColumns(self._tasks.values())
+        return self._columns
+
+    def upsert(self, tasks: Iterable[Task]) -> None:
+        self._columns = None
+        for task in tasks:
+            if task.id in self._tasks:
+                self._unindex(self._tasks[task.id])
+            else:
+                self._seq[task.id] = self._next_seq
+                self._next_seq += 1
+            self._tasks[task.id] = task
+            self._by_status[task.status.value].add(task.id)
+            self._by_owner[task.owner].add(task.id)
+            if task.due_date:
+                insort(self._by_due_date, (task.due_date, task.id))
+
+    def remove(self, task_id: str) -> Optional[Task]:
+        task = self._tasks.pop(task_id, None)
+        if task:
+            self._columns = None
+            self._unindex(task)
+            del self._seq[task_id]
+        return task
+
+    def query(
+        self,
+        status: Optional[List[str]] = None,
+        owner: Optional[str] = None,
+        due_before: Optional[str] = None,
+    ) -> List[Task]:
+        """Tasks matching every given filter. `due_before` is an exclusive YYYY-MM-DD bound."""
+        candidates: list[set[str]] = []
+        if status:
+            statuses = (s.value if isinstance(s, StatusEnum) else s for s in status)
+            candidates.append(set().union(*(self._by_status.get(s, ()) for s in statuses)))
+        if owner is not None:
+            candidates.append(self._by_owner.get(owner, set()))
+        if due_before is not None:
+            end = bisect_left(self._by_due_date, (due_before,))
+            candidates.append({task_id for _, task_id in self._by_due_date[:end]})
+        if not candidates:
+            return self.tasks()
+        candidates.sort(key=len)
+        ids = candidates[0].intersection(*candidates[1:])
+        return [self._tasks[task_id] for task_id in sorted(ids, key=self._seq.__getitem__)]
+
+    def _unindex(self, task: Task) -> None:
+        self._by_status[task.status.value].discard(task.id)
+        self._by_owner[task.owner].discard(task.id)
+        if task.due_date:
+            i = bisect_left(self._by_due_date, (task.due_date, task.id))
+            if i < len(self._by_due_date) and self._by_due_date[i] == (task.due_date, task.id):
+                del self._by_due_date[i]
+
+
+class WriteConflict(Exception):
+    """Another process wrote a task file between our read and our write."""
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
 
-DB_DIR = Path(os.getenv('DB_DIR'))
 
 @dataclass
 class Database:
@@ -67,45 +291,657 @@ class Database:
 
     tasks_file: Path = DB_DIR / 'tasks.json'
     archived_tasks_file: Path = DB_DIR / 'archived_tasks.json' 
+    sqlite_file: Path = DB_DIR / 'tasks.db'
+    archived_tasks_dir: Path = DB_DIR / 'archived_tasks'
+    # "json" (default) or "sqlite", see README "Task Storage"
+    engine: str = os.getenv('RAMON_DB_ENGINE', 'json')
+    # Append changes to <db>.journal.jsonl instead of rewriting the JSON file,
+    # folding them back in once the journal passes one of the thresholds.
+    journal: bool = os.getenv('RAMON_DB_JOURNAL', '').lower() in ('1', 'true', 'yes')
+    journal_max_entries: int = int(os.getenv('RAMON_JOURNAL_MAX_ENTRIES', '500'))
+    journal_max_bytes: int = int(os.getenv('RAMON_JOURNAL_MAX_BYTES', str(1024 * 1024)))
+    # Write task files without indentation: smaller and faster, harder to diff.
+    compact_json: bool = os.getenv('RAMON_DB_COMPACT', '').lower() in ('1', 'true', 'yes')
+    # `iter_tasks` streams files at least this big instead of loading them whole
+    stream_min_bytes: int = int(os.getenv('RAMON_STREAM_MIN_BYTES', str(16 * 1024 * 1024)))
+    # Attempts before a write gives up on concurrent writers, see `_commit`
+    max_write_retries: int = 20
+    # Keep archived tasks in monthly files under `archived_tasks_dir` instead
+    # of archived_tasks.json, see `PartitionedArchive`.
+    partitioned_archive: bool = os.getenv('RAMON_ARCHIVE_PARTITIONS', '').lower() in ('1', 'true', 'yes')
+
+    def __post_init__(self) -> None:
+        self._lock = threading.RLock()
+        self._journal_entries: dict[str, int] = {}
+        self._compacting: set[str] = set()
+        self._cache: dict[str, tuple[tuple, TaskIndex]] = {}
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._recovered = False
+        self._held_locks: set[str] = set()
+        if self.engine not in ("json", "sqlite"):
+            raise ValueError(f"Unknown RAMON_DB_ENGINE '{self.engine}', expected 'json' or 'sqlite'")
+        self._sqlite = None
+        if self.engine == "sqlite":
+            from ramon.repositories.sqlite_task_repository import SqliteTaskRepository
+            self._sqlite = SqliteTaskRepository(self.sqlite_file)
+        self._search: dict = {}
+        self._archive = None
+        if self.partitioned_archive and not self._sqlite:
+            from ramon.repositories.partitioned_archive import PartitionedArchive
+            self._archive = PartitionedArchive(self.archived_tasks_dir, indent=self._indent)
 
     def create_files(self) -> None:
-        if not self.tasks_file.exists():
-            with open(self.tasks_file, "w", encoding='utf-8') as f:
-                json.dump([], f, ensure_ascii=False, indent=4)
-        if not self.archived_tasks_file.exists():
-            with open(self.archived_tasks_file, "w", encoding='utf-8') as f:
-                json.dump([], f, ensure_ascii=False, indent=4)
-
-    def read_tasks(self, db: str = "tasks") -> List[Task]:
-        self.create_files() 
-        if db == "tasks":
-            with open(self.tasks_file, "r") as f:
-                tasks_data = json.load(f)
-        elif db == "archived_tasks":
-            with open(self.archived_tasks_file, "r") as f:
-                tasks_data = json.load(f)
-        return [Task(**task) for task in tasks_data]
+        # Never truncates: another process may be creating or writing them too
+        for path in (self.tasks_file, self.archived_tasks_file):
+            if not path.exists():
+                atomic_write(path, b"[]", overwrite=False)
+
+    def read_tasks(self, db: str = "tasks", status: Optional[List[str]] = None) -> List[Task]:
+        if self._sqlite:
+            return self._sqlite.read_tasks(db, status)
+        return self._load(db).query(status=status)
+
+    def get(self, task_id: str, db: str = "tasks") -> Optional[Task]:
+        if self._sqlite:
+            return self._sqlite.get(task_id, db)
+        return self._load(db).get(task_id)
+
+    def query(
+        self,
+        db: str = "tasks",
+        status: Optional[List[str]] = None,
+        owner: Optional[str] = None,
+        due_before: Optional[str] = None,
+        since: Optional[str] = None,
+    ) -> List[Task]:
+        """
+        Tasks of `db` matching every given filter, served from the indexes.
+        With a partitioned archive, `since` (YYYY-MM-DD) skips the archived_tasks
+        partitions of months before it; otherwise it is ignored.
+        """
+        if self._sqlite:
+            return self._sqlite.query(db, status=status, owner=owner, due_before=due_before)
+        if since and db == "archived_tasks" and self._archive:
+            return TaskIndex(self._archive.load(since)).query(status=status, owner=owner, due_before=due_before)
+        return self._load(db).query(status=status, owner=owner, due_before=due_before)
+
+    def iter_tasks(
+        self,
+        db: str = "tasks",
+        status: Optional[List[str]] = None,
+        owner: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        since: Optional[str] = None,
+    ) -> Iterator[Union[Task, dict]]:
+        """
+        Yield the tasks of `db` matching `status` and `owner`, or dicts with only
+        `fields` when given. `since` works as in `query`.
+
+        A warm cache, or a file under `stream_min_bytes`, is served from the
+        indexes. Bigger files are parsed incrementally and rows are filtered
+        before validation, so memory stays bounded by a read chunk plus the
+        journal instead of growing with the file.
+        """
+        if self._sqlite:
+            yield from self._sqlite.iter_tasks(db, status=status, owner=owner, fields=fields)
+            return
+        partitions_since = since if db == "archived_tasks" and self._archive else None
+        if not partitions_since and not self._should_stream(db):
+            for task in self._load(db).query(status=status, owner=owner):
+                yield task.model_dump(mode="json", include=set(fields)) if fields else task
+            return
+        statuses = {s.value if isinstance(s, StatusEnum) else s for s in status} if status else None
+        for row in self._iter_rows(db, partitions_since):
+            if statuses is not None and row.get("status", StatusEnum.to_do.value) not in statuses:
+                continue
+            if owner is not None and row.get("owner") != owner:
+                continue
+            if fields:
+                # Same shape as the cached path: validated, then projected
+                yield Task.model_validate(row).model_dump(mode="json", include=set(fields))
+            else:
+                yield Task.model_validate(row)
+
+    def columns(self, db: str = "tasks", status: Optional[List[str]] = None) -> TaskColumns:
+        """
+        `TaskColumns` of the tasks of `db` matching `status`. The snapshot of a
+        whole cached file is kept with its index; big files are streamed into it.
+        """
+        if self._sqlite or self._should_stream(db):
+            return TaskColumns(self.iter_tasks(db, status=status, fields=TaskColumns.FIELDS))
+        index = self._load(db)
+        return TaskColumns(index.query(status=status)) if status else index.columns()
 
     def write_tasks(self, tasks: List[Task], db: str = "tasks") -> None:
-        existing_tasks = {task.id: task for task in self.read_tasks(db)}
-        for task in tasks:
-            existing_tasks[task.id] = task
-        if db == "tasks":
-            with open(self.tasks_file, "w", encoding='utf-8') as f:
-                json.dump([task.model_dump() for task in existing_tasks.values()], f, ensure_ascii=False, indent=4)
-        elif db == "archived_tasks":
-            with open(self.archived_tasks_file, "w", encoding='utf-8') as f:
-                json.dump([task.model_dump() for task in existing_tasks.values()], f, ensure_ascii=False, indent=4)
+        if self._sqlite:
+            return self._sqlite.write_tasks(tasks, db)
+        def attempt() -> None:
+            if db == "archived_tasks" and self._archive:
+                with self._commit({db: None}):
+                    key = self._stat_key(db)
+                    self._archive.upsert(tasks)
+                    return self._update_cache(db, key, lambda index: index.upsert(tasks))
+            if self.journal:
+                self.create_files()
+                entries = [{"op": "upsert", "task": task.model_dump(mode="json")} for task in tasks]
+                return self._append_journal(db, entries, lambda index: index.upsert(tasks))
+            version = self._version(db)
+            new_tasks = _upsert(self._load(db).tasks(), tasks)
+            with self._commit({db: version}):
+                self._write_snapshot(db, new_tasks, lambda index: index.upsert(tasks))
+        self._with_retries(attempt)
     
     def archive_task(self, task_id: str, db: str = "tasks" ) -> None:
-        self.create_files()
-        existing_tasks = {task.id: task for task in self.read_tasks(db)}
-        if task_id in existing_tasks:
-            task_to_archive = existing_tasks.pop(task_id)
-            with open(self.tasks_file, "w", encoding='utf-8') as f:
-                json.dump([task.model_dump() for task in existing_tasks.values()], f, ensure_ascii=False, indent=4)
-            with open(self.archived_tasks_file, "r", encoding='utf-8') as f:
-                archived_tasks = json.load(f)
-            archived_tasks.append(task_to_archive.model_dump())
-            with open(self.archived_tasks_file, "w", encoding='utf-8') as f:
-                json.dump(archived_tasks, f, ensure_ascii=False, indent=4)
+        self.archive_tasks([task_id], db)
+
+    def archive_tasks(self, selection: Union[Iterable[str], Callable[[Task], bool]], db: str = "tasks") -> List[Task]:
+        """
+        Move every task selected by `selection` (task ids, or a predicate over
+        tasks) from `db` to archived_tasks, reading and writing each file once.
+
+        The move is recorded in a pending file first and replayed on the next
+        load if we are interrupted, so a task is never lost nor left in both.
+        """
+        if self._sqlite:
+            return self._sqlite.archive_tasks(selection, db)
+        selection = selection if callable(selection) else list(selection)
+
+        def attempt() -> List[Task]:
+            versions = {db: self._version(db), "archived_tasks": self._version("archived_tasks")}
+            index = self._load(db)
+            if callable(selection):
+                to_archive = [task for task in index.tasks() if selection(task)]
+            else:
+                to_archive = [task for task in map(index.get, dict.fromkeys(selection)) if task]
+            if not to_archive:
+                return []
+            with self._commit(versions):
+                atomic_write_json(self._pending_archive_file, {
+                    "db": db,
+                    "tasks": [task.model_dump(mode="json") for task in to_archive],
+                })
+                self._move_to_archive(db, to_archive)
+                self._pending_archive_file.unlink()
+            return to_archive
+        return self._with_retries(attempt)
+
+    def compact(self, db: str = "tasks") -> None:
+        """Fold the journal of `db` into its JSON file and truncate it."""
+        if self._sqlite or (db == "archived_tasks" and self._archive):
+            return
+        # Under the lock the whole time: nobody can append while we fold.
+        with self._commit({db: None}):
+            if self._journal_file(db).exists():
+                self._write_snapshot(db, self._load(db).tasks())
+
+    def search(
+        self, query: str, db: str = "tasks", status: Optional[List[str]] = None, limit: int = 10
+    ) -> List[dict]:
+        """
+        The `limit` tasks of `db` best matching the words of `query` in their
+        title, description, owner or metadata (BM25), as dicts with the
+        `TaskColumns.FIELDS` and a `score`, best first.
+
+        The index is kept in <db>.search.json next to the task file. Our own
+        writes update it in memory once loaded, and it is saved here on the
+        next search; otherwise it catches up here, re-indexing only the tasks
+        that changed since it was saved.
+        """
+        with self._lock:
+            index = self._search_index(db)
+            return index.search(query, status=status, limit=limit)
+
+    def data_version(self, db: str = "tasks") -> tuple:
+        """
+        A value that changes whenever the tasks of `db` may have, through us
+        or another process, for caching things derived from them. A few stats.
+        """
+        if self._sqlite:
+            wal = self.sqlite_file.with_name(f"{self.sqlite_file.name}-wal")
+            return (_stat(self.sqlite_file), _stat(wal))
+        return self._stat_key(db)
+
+    def cache_info(self) -> CacheInfo:
+        """Hits and misses of the parsed task cache, like `functools.lru_cache`."""
+        return CacheInfo(self._cache_hits, self._cache_misses)
+
+    def _load(self, db: str) -> TaskIndex:
+        """
+        Parsed, validated and indexed tasks of `db`. The result is kept until
+        the JSON file or its journal change on disk (mtime, size or inode) or
+        we write. Callers must not mutate the returned index.
+        """
+        with self._lock:
+            self.create_files()
+            if not self._recovered:
+                self._recovered = True
+                self._recover_pending_archive()
+            key = self._stat_key(db)
+            cached = self._cache.get(db)
+            if cached and cached[0] == key:
+                self._cache_hits += 1
+                return cached[1]
+            self._cache_misses += 1
+            if db == "archived_tasks" and self._archive:
+                index = TaskIndex(self._archive.load())
+            else:
+                with open(self._file(db), "rb") as f:
+                    tasks = {task.id: task for task in decode_tasks(f.read())}
+                self._replay_journal(db, tasks)
+                index = TaskIndex(tasks.values())
+            self._cache[db] = (key, index)
+            return index
+
+    def _search_index(self, db: str):
+        """The search index of `db`, loaded once and synced when the tasks changed behind our back."""
+        index = self._search.get(db)
+        if index is None:
+            from ramon.repositories.search_index import SearchIndex
+            index = self._search[db] = SearchIndex.load(self._file(db).with_suffix(".search.json"))
+        # Read before the tasks: a write in between leaves it stale, not wrong
+        version = self.data_version(db)
+        if index.version != version:
+            index.sync(self.iter_tasks(db, fields=index.FIELDS))
+            index.version = version
+        if index.dirty:
+            index.save()
+        return index
+
+    def _should_stream(self, db: str) -> bool:
+        with self._lock:
+            cached = self._cache.get(db)
+            if cached and cached[0] == self._stat_key(db):
+                return False
+        if db == "archived_tasks" and self._archive:
+            size = sum(path.stat().st_size for path in self._archive.partition_files() if path.exists())
+        else:
+            self.create_files()
+            size = self._file(db).stat().st_size
+        return size >= self.stream_min_bytes
+
+    def _iter_rows(self, db: str, since: Optional[str] = None) -> Iterator[dict]:
+        """Raw task rows of `db`, journal applied, without building the whole list."""
+        if db == "archived_tasks" and self._archive:
+            for path in self._archive.partition_files(since):
+                yield from iter_json_array(path)
+            return
+        overrides: dict[str, Optional[dict]] = {}
+        moved: set[str] = set()
+        for entry in self._journal_entries_of(db):
+            if entry["op"] == "upsert":
+                overrides[entry["task"]["id"]] = entry["task"]
+            elif entry["op"] == "archive":
+                # Re-created later, it goes to the end, like in `_replay_journal`
+                overrides.pop(entry["id"], None)
+                overrides[entry["id"]] = None
+                moved.add(entry["id"])
+        emitted: set[str] = set()
+        for row in iter_json_array(self._file(db)):
+            task_id = row["id"]
+            if task_id not in overrides:
+                yield row
+            elif task_id not in moved:
+                emitted.add(task_id)
+                if overrides[task_id] is not None:
+                    yield overrides[task_id]
+        for task_id, row in overrides.items():
+            if row is not None and task_id not in emitted:
+                yield row
+
+    def _stat_key(self, db: str) -> tuple:
+        if db == "archived_tasks" and self._archive:
+            # Every partition write also rewrites the manifest
+            return (_stat(self._archive.manifest_file),)
+        return (_stat(self._file(db)), _stat(self._journal_file(db)))
+
+    def _update_cache(self, db: str, key: tuple, apply: Callable[[TaskIndex], object]) -> None:
+        """
+        After writing `db`, make the same change to the cached index with
+        `apply` if it was current as of `key`, so a warm cache survives our
+        own writes; otherwise drop it.
+        """
+        cached = self._cache.pop(db, None)
+        if cached and cached[0] == key:
+            apply(cached[1])
+            self._cache[db] = (self._stat_key(db), cached[1])
+        self._update_search(db, key, apply)
+
+    def _update_search(self, db: str, key: tuple, apply: Callable[[TaskIndex], object]) -> None:
+        """
+        Same for the search index of `db`, if loaded: `apply` works on it too,
+        in memory only, and `search` saves it. A stale one is left for `search`
+        to sync.
+        """
+        search = self._search.get(db)
+        if search and search.version == key:
+            apply(search)
+            search.version = self._stat_key(db)
+            search.dirty = True
+
+    @property
+    def _pending_archive_file(self) -> Path:
+        return self.tasks_file.with_name(".archive-pending.json")
+
+    def _move_to_archive(self, db: str, tasks: List[Task]) -> None:
+        """Idempotent: upsert `tasks` into archived_tasks, then drop them from `db`."""
+        if self._archive:
+            key = self._stat_key("archived_tasks")
+            # Into the partition already holding a task, if any: it may have been
+            # archived before, or by an interrupted move in an earlier month
+            self._archive.upsert(tasks)
+            self._update_cache("archived_tasks", key, lambda index: index.upsert(tasks))
+        elif self.journal:
+            self._append_journal(
+                "archived_tasks",
+                [{"op": "upsert", "task": task.model_dump(mode="json")} for task in tasks],
+                lambda index: index.upsert(tasks),
+            )
+        else:
+            self._write_snapshot(
+                "archived_tasks",
+                _upsert(self._load("archived_tasks").tasks(), tasks),
+                lambda index: index.upsert(tasks),
+            )
+
+        ids = {task.id for task in tasks}
+
+        def remove(index: TaskIndex) -> None:
+            for task_id in ids:
+                index.remove(task_id)
+
+        if self.journal:
+            self._append_journal(db, [{"op": "archive", "id": task_id} for task_id in ids], remove)
+        else:
+            self._write_snapshot(db, [task for task in self._load(db).tasks() if task.id not in ids], remove)
+
+    def _recover_pending_archive(self) -> None:
+        if not self._pending_archive_file.exists():
+            return
+        with self._commit({"tasks": None, "archived_tasks": None}):
+            # Another process may have finished it while we waited for the lock
+            if not self._pending_archive_file.exists():
+                return
+            with open(self._pending_archive_file, "r", encoding='utf-8') as f:
+                pending = json.load(f)
+            self._move_to_archive(pending["db"], [Task(**task) for task in pending["tasks"]])
+            self._pending_archive_file.unlink()
+
+    def _lock_file(self, db: str) -> Path:
+        path = self._file(db)
+        return path.with_name(f".{path.name}.lock")
+
+    def _version(self, db: str) -> int:
+        """
+        Version counter of `db`, bumped by every committed write. Read it
+        before reading the data a write is based on, then pass it to `_commit`.
+        """
+        try:
+            return int(self._lock_file(db).read_text() or 0)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            # Caught mid-update, can't match: the commit will retry
+            return -1
+
+    @contextmanager
+    def _commit(self, versions: dict[str, Optional[int]]) -> Iterator[None]:
+        """
+        Hold the advisory locks of the dbs in `versions` while writing them,
+        then bump their version counters. Raises `WriteConflict` if a db's
+        version is no longer the one given (None skips the check), meaning
+        someone else wrote it since we read it.
+
+        Locks are per file and only held for the write itself; the read and
+        any work based on it happen before, optimistically.
+        """
+        with self._lock, ExitStack() as stack:
+            handles = {}
+            for db in sorted(versions):
+                if db in self._held_locks:
+                    continue  # Nested commit, the outer one checks and bumps it
+                handle = stack.enter_context(open(self._lock_file(db), "a+"))
+                _flock(handle)
+                handle.seek(0)
+                current = int(handle.read() or 0)
+                if versions[db] is not None and versions[db] != current:
+                    raise WriteConflict(f"{self._file(db)} changed since it was read")
+                handles[db] = (handle, current)
+            self._held_locks.update(handles)
+            try:
+                yield
+            finally:
+                self._held_locks.difference_update(handles)
+                for handle, current in handles.values():
+                    handle.seek(0)
+                    handle.truncate()
+                    handle.write(str(current + 1))
+                    handle.flush()
+
+    def _with_retries(self, attempt: Callable[[], T]) -> T:
+        for retry in range(self.max_write_retries):
+            try:
+                with self._lock:
+                    return attempt()
+            except WriteConflict:
+                self._cache.clear()
+                time.sleep(random.uniform(0, min(0.1, 0.001 * 2 ** retry)))
+        with self._lock:
+            return attempt()
+
+    def _file(self, db: str) -> Path:
+        if db == "tasks":
+            return self.tasks_file
+        elif db == "archived_tasks":
+            return self.archived_tasks_file
+        raise ValueError(f"Unknown db '{db}', expected 'tasks' or 'archived_tasks'")
+
+    def _journal_file(self, db: str) -> Path:
+        return self._file(db).with_suffix(".journal.jsonl")
+
+    def _write_snapshot(self, db: str, tasks, apply: Callable[[TaskIndex], object] = lambda index: None) -> None:
+        """
+        Atomically replace the JSON file of `db`; the journal is folded into it.
+        `apply` is the change made to the tasks: a warm cached index gets it
+        like in `_update_cache`, otherwise the index is built from `tasks`.
+        """
+        tasks = list(tasks)
+        key = self._stat_key(db)
+        atomic_write(self._file(db), encode_tasks(tasks, self._indent))
+        self._journal_file(db).unlink(missing_ok=True)
+        self._journal_entries[db] = 0
+        cached = self._cache.get(db)
+        if cached and cached[0] == key:
+            self._update_cache(db, key, apply)
+        else:
+            self._cache[db] = (self._stat_key(db), TaskIndex(tasks))
+            self._update_search(db, key, apply)
+
+    @property
+    def _indent(self) -> Optional[int]:
+        return None if self.compact_json else 4
+
+    def _replay_journal(self, db: str, tasks: dict[str, Task]) -> None:
+        for entry in self._journal_entries_of(db):
+            if entry["op"] == "upsert":
+                tasks[entry["task"]["id"]] = Task.model_validate(entry["task"])
+            elif entry["op"] == "archive":
+                tasks.pop(entry["id"], None)
+
+    def _journal_entries_of(self, db: str) -> Iterator[dict]:
+        try:
+            f = open(self._journal_file(db), "rb")
+        except FileNotFoundError:
+            return  # none yet, or another process just compacted it
+        with f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield _loads(line)
+                except json.JSONDecodeError:
+                    # A torn line from an interrupted append, the next append drops it
+                    continue
+
+    def _append_journal(self, db: str, entries: List[dict], apply: Callable[[TaskIndex], object]) -> None:
+        """
+        Append `entries` to the journal of `db`. `apply` makes the same change
+        to the cached index, so a warm cache survives our own writes.
+        """
+        if not entries:
+            return
+        journal_file = self._journal_file(db)
+        with self._commit({db: None}):
+            key = self._stat_key(db)
+            if db not in self._journal_entries:
+                self._journal_entries[db] = _count_lines(journal_file)
+            with open(journal_file, "ab") as f:
+                _drop_torn_line(f)
+                f.write(b"".join(_dumps(entry) + b"\n" for entry in entries))
+            self._journal_entries[db] += len(entries)
+            self._update_cache(db, key, apply)
+            needs_compaction = (
+                self._journal_entries[db] >= self.journal_max_entries
+                or journal_file.stat().st_size >= self.journal_max_bytes
+            )
+            if needs_compaction and db not in self._compacting:
+                self._compacting.add(db)
+                # Non-daemon, so the interpreter waits for it before exiting.
+                threading.Thread(target=self._background_compact, args=(db,), name=f"ramon-compact-{db}").start()
+
+    def _background_compact(self, db: str) -> None:
+        try:
+            self.compact(db)
+        finally:
+            self._compacting.discard(db)
+
+    def migrate_to_sqlite(self) -> tuple[int, int]:
+        """
+        Import tasks.json and archived_tasks.json into `sqlite_file`, replacing
+        whatever it held. The JSON files are left untouched.
+        """
+        from ramon.repositories.sqlite_task_repository import SqliteTaskRepository
+        json_db = Database(
+            tasks_file=self.tasks_file,
+            archived_tasks_file=self.archived_tasks_file,
+            archived_tasks_dir=self.archived_tasks_dir,
+            partitioned_archive=self.partitioned_archive,
+            engine="json",
+        )
+        tasks = json_db.read_tasks()
+        archived_tasks = json_db.read_tasks("archived_tasks")
+        repository = SqliteTaskRepository(self.sqlite_file)
+        repository.import_tasks(tasks)
+        repository.import_tasks(archived_tasks, "archived_tasks")
+        return len(tasks), len(archived_tasks)
+
+    def partition_archive(self) -> int:
+        """
+        Import archived_tasks.json into monthly partitions under
+        `archived_tasks_dir`, by completion (or due) month. Safe to run twice;
+        archived_tasks.json is left untouched.
+        """
+        from ramon.repositories.partitioned_archive import PartitionedArchive
+        legacy_db = Database(tasks_file=self.tasks_file, archived_tasks_file=self.archived_tasks_file, engine="json")
+        archived_tasks = legacy_db.read_tasks("archived_tasks")
+        PartitionedArchive(self.archived_tasks_dir).import_tasks(archived_tasks)
+        self._cache.pop("archived_tasks", None)
+        return len(archived_tasks)
+
+
+def iter_json_array(path: Path, chunk_size: int = 64 * 1024) -> Iterator:
+    """Yield the items of the JSON array stored in `path`, reading it in chunks."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding='utf-8') as f:
+        buffer, pos, started = "", 0, False
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise ValueError(f"Unexpected end of JSON array in {path}")
+                buffer, pos = chunk, 0
+                continue
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError(f"Expected a JSON array in {path}")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The item continues in the next chunk
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield item
+
+
+def atomic_write(path: Path, data: bytes, overwrite: bool = True) -> None:
+    """Write `data` to `path` so readers see the old content or the new, never part of it."""
+    tmp_file = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_file, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    if overwrite:
+        os.replace(tmp_file, path)
+        return
+    try:
+        os.link(tmp_file, path)  # fails if `path` exists, unlike a rename
+    except FileExistsError:
+        pass
+    finally:
+        tmp_file.unlink()
+
+
+def atomic_write_json(path: Path, data) -> None:
+    atomic_write(path, json.dumps(data, ensure_ascii=False, indent=4).encode())
+
+
+def _upsert(tasks: List[Task], changes: List[Task]) -> List[Task]:
+    by_id = {task.id: task for task in tasks}
+    for task in changes:
+        by_id[task.id] = task
+    return list(by_id.values())
+
+
+def _stat(path: Path) -> Optional[tuple]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _flock(handle) -> None:
+    if fcntl:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+
+def _drop_torn_line(f) -> None:
+    """Truncate a journal opened for appending back to its last complete line."""
+    size = f.seek(0, os.SEEK_END)
+    if size == 0:
+        return
+    with open(f.name, "rb") as reader:
+        reader.seek(size - 1)
+        if reader.read(1) == b"\n":
+            return
+        tail = min(size, 64 * 1024)
+        reader.seek(size - tail)
+        last_newline = reader.read(tail).rfind(b"\n")
+    f.truncate(size - tail + last_newline + 1 if last_newline >= 0 else 0)
+
+
+def _count_lines(path: Path) -> int:
+    if not path.exists():
+        return 0
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
@@ -1,20 +1,328 @@
 from jira import JIRA
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+import atexit
+import json
 import os
+import threading
+import time
 from ramon.models import Task
 import webbrowser
 
+# One client per (server, email, token), shared by every call and thread so
+# requests reuse the same pooled keep-alive connections.
+_clients: dict[tuple, JIRA] = {}
+_clients_lock = threading.Lock()
+
+API_PATH = '/rest/api/2'
+
+# Largest page JIRA Cloud returns for a search
+SEARCH_PAGE_SIZE = 100
+
+# Most issues JIRA creates in one bulk request
+BULK_CREATE_SIZE = 50
+
+# Comments returned by default, and characters kept of each
+COMMENTS_LIMIT = 20
+COMMENT_MAX_CHARS = 1000
+
+# Seconds a cached field is served without asking JIRA, see `IssueCache`.
+# Fields that rarely change are trusted longer; others use JIRA_CACHE_TTL.
+FIELD_TTLS = {
+    'assignee': 300.0,
+    'summary': 3600.0,
+    'description': 3600.0,
+    'priority': 600.0,
+}
+
+
+class IssueCacheInfo(NamedTuple):
+    hits: int
+    revalidations: int
+    misses: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered without fetching the fields, revalidations included."""
+        lookups = self.hits + self.revalidations + self.misses
+        return (self.hits + self.revalidations) / lookups if lookups else 0.0
+
+
+class IssueCache:
+    """
+    Flattened issue fields (see `_field_value`) by issue key, for the
+    `max_issues` most recently used issues. A field is served as is for
+    `ttls[field]` seconds (`default_ttl` for others). After that the issue
+    needs revalidating: if its `updated` timestamp hasn't moved, the cached
+    fields are still right and are kept for another TTL; otherwise they are
+    fetched again. Writes through ramon invalidate the issue.
+    Shared by every thread and event loop.
+    """
+
+    def __init__(
+        self,
+        max_issues: int = 1024,
+        default_ttl: float = 60.0,
+        ttls: Optional[dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_issues = max_issues
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self._clock = clock
+        # key -> {'updated': str | None, 'fields': {field: (value, expires_at)}}
+        self._issues: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._revalidations = self._misses = 0
+
+    def plan(self, task_keys: list[str], fields: list[str]) -> tuple[dict[str, dict], list[str], list[str]]:
+        """
+        Split `task_keys` into the issues whose `fields` are all fresh (returned
+        with their values), those to revalidate and those to fetch.
+        """
+        now = self._clock()
+        fresh, to_revalidate, to_fetch = {}, [], []
+        with self._lock:
+            for key in task_keys:
+                entry = self._issues.get(key)
+                cached = [entry['fields'].get(field) for field in fields] if entry else [None]
+                if any(value is None for value in cached):
+                    to_fetch.append(key)
+                    self._misses += 1
+                    continue
+                self._issues.move_to_end(key)
+                if all(expires_at > now for _, expires_at in cached):
+                    fresh[key] = {field: value for field, (value, _) in zip(fields, cached)}
+                    self._hits += 1
+                elif entry['updated'] is None:
+                    to_fetch.append(key)
+                    self._misses += 1
+                else:
+                    to_revalidate.append(key)
+        return fresh, to_revalidate, to_fetch
+
+    def revalidate(self, key: str, fields: list[str], updated: Optional[str]) -> Optional[dict]:
+        """
+        The cached `fields` of `key`, good for another TTL, if JIRA's `updated`
+        timestamp is still the cached one; otherwise None and they must be fetched.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._issues.get(key)
+            if not entry or updated is None or entry['updated'] != updated:
+                self._misses += 1
+                return None
+            self._revalidations += 1
+            values = {}
+            for field in fields:
+                value, _ = entry['fields'][field]
+                entry['fields'][field] = (value, now + self._ttl(field))
+                values[field] = value
+            return values
+
+    def put(self, key: str, values: dict, updated: Optional[str]) -> None:
+        now = self._clock()
+        with self._lock:
+            entry = self._issues.get(key)
+            if entry is None or entry['updated'] != updated:
+                # Anything else we had for it may be out of date
+                entry = self._issues[key] = {'updated': updated, 'fields': {}}
+            for field, value in values.items():
+                entry['fields'][field] = (value, now + self._ttl(field))
+            self._issues.move_to_end(key)
+            while len(self._issues) > self.max_issues:
+                self._issues.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._issues.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._issues.clear()
+            self._hits = self._revalidations = self._misses = 0
+
+    def info(self) -> IssueCacheInfo:
+        with self._lock:
+            return IssueCacheInfo(self._hits, self._revalidations, self._misses, len(self._issues))
+
+    def _ttl(self, field: str) -> float:
+        return self.ttls.get(field, self.default_ttl)
+
+
+issue_cache = IssueCache(
+    max_issues=int(os.getenv('JIRA_CACHE_SIZE', '1024')),
+    default_ttl=float(os.getenv('JIRA_CACHE_TTL', '60')),
+    ttls=FIELD_TTLS,
+)
+
 def get_jira_instance() -> JIRA:
+    """
+    The shared JIRA client for the current JIRA_SERVER/JIRA_EMAIL/JIRA_TOKEN,
+    created on first use. JIRA_POOL_SIZE (default 10) bounds the kept-alive
+    connections and JIRA_TIMEOUT (seconds, default 30) applies to every request.
+    """
     server = os.getenv('JIRA_SERVER')
     email = os.getenv('JIRA_EMAIL')
     api_token = os.getenv('JIRA_TOKEN')
-    return JIRA(server=server, basic_auth=(email, api_token))
+    key = (server, email, api_token)
+    with _clients_lock:
+        jira = _clients.get(key)
+        if jira is None:
+            jira = JIRA(
+                server=server,
+                basic_auth=(email, api_token),
+                timeout=float(os.getenv('JIRA_TIMEOUT', '30')),
+            )
+            pool_size = int(os.getenv('JIRA_POOL_SIZE', '10'))
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            # JIRA has no option for the connection pool and doesn't expose its
+            # requests session (`JIRA.session()` is a REST call), so the
+            # adapter is mounted on the private one
+            jira._session.mount('https://', adapter)
+            jira._session.mount('http://', adapter)
+            _clients[key] = jira
+        return jira
+
+def close_jira_instances() -> None:
+    """
+    Close the shared JIRA clients and their connections; the next call opens
+    new ones. Also runs at exit, so pooled sockets are closed cleanly.
+    """
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for jira in clients:
+        jira.close()
 
+atexit.register(close_jira_instances)
 
 
+def get_issue_fields(task_key: str, fields: list[str]) -> dict:
+    """
+    Some fields of one JIRA issue, flattened like in `get_jira_issues`,
+    served from `issue_cache` when possible.
+    """
+    key = _normalize_key(task_key)
+    fresh, to_revalidate, _ = issue_cache.plan([key], fields)
+    if key in fresh:
+        return fresh[key]
+    jira = get_jira_instance()
+    if to_revalidate:
+        updated = jira.issue(task_key, fields='updated').raw['fields'].get('updated')
+        values = issue_cache.revalidate(key, fields, updated)
+        if values is not None:
+            return values
+    issue_fields = jira.issue(task_key, fields=','.join(fields + ['updated'])).raw['fields']
+    values = {field: _field_value(field, issue_fields.get(field)) for field in fields}
+    issue_cache.put(key, values, issue_fields.get('updated'))
+    return values
+
 def get_task_status_in_jira(task_key: str) -> str:
+    return get_issue_fields(task_key, ['status'])['status']
+
+def get_jira_issues(task_keys: list[str], fields: list[str] | None = None) -> dict[str, dict]:
+    """
+    Fetches many JIRA issues with a single paginated `key in (...)` search,
+    asking only for `fields`.
+
+    Args:
+        task_keys: The JIRA issue keys (e.g., ['PROJ-123', 'PROJ-124'])
+        fields: The JIRA fields to return for each issue, status and assignee by default
+
+    Returns:
+        dict[str, dict]: Issue key -> {field: value}. People are given by display
+                         name ('Unassigned' for no assignee), statuses and other
+                         named values by name, comments as in `load_comments_for_jira_issue`.
+                         Keys that don't exist are left out.
+    """
+    keys = list(dict.fromkeys(_normalize_key(key) for key in task_keys if key.strip()))
+    if not keys:
+        return {}
+    fields = fields or ['status', 'assignee']
+    issues, to_revalidate, to_fetch = issue_cache.plan(keys, fields)
     jira = get_jira_instance()
-    issue = jira.issue(task_key)
-    return issue.fields.status.name
+    if to_revalidate:
+        updated = _search_issues(jira, to_revalidate, ['updated'])
+        for key in to_revalidate:
+            values = issue_cache.revalidate(key, fields, updated.get(key, {}).get('updated'))
+            if values is None:
+                to_fetch.append(key)
+            else:
+                issues[key] = values
+    if to_fetch:
+        for key, issue_fields in _search_issues(jira, to_fetch, fields + ['updated']).items():
+            issues[key] = {field: _field_value(field, issue_fields.get(field)) for field in fields}
+            issue_cache.put(key, issues[key], issue_fields.get('updated'))
+    return {key: issues[key] for key in keys if key in issues}
+
+def _search_issues(jira: JIRA, keys: list[str], fields: list[str]) -> dict[str, dict]:
+    """Raw fields of the issues in `keys` that exist, with one paginated search."""
+    jql = f"key in ({', '.join(json.dumps(key) for key in keys)})"
+    issues = {}
+    start_at = 0
+    while True:
+        # POST keeps long key lists out of the URL; validate_query=False skips
+        # unknown keys instead of failing the whole search.
+        page = jira.search_issues(
+            jql, startAt=start_at, maxResults=SEARCH_PAGE_SIZE, validate_query=False,
+            fields=fields, json_result=True, use_post=True,
+        )
+        for issue in page['issues']:
+            issues[issue['key']] = issue.get('fields') or {}
+        start_at += len(page['issues'])
+        if not page['issues'] or start_at >= page.get('total', 0):
+            return issues
+
+def get_jira_statuses(task_keys: list[str]) -> dict[str, str]:
+    """
+    Gets the status of many JIRA issues in one search.
+
+    Args:
+        task_keys: The JIRA issue keys (e.g., ['PROJ-123', 'PROJ-124'])
+
+    Returns:
+        dict[str, str]: Issue key -> status name, 'Not found' for unknown keys
+    """
+    issues = get_jira_issues(task_keys, ['status'])
+    statuses = {}
+    for key in map(_normalize_key, task_keys):
+        statuses[key] = issues[key]['status'] if key in issues else 'Not found'
+    return statuses
+
+def _normalize_key(task_key: str) -> str:
+    return task_key.strip().upper()
+
+def _comments_page(start_at: int, limit: int) -> dict:
+    return {'startAt': start_at, 'maxResults': min(limit - start_at, SEARCH_PAGE_SIZE), 'orderBy': '-created'}
+
+def _collect_comments(
+    page: dict, comments: list[str], limit: int, since: str | None, max_chars: int
+) -> tuple[bool, list[str]]:
+    """Add a newest-first page of comments; True once there is nothing more to fetch."""
+    for comment in page['comments']:
+        if since and comment.get('created', '') < since:
+            return True, comments
+        comments.append(_format_comment(comment, max_chars))
+    done = not page['comments'] or page.get('startAt', 0) + len(page['comments']) >= page.get('total', 0)
+    return done or len(comments) >= limit, comments[:limit]
+
+def _format_comment(comment: dict, max_chars: int = COMMENT_MAX_CHARS) -> str:
+    body = comment['body']
+    if len(body) > max_chars:
+        body = f"{body[:max_chars]}... [{len(body) - max_chars} more characters]"
+    return f"from: {comment['author']['displayName']}, message: {body}"
+
+def _field_value(field: str, value):
+    if field == 'assignee' and value is None:
+        return 'Unassigned'
+    if field == 'comment':
+        return [_format_comment(comment) for comment in (value or {}).get('comments', [])]
+    if isinstance(value, dict):
+        return value.get('displayName') or value.get('name') or value.get('value') or value
+    return value
 
 def create_issue_in_jira(project_key: str, task: Task) -> tuple[bool, str]:
     """
@@ -61,6 +369,53 @@ def create_issue_in_jira(project_key: str, task: Task) -> tuple[bool, str]:
         print(f"Failed to create issue: {task}. Error: {e}")
         return (False, "")
 
+def create_issues_in_jira(project_key: str, tasks: list[Task]) -> list[tuple[bool, str]]:
+    """
+    Creates one JIRA issue per task with the bulk create endpoint, in chunks
+    of BULK_CREATE_SIZE. The jira library retries rate-limited (429) requests.
+
+    Args:
+        project_key (str): The key of the JIRA project where the issues will be created.
+        tasks (list[Task]): The tasks to create issues for.
+
+    Returns:
+        list[tuple[bool, str]]: For each task, in order, (True, issue key) if it was
+                                created, or (False, reason) if it wasn't.
+    """
+    jira = get_jira_instance()
+    results, pending = _bulk_create_plan(project_key, tasks)
+    for start in range(0, len(pending), BULK_CREATE_SIZE):
+        chunk = pending[start:start + BULK_CREATE_SIZE]
+        try:
+            created = jira.create_issues([fields for _, fields in chunk], prefetch=False)
+        except Exception as e:
+            for i, _ in chunk:
+                results[i] = (False, f"Failed to create issue: {e}")
+            continue
+        for (i, _), result in zip(chunk, created):
+            if result['status'] == 'Success':
+                results[i] = (True, result['issue'].key)
+            else:
+                results[i] = (False, f"Failed to create issue: {result['error']}")
+    return results
+
+def _bulk_create_plan(project_key: str, tasks: list[Task]) -> tuple[list, list[tuple[int, dict]]]:
+    """Results with the tasks that can't be created filled in, and (position, fields) of the others."""
+    results: list = [None] * len(tasks)
+    pending = []
+    for i, task in enumerate(tasks):
+        if not project_key or not task.task or not task.description:
+            results[i] = (False, "Missing project key, summary or description")
+            continue
+        pending.append((i, {
+            'project': {'key': project_key},
+            'summary': task.task,
+            'description': task.description,
+            'issuetype': {'name': 'Task'},
+            'priority': {'name': task.priority if task.priority else 'Medium'},
+        }))
+    return results, pending
+
 def get_task_assignee_in_jira(task_key: str) -> str:
     """
     Gets the assignee name for a JIRA task.
@@ -71,10 +426,7 @@ def get_task_assignee_in_jira(task_key: str) -> str:
     Returns:
         str: The assignee's display name or 'Unassigned' if no assignee
     """
-    jira = get_jira_instance()
-    issue = jira.issue(task_key)
-    assignee = issue.fields.assignee
-    return assignee.displayName if assignee else 'Unassigned'
+    return get_issue_fields(task_key, ['assignee'])['assignee']
 
 def add_comment_to_jira_issue(task_key: str, comment: str) -> None:
     """
@@ -89,20 +441,38 @@ def add_comment_to_jira_issue(task_key: str, comment: str) -> None:
     """
     jira = get_jira_instance()
     jira.add_comment(task_key, comment)
+    issue_cache.invalidate(_normalize_key(task_key))
 
-def load_comments_for_jira_issue(task_key: str) -> list[str]:
+def load_comments_for_jira_issue(
+    task_key: str,
+    limit: int = COMMENTS_LIMIT,
+    since: str | None = None,
+    max_chars: int = COMMENT_MAX_CHARS,
+) -> list[str]:
     """
-    Loads all comments for a JIRA issue.
+    Loads the latest comments of a JIRA issue, newest first, paging through
+    the comment resource only as far as needed.
     
     Args:
         task_key: The JIRA issue key (e.g., 'PROJ-123')
+        limit: The most comments to return
+        since: Only comments created on or after this date (YYYY-MM-DD)
+        max_chars: Longer comment bodies are cut to this many characters
 
     Returns:
         list[str]: A list of comments from the JIRA issue.
     """
     jira = get_jira_instance()
-    issue = jira.issue(task_key)
-    return [f"from: {comment.author.displayName}, message: {comment.body}" for comment in issue.fields.comment.comments]
+    url = f"{jira.server_url}{API_PATH}/issue/{task_key}/comment"
+    comments = []
+    while len(comments) < limit:
+        # `JIRA.comments` fetches them all, unordered; the pooled session
+        # raises JIRAError on failures like the library's own calls
+        page = jira._session.get(url, params=_comments_page(len(comments), limit)).json()
+        done, comments = _collect_comments(page, comments, limit, since, max_chars)
+        if done:
+            break
+    return comments
     
 def open_jira_issue(task_key: str) -> None:
     """
@@ -0,0 +1,315 @@
+"""
+Async versions of the functions in `ramon.plugins.jira`, calling the JIRA REST
+API with httpx so agent tools don't block the event loop and independent calls
+in a turn overlap.
+"""
+import asyncio
+import json
+import os
+import random
+import weakref
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any
+import httpx
+from ramon.models import Task
+from ramon.plugins import jira as sync_jira
+from ramon.plugins.jira import (
+    API_PATH,
+    BULK_CREATE_SIZE,
+    COMMENT_MAX_CHARS,
+    COMMENTS_LIMIT,
+    SEARCH_PAGE_SIZE,
+    _collect_comments,
+    _bulk_create_plan,
+    _comments_page,
+    _field_value,
+    _normalize_key,
+    issue_cache,
+)
+
+RETRY_STATUSES = (429, 503)
+# Longest Retry-After we honour, in seconds
+MAX_RETRY_DELAY = 60.0
+
+
+class AsyncJira:
+    """
+    Minimal async JIRA REST client: one pooled keep-alive `httpx.AsyncClient`,
+    with at most `max_concurrency` requests in flight at once. Rate-limited
+    (429) and unavailable (503) responses are retried up to `max_retries`
+    times, after their Retry-After or a jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        server: str,
+        email: str,
+        api_token: str,
+        pool_size: int = 10,
+        timeout: float = 30.0,
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+    ):
+        self.server = server
+        self._client = httpx.AsyncClient(
+            base_url=f"{server.rstrip('/')}{API_PATH}",
+            auth=(email, api_token),
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            headers={'Accept': 'application/json'},
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.retries = 0
+
+    async def request(self, method: str, path: str, **kwargs) -> Any:
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                response = await self._client.request(method, path, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                break
+            # Wait outside the semaphore so other requests can go meanwhile
+            self.retries += 1
+            await asyncio.sleep(_retry_delay(response, attempt))
+            attempt += 1
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+    async def issue(self, task_key: str, fields: list[str]) -> dict:
+        return await self.request('GET', f'/issue/{task_key}', params={'fields': ','.join(fields)})
+
+    async def search(self, jql: str, fields: list[str], start_at: int = 0, max_results: int = SEARCH_PAGE_SIZE) -> dict:
+        return await self.request('POST', '/search', json={
+            'jql': jql,
+            'startAt': start_at,
+            'maxResults': max_results,
+            'fields': fields,
+            'validateQuery': 'warn',
+        })
+
+    async def comments(self, task_key: str, params: dict) -> dict:
+        return await self.request('GET', f'/issue/{task_key}/comment', params=params)
+
+    async def add_comment(self, task_key: str, body: str) -> dict:
+        return await self.request('POST', f'/issue/{task_key}/comment', json={'body': body})
+
+    async def create_issue(self, fields: dict) -> dict:
+        return await self.request('POST', '/issue', json={'fields': fields})
+
+    async def create_issues(self, fields_list: list[dict]) -> dict:
+        """Bulk create; failed elements are listed in the response's `errors`."""
+        try:
+            return await self.request('POST', '/issue/bulk', json={'issueUpdates': [{'fields': f} for f in fields_list]})
+        except httpx.HTTPStatusError as e:
+            # JIRA answers 400, with the same body, when none could be created
+            if e.response.status_code == 400 and e.response.content:
+                return e.response.json()
+            raise
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+# httpx connections belong to the event loop that opened them, so clients are
+# shared per loop and per (server, email, token).
+_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, AsyncJira]]' = weakref.WeakKeyDictionary()
+
+def get_async_jira_instance() -> AsyncJira:
+    """
+    The shared `AsyncJira` of the running event loop for the current
+    JIRA_SERVER/JIRA_EMAIL/JIRA_TOKEN. JIRA_POOL_SIZE and JIRA_TIMEOUT work as
+    in `get_jira_instance`; JIRA_MAX_CONCURRENCY (default 8) bounds the
+    requests in flight.
+    """
+    server = os.getenv('JIRA_SERVER')
+    email = os.getenv('JIRA_EMAIL')
+    api_token = os.getenv('JIRA_TOKEN')
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    key = (server, email, api_token)
+    if key not in clients:
+        clients[key] = AsyncJira(
+            server,
+            email,
+            api_token,
+            pool_size=int(os.getenv('JIRA_POOL_SIZE', '10')),
+            timeout=float(os.getenv('JIRA_TIMEOUT', '30')),
+            max_concurrency=int(os.getenv('JIRA_MAX_CONCURRENCY', '8')),
+            max_retries=int(os.getenv('JIRA_MAX_RETRIES', '5')),
+        )
+    return clients[key]
+
+async def aclose_jira_instances() -> None:
+    """Close the shared clients of the running event loop."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for jira in clients.values():
+        await jira.aclose()
+
+
+async def get_issue_fields(task_key: str, fields: list[str]) -> dict:
+    """Async `ramon.plugins.jira.get_issue_fields`, sharing its cache."""
+    key = _normalize_key(task_key)
+    fresh, to_revalidate, _ = issue_cache.plan([key], fields)
+    if key in fresh:
+        return fresh[key]
+    jira = get_async_jira_instance()
+    if to_revalidate:
+        issue = await jira.issue(task_key, ['updated'])
+        values = issue_cache.revalidate(key, fields, issue['fields'].get('updated'))
+        if values is not None:
+            return values
+    issue_fields = (await jira.issue(task_key, fields + ['updated']))['fields']
+    values = {field: _field_value(field, issue_fields.get(field)) for field in fields}
+    issue_cache.put(key, values, issue_fields.get('updated'))
+    return values
+
+async def get_task_status_in_jira(task_key: str) -> str:
+    return (await get_issue_fields(task_key, ['status']))['status']
+
+async def get_jira_issues(task_keys: list[str], fields: list[str] | None = None) -> dict[str, dict]:
+    """
+    Async `ramon.plugins.jira.get_jira_issues`. Pages after the first are
+    fetched concurrently once the first tells how many there are.
+    """
+    keys = list(dict.fromkeys(_normalize_key(key) for key in task_keys if key.strip()))
+    if not keys:
+        return {}
+    fields = fields or ['status', 'assignee']
+    issues, to_revalidate, to_fetch = issue_cache.plan(keys, fields)
+    jira = get_async_jira_instance()
+    if to_revalidate:
+        updated = await _search_issues(jira, to_revalidate, ['updated'])
+        for key in to_revalidate:
+            values = issue_cache.revalidate(key, fields, updated.get(key, {}).get('updated'))
+            if values is None:
+                to_fetch.append(key)
+            else:
+                issues[key] = values
+    if to_fetch:
+        for key, issue_fields in (await _search_issues(jira, to_fetch, fields + ['updated'])).items():
+            issues[key] = {field: _field_value(field, issue_fields.get(field)) for field in fields}
+            issue_cache.put(key, issues[key], issue_fields.get('updated'))
+    return {key: issues[key] for key in keys if key in issues}
+
+async def _search_issues(jira: AsyncJira, keys: list[str], fields: list[str], where: str | None = None) -> dict[str, dict]:
+    """Raw fields of the issues in `keys` matching the JQL condition `where`, if given."""
+    jql = f"key in ({', '.join(json.dumps(key) for key in keys)})"
+    if where:
+        jql = f"{jql} AND {where}"
+    first = await jira.search(jql, fields)
+    pages = [first]
+    page_size = len(first['issues'])
+    if page_size:
+        pages += await asyncio.gather(*(
+            jira.search(jql, fields, start_at=start_at, max_results=page_size)
+            for start_at in range(page_size, first.get('total', 0), page_size)
+        ))
+    return {issue['key']: issue.get('fields') or {} for page in pages for issue in page['issues']}
+
+async def get_jira_statuses(task_keys: list[str]) -> dict[str, str]:
+    issues = await get_jira_issues(task_keys, ['status'])
+    statuses = {}
+    for key in map(_normalize_key, task_keys):
+        statuses[key] = issues[key]['status'] if key in issues else 'Not found'
+    return statuses
+
+async def create_issue_in_jira(project_key: str, task: Task) -> tuple[bool, str]:
+    """Async `ramon.plugins.jira.create_issue_in_jira`."""
+    summary = task.task
+    description = task.description
+    priority = task.priority if task.priority else 'Medium'
+
+    if not project_key or not summary or not description:
+        print(f"Skipping task due to missing fields: {task}")
+        return (False, "")
+
+    try:
+        new_issue = await get_async_jira_instance().create_issue({
+            'project': {'key': project_key},
+            'summary': summary,
+            'description': description,
+            'issuetype': {'name': 'Task'},
+            'priority': {'name': priority},
+        })
+        print(f"Issue created: {new_issue['key']}")
+        return (True, new_issue['key'])
+    except httpx.HTTPError as e:
+        print(f"Failed to create issue: {task}. Error: {e}")
+        return (False, "")
+
+async def create_issues_in_jira(project_key: str, tasks: list[Task]) -> list[tuple[bool, str]]:
+    """
+    Async `ramon.plugins.jira.create_issues_in_jira`: chunks of
+    BULK_CREATE_SIZE are sent concurrently, within the client's limits.
+    """
+    jira = get_async_jira_instance()
+    results, pending = _bulk_create_plan(project_key, tasks)
+
+    async def create(chunk: list[tuple[int, dict]]) -> None:
+        try:
+            response = await jira.create_issues([fields for _, fields in chunk])
+        except httpx.HTTPError as e:
+            for i, _ in chunk:
+                results[i] = (False, f"Failed to create issue: {e}")
+            return
+        # Failures are numbered by their position in the request; `issues`
+        # lists the others in request order, possibly fewer than sent
+        errors = {error['failedElementNumber']: error for error in response.get('errors', [])}
+        succeeded = [i for n, (i, _) in enumerate(chunk) if n not in errors]
+        created = dict(zip(succeeded, response.get('issues', [])))
+        for n, (i, _) in enumerate(chunk):
+            if n in errors:
+                reasons = errors[n].get('elementErrors', {}).get('errors') or errors[n].get('elementErrors')
+                results[i] = (False, f"Failed to create issue: {reasons}")
+            elif i in created:
+                results[i] = (True, created[i]['key'])
+            else:
+                results[i] = (False, "No result from Jira")
+
+    await asyncio.gather(*(
+        create(pending[start:start + BULK_CREATE_SIZE]) for start in range(0, len(pending), BULK_CREATE_SIZE)
+    ))
+    return results
+
+async def get_task_assignee_in_jira(task_key: str) -> str:
+    return (await get_issue_fields(task_key, ['assignee']))['assignee']
+
+async def add_comment_to_jira_issue(task_key: str, comment: str) -> None:
+    await get_async_jira_instance().add_comment(task_key, comment)
+    issue_cache.invalidate(_normalize_key(task_key))
+
+async def load_comments_for_jira_issue(
+    task_key: str,
+    limit: int = COMMENTS_LIMIT,
+    since: str | None = None,
+    max_chars: int = COMMENT_MAX_CHARS,
+) -> list[str]:
+    """Async `ramon.plugins.jira.load_comments_for_jira_issue`."""
+    jira = get_async_jira_instance()
+    comments = []
+    while len(comments) < limit:
+        page = await jira.comments(task_key, _comments_page(len(comments), limit))
+        done, comments = _collect_comments(page, comments, limit, since, max_chars)
+        if done:
+            break
+    return comments
+
+async def open_jira_issue(task_key: str) -> None:
+    # Only starts the browser, nothing to wait for
+    sync_jira.open_jira_issue(task_key)
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0.0), MAX_RETRY_DELAY)
+    return random.uniform(0, min(MAX_RETRY_DELAY, 0.5 * 2 ** attempt))
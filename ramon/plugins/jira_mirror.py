@@ -0,0 +1,157 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+import httpx
+from ramon.models import DB_DIR, Database, atomic_write_json
+from ramon.plugins import jira_async
+from ramon.plugins.jira import _field_value, _normalize_key
+
+JIRA_REFERENCE = re.compile(r"JIRA Reference:\s*([A-Za-z][A-Za-z0-9_]*-\d+)")
+# Fields kept in the mirror; lookups asking for others go to JIRA
+MIRROR_FIELDS = ['status', 'assignee', 'priority', 'summary']
+# Margin added to the `updated` window so clock skew can't make us miss a change
+SYNC_OVERLAP_MINUTES = 2
+
+log = logging.getLogger(__name__)
+
+
+class SyncResult(NamedTuple):
+    linked: int
+    fetched: int
+    removed: int
+
+
+class JiraMirror:
+    """
+    Local copy of the fields in MIRROR_FIELDS of every JIRA issue referenced
+    in task metadata ("JIRA Reference: KEY"), in a JSON file under DB_DIR.
+
+    `sync` only asks JIRA for issues updated since the previous sync (plus
+    newly referenced ones), so its cost follows what changed. Lookups are
+    answered from the mirror while its last sync is under `max_age` seconds old.
+    """
+
+    def __init__(self, path: Path = DB_DIR / 'jira_mirror.json', max_age: Optional[float] = None):
+        self.path = path
+        self.max_age = max_age if max_age is not None else float(os.getenv('JIRA_MIRROR_MAX_AGE', '300'))
+        self._lock = threading.Lock()
+        self._state: dict = {'synced_at': None, 'issues': {}}
+        self._stat = None
+
+    def linked_keys(self, db: Database) -> list[str]:
+        keys = {}
+        for row in db.iter_tasks(fields=['metadata']):
+            for key in JIRA_REFERENCE.findall(row['metadata']):
+                keys[_normalize_key(key)] = None
+        return list(keys)
+
+    async def sync(self, db: Database) -> SyncResult:
+        keys = self.linked_keys(db)
+        state = self._read()
+        issues = state['issues']
+        started = time.time()
+        new = [key for key in keys if key not in issues]
+        known = [key for key in keys if key in issues]
+        searches = []
+        if new:
+            searches.append(self._fetch(new))
+        if known and state['synced_at']:
+            minutes = math.ceil((started - state['synced_at']) / 60) + SYNC_OVERLAP_MINUTES
+            searches.append(self._fetch(known, f'updated >= "-{minutes}m"'))
+        elif known:
+            searches.append(self._fetch(known))
+        fetched = {}
+        for found in await asyncio.gather(*searches):
+            fetched.update(found)
+
+        linked = set(keys)
+        mirrored = {key: values for key, values in issues.items() if key in linked}
+        mirrored.update(fetched)
+        self._write({'synced_at': started, 'issues': mirrored})
+        return SyncResult(len(keys), len(fetched), len(issues.keys() - linked))
+
+    def lookup(self, task_keys: list[str], fields: list[str]) -> dict[str, dict]:
+        """`fields` of the mirrored issues among `task_keys`; nothing if the mirror is stale."""
+        if any(field not in MIRROR_FIELDS for field in fields) or not self.is_fresh():
+            return {}
+        issues = self._read()['issues']
+        return {
+            key: {field: issues[key][field] for field in fields}
+            for key in map(_normalize_key, task_keys)
+            if key in issues
+        }
+
+    def is_fresh(self) -> bool:
+        synced_at = self._read()['synced_at']
+        return synced_at is not None and time.time() - synced_at <= self.max_age
+
+    async def _fetch(self, keys: list[str], where: Optional[str] = None) -> dict[str, dict]:
+        found = await jira_async._search_issues(jira_async.get_async_jira_instance(), keys, MIRROR_FIELDS, where)
+        return {key: {field: _field_value(field, fields.get(field)) for field in MIRROR_FIELDS} for key, fields in found.items()}
+
+    def _read(self) -> dict:
+        """The mirror as on disk, re-read only when the file changed (e.g. another `ramon sync-jira`)."""
+        with self._lock:
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                return self._state
+            key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            if key != self._stat:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._state = json.load(f)
+                self._stat = key
+            return self._state
+
+    def _write(self, state: dict) -> None:
+        with self._lock:
+            atomic_write_json(self.path, state)
+            self._state = state
+            stat = self.path.stat()
+            self._stat = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def start_background_sync(
+    mirror: JiraMirror,
+    db: Database,
+    interval: Optional[float] = None,
+    on_error: Optional[Callable[[Exception], None]] = None,
+) -> Callable[[], None]:
+    """
+    Sync `mirror` every `interval` seconds (half its max age by default) on
+    a daemon thread with its own event loop. Returns a function that stops it.
+
+    A failed sync is passed to `on_error` (logged by default) from that
+    thread and retried at the next interval.
+    """
+    interval = interval if interval is not None else mirror.max_age / 2
+    on_error = on_error or (lambda e: log.warning("JIRA sync failed: %s", e))
+    stop = threading.Event()
+
+    async def sync_forever() -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while not stop.is_set():
+                try:
+                    await mirror.sync(db)
+                except (httpx.HTTPError, OSError) as e:
+                    on_error(e)
+                await loop.run_in_executor(None, stop.wait, interval)
+        finally:
+            await jira_async.aclose_jira_instances()
+
+    thread = threading.Thread(target=asyncio.run, args=(sync_forever(),), daemon=True)
+    thread.start()
+
+    def stop_sync() -> None:
+        stop.set()
+        thread.join()
+
+    return stop_sync
@@ -0,0 +1,112 @@
+import os
+import threading
+from datetime import date
+from typing import Optional
+from .models import Database, StatusEnum, TaskColumns
+
+# Rough size of a token for English text, used instead of a tokenizer
+CHARS_PER_TOKEN = 4
+# Tasks due within this many days are listed right after overdue ones
+DUE_SOON_DAYS = 7
+OPEN_STATUSES = (StatusEnum.to_do, StatusEnum.blocked, StatusEnum.on_hold)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+class TaskPromptBuilder:
+    """
+    The "current tasks" section of the system prompt, kept under
+    `budget_tokens` (RAMON_PROMPT_TASK_TOKENS, default 4000) by listing tasks
+    in priority order: in progress, overdue, due within DUE_SOON_DAYS, other
+    open tasks, then the rest. Whatever doesn't fit is counted by status.
+
+    The rendered section is reused until the task db changes (see
+    `Database.data_version`) or the day does, so the prompt costs a few
+    stats per model request and its size stays flat as the backlog grows.
+    """
+
+    def __init__(self, budget_tokens: Optional[int] = None):
+        self.budget_tokens = budget_tokens if budget_tokens is not None else int(os.getenv('RAMON_PROMPT_TASK_TOKENS', '4000'))
+        self._lock = threading.Lock()
+        self._cached: Optional[tuple[tuple, str]] = None
+        self.builds = 0
+
+    def render(self, db: Database, today: Optional[date] = None) -> str:
+        today = today or date.today()
+        key = (db.data_version(), today, self.budget_tokens)
+        with self._lock:
+            if self._cached and self._cached[0] == key:
+                return self._cached[1]
+        text = render_tasks(db.columns(), self.budget_tokens, today)
+        with self._lock:
+            self._cached = (key, text)
+            self.builds += 1
+        return text
+
+
+def render_tasks(columns: TaskColumns, budget_tokens: int, today: date) -> str:
+    """Task lines by priority group, as many as fit in `budget_tokens`."""
+    groups = _prioritize(columns, today)
+    shown = [False] * len(columns)
+    parts: list[str] = []
+    used = 0
+    for title, rows in groups:
+        if not rows:
+            continue
+        header = f"{title}:\n"
+        cost = estimate_tokens(header)
+        lines = []
+        for i in rows:
+            line = f"- {columns.titles[i]} (ID: {columns.ids[i]}, Owner: {columns.owners[i]}), due {columns.due_dates[i]}\n"
+            line_cost = estimate_tokens(line)
+            if used + cost + line_cost > budget_tokens:
+                break
+            lines.append(line)
+            cost += line_cost
+            shown[i] = True
+        if not lines:
+            break
+        parts += [header, *lines]
+        used += cost
+        if len(lines) < len(rows):
+            break
+    left_out: dict[str, int] = {}
+    for i, status in enumerate(columns.statuses):
+        if not shown[i]:
+            left_out[status] = left_out.get(status, 0) + 1
+    if left_out:
+        counts = ", ".join(f"{count} {StatusEnum(status).value}" for status, count in left_out.items())
+        parts.append(
+            f"Not shown: {sum(left_out.values())} more tasks ({counts}); use search_tasks or get_tasks to look them up.\n"
+        )
+    return "".join(parts)
+
+
+def _prioritize(columns: TaskColumns, today: date) -> list[tuple[str, list[int]]]:
+    today_ordinal = today.toordinal()
+    soon = today_ordinal + DUE_SOON_DAYS
+    due = columns.due
+
+    def by_due(rows: list[int]) -> list[int]:
+        # Undated tasks (ordinal 0) last, otherwise in file order
+        return sorted(rows, key=lambda i: due[i] or float('inf'))
+
+    in_progress = columns.where(status=[StatusEnum.in_progress])
+    overdue, due_soon, other_open = [], [], []
+    for i in columns.where(status=list(OPEN_STATUSES)):
+        if 0 < due[i] < today_ordinal:
+            overdue.append(i)
+        elif 0 < due[i] <= soon:
+            due_soon.append(i)
+        else:
+            other_open.append(i)
+    rest = columns.where(status=[StatusEnum.completed, StatusEnum.canceled])
+    return [
+        ("In progress", by_due(in_progress)),
+        ("Overdue", by_due(overdue)),
+        ("Due soon", by_due(due_soon)),
+        ("Other open tasks", by_due(other_open)),
+        ("Completed or canceled", rest),
+    ]
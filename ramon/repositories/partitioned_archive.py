@@ -0,0 +1,123 @@
+import json
+from datetime import date
+from pathlib import Path
+from typing import Iterable, List, Optional
+from ramon.models import Task, atomic_write, atomic_write_json, decode_tasks, encode_tasks
+
+UNDATED = "0000-00"
+
+
+class PartitionedArchive:
+    """
+    Archived tasks split into one JSON file per archive month under
+    `directory`, plus a `manifest.json` listing the partitions, their sizes
+    and which partition holds each task id.
+
+    Archiving only rewrites the current month's partition (or the ones the
+    manifest says already hold the tasks) and the manifest, and readers that only care about
+    recent history load just the partitions from the month of `since` onwards.
+    """
+
+    def __init__(self, directory: Path, indent: Optional[int] = 4):
+        self.directory = directory
+        self.indent = indent
+        self.manifest_file = directory / "manifest.json"
+        self._partitions: dict[str, tuple[tuple, List[Task]]] = {}
+
+    def partitions(self) -> List[dict]:
+        return self._read_manifest()["partitions"]
+
+    def load(self, since: Optional[str] = None) -> List[Task]:
+        """Tasks of every partition archived in the month of `since` (YYYY-MM-DD) or later."""
+        tasks: List[Task] = []
+        for name in self._partition_names(since):
+            tasks.extend(self._load_partition(name))
+        return tasks
+
+    def partition_files(self, since: Optional[str] = None) -> List[Path]:
+        return [self._partition_file(name) for name in self._partition_names(since)]
+
+    def append(self, tasks: Iterable[Task], month: Optional[str] = None) -> None:
+        """
+        Upsert `tasks` into the partition of `month` (the current month by
+        default). Tasks already in another partition would end up in both, see `upsert`.
+        """
+        self._upsert_partition(month or date.today().strftime("%Y-%m"), list(tasks))
+
+    def upsert(self, tasks: Iterable[Task]) -> None:
+        """Update tasks in whatever partition holds them; new ones go to the current month."""
+        owners = self._owners(self._read_manifest())
+        current = date.today().strftime("%Y-%m")
+        by_partition: dict[str, dict[str, Task]] = {}
+        for task in tasks:
+            by_partition.setdefault(owners.get(task.id, current), {})[task.id] = task
+        for name, found in sorted(by_partition.items()):
+            self._upsert_partition(name, list(found.values()))
+
+    def import_tasks(self, tasks: Iterable[Task]) -> None:
+        """Import tasks archived before partitioning, by completion (or due) month."""
+        by_month: dict[str, List[Task]] = {}
+        for task in tasks:
+            by_month.setdefault(_month_of(task), []).append(task)
+        for month, month_tasks in sorted(by_month.items()):
+            self._upsert_partition(month, month_tasks)
+
+    def _read_manifest(self) -> dict:
+        if not self.manifest_file.exists():
+            return {"partitions": [], "ids": {}}
+        with open(self.manifest_file, "r", encoding='utf-8') as f:
+            return json.load(f)
+
+    def _owners(self, manifest: dict) -> dict[str, str]:
+        """Task id -> name of the partition holding it."""
+        if "ids" in manifest:
+            return manifest["ids"]
+        # Written before the manifest tracked ids: read them once, the next write saves them
+        return {
+            task.id: partition["name"]
+            for partition in manifest["partitions"] for task in self._load_partition(partition["name"])
+        }
+
+    def _partition_names(self, since: Optional[str]) -> List[str]:
+        first = since[:7] if since else None
+        return [p["name"] for p in self.partitions() if first is None or p["name"] >= first]
+
+    def _partition_file(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def _load_partition(self, name: str) -> List[Task]:
+        path = self._partition_file(name)
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        cached = self._partitions.get(name)
+        if cached and cached[0] == key:
+            return cached[1]
+        with open(path, "rb") as f:
+            tasks = decode_tasks(f.read())
+        self._partitions[name] = (key, tasks)
+        return tasks
+
+    def _upsert_partition(self, name: str, tasks: List[Task]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = self._read_manifest()
+        partitions = {partition["name"]: partition for partition in manifest["partitions"]}
+        owners = self._owners(manifest)
+        exists = self._partition_file(name).exists()
+        by_id = {task.id: task for task in self._load_partition(name)} if exists else {}
+        for task in tasks:
+            by_id[task.id] = task
+        # The partition goes first: a crash before the manifest update leaves a
+        # stale count or an unlisted file, never a manifest entry without data.
+        atomic_write(self._partition_file(name), encode_tasks(by_id.values(), self.indent))
+        partitions[name] = {"name": name, "file": self._partition_file(name).name, "count": len(by_id)}
+        owners.update(dict.fromkeys(by_id, name))
+        atomic_write_json(self.manifest_file, {"partitions": [partitions[key] for key in sorted(partitions)], "ids": owners})
+
+
+def _month_of(task: Task) -> str:
+    for value in (task.completed_at, task.due_date):
+        try:
+            return date.fromisoformat(value[:10]).strftime("%Y-%m")
+        except ValueError:
+            continue
+    return UNDATED
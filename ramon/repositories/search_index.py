@@ -0,0 +1,199 @@
+import hashlib
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from enum import Enum
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+from ramon.models import StatusEnum, Task, TaskColumns, _dumps, _loads, atomic_write
+
+# Text that is searched; words of the title count TITLE_WEIGHT times
+SEARCH_FIELDS = ["task", "description", "owner", "metadata"]
+TITLE_WEIGHT = 2
+# Returned with each hit, so a search never needs the task file
+STORED_FIELDS = TaskColumns.FIELDS
+FORMAT_VERSION = 1
+# Removals that scan the postings before building the id -> terms map instead
+SCANNED_REMOVALS = 32
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+class SearchIndex:
+    """
+    Inverted index over the `SEARCH_FIELDS` of a task list, ranked with BM25
+    and persisted in `path`. `version` is the `Database.data_version` of the
+    tasks it reflects, so a process can tell whether the file is current
+    without reading the tasks.
+
+    Each task is stored with a fingerprint of its indexed and stored fields:
+    `sync` re-tokenizes only the tasks that changed since. Changes are only
+    made in memory; `dirty` tells whether they still need a `save`.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    FIELDS = ["id", *dict.fromkeys([*SEARCH_FIELDS, *STORED_FIELDS[1:]])]
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.version: Optional[tuple] = None
+        self._docs: dict[str, dict] = {}
+        self._lengths: dict[str, int] = {}
+        self._fingerprints: dict[str, str] = {}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._total_length = 0
+        self.dirty = False
+        # id -> its terms, only built once enough tasks were removed
+        self._terms: Optional[dict[str, List[str]]] = None
+        self._scanned_removals = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        """The index saved in `path`, or an empty one if there is none (or it is unreadable)."""
+        index = cls(path)
+        try:
+            data = _loads(path.read_bytes())
+        except (FileNotFoundError, ValueError):
+            return index
+        if data.get("format") != FORMAT_VERSION:
+            return index
+        index.version = _freeze(data["version"])
+        index._docs = data["docs"]
+        index._lengths = data["lengths"]
+        index._fingerprints = data["fingerprints"]
+        index._postings = data["postings"]
+        index._total_length = sum(index._lengths.values())
+        return index
+
+    def save(self) -> None:
+        atomic_write(self.path, _dumps({
+            "format": FORMAT_VERSION,
+            "version": self.version,
+            "docs": self._docs,
+            "lengths": self._lengths,
+            "fingerprints": self._fingerprints,
+            "postings": self._postings,
+        }))
+        self.dirty = False
+
+    def upsert(self, tasks: Iterable[Union[Task, dict]]) -> int:
+        """Index `tasks` (or `Database.iter_tasks` dicts with `FIELDS`); returns how many changed."""
+        changed = 0
+        for task in tasks:
+            row = _row(task)
+            fingerprint = _fingerprint(row)
+            if self._fingerprints.get(row["id"]) == fingerprint:
+                continue
+            changed += 1
+            self.remove(row["id"])
+            self._add(row, fingerprint)
+        return changed
+
+    def remove(self, task_id: str) -> None:
+        if task_id not in self._docs:
+            return
+        self.dirty = True
+        if self._terms is None and self._scanned_removals < SCANNED_REMOVALS:
+            self._scanned_removals += 1
+            terms = [term for term, postings in self._postings.items() if task_id in postings]
+        else:
+            terms = self._doc_terms().pop(task_id, [])
+        for term in terms:
+            postings = self._postings[term]
+            del postings[task_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(task_id)
+        del self._docs[task_id], self._fingerprints[task_id]
+
+    def sync(self, tasks: Iterable[Union[Task, dict]]) -> int:
+        """Make the index match `tasks` exactly; returns how many tasks were added, changed or removed."""
+        seen: set[str] = set()
+
+        def rows():
+            for task in tasks:
+                seen.add(task["id"] if isinstance(task, dict) else task.id)
+                yield task
+
+        changed = self.upsert(rows())
+        gone = [task_id for task_id in self._docs if task_id not in seen]
+        for task_id in gone:
+            self.remove(task_id)
+        return changed + len(gone)
+
+    def search(self, query: str, status: Optional[List[str]] = None, limit: int = 10) -> List[dict]:
+        """
+        The `limit` best matches for the words of `query`, as dicts with the
+        `STORED_FIELDS` of the task and its `score`, best first.
+        """
+        if not self._docs:
+            return []
+        statuses = {s.value if isinstance(s, StatusEnum) else s for s in status} if status else None
+        average_length = self._total_length / len(self._docs) or 1
+        scores: dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (len(self._docs) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for task_id, frequency in postings.items():
+                norm = self.K1 * (1 - self.B + self.B * self._lengths[task_id] / average_length)
+                scores[task_id] += idf * frequency * (self.K1 + 1) / (frequency + norm)
+        if statuses is not None:
+            scores = {task_id: score for task_id, score in scores.items() if self._docs[task_id]["status"] in statuses}
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [{**self._docs[task_id], "score": round(score, 3)} for task_id, score in best]
+
+    def _add(self, row: dict, fingerprint: str) -> None:
+        task_id = row["id"]
+        self.dirty = True
+        words = tokenize(row["task"]) * TITLE_WEIGHT
+        for field in SEARCH_FIELDS[1:]:
+            words += tokenize(row[field])
+        frequencies = Counter(words)
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[task_id] = frequency
+        if self._terms is not None:
+            self._terms[task_id] = list(frequencies)
+        self._docs[task_id] = {field: row[field] for field in STORED_FIELDS}
+        self._lengths[task_id] = len(words)
+        self._fingerprints[task_id] = fingerprint
+        self._total_length += len(words)
+
+    def _doc_terms(self) -> dict[str, List[str]]:
+        if self._terms is None:
+            self._terms = defaultdict(list)
+            for term, postings in self._postings.items():
+                for task_id in postings:
+                    self._terms[task_id].append(term)
+        return self._terms
+
+
+def _row(task: Union[Task, dict]) -> dict:
+    if isinstance(task, dict):
+        row = {field: task.get(field, "") for field in SearchIndex.FIELDS}
+        row["status"] = row["status"] or StatusEnum.to_do.value
+    else:
+        row = {field: getattr(task, field) for field in SearchIndex.FIELDS}
+    if isinstance(row["status"], Enum):
+        row["status"] = row["status"].value
+    return row
+
+
+def _fingerprint(row: dict) -> str:
+    text = "\x1f".join(row[field] for field in SearchIndex.FIELDS)
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def _freeze(value):
+    # Versions are tuples of stat tuples, saved as JSON lists
+    return tuple(map(_freeze, value)) if isinstance(value, list) else value
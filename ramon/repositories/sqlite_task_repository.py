@@ -0,0 +1,166 @@
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Union
+from ramon.models import StatusEnum, Task
+from ramon.repositories.task_repository import TaskRepository
+
+TABLES = ("tasks", "archived_tasks")
+COLUMNS = tuple(Task.model_fields)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id TEXT PRIMARY KEY,
+    task TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    description TEXT NOT NULL,
+    due_date TEXT NOT NULL,
+    completed_at TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS {table}_status_idx ON {table} (status);
+CREATE INDEX IF NOT EXISTS {table}_owner_idx ON {table} (owner);
+CREATE INDEX IF NOT EXISTS {table}_due_date_idx ON {table} (due_date);
+"""
+
+
+class SqliteTaskRepository(TaskRepository):
+    """
+    SQLite storage for tasks. `tasks` and `archived_tasks` are two tables with
+    the same columns as `Task`, indexed on status, owner and due_date.
+    Rows are returned in insertion order (rowid), like the JSON files.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._schema_ready = False
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path)
+        try:
+            if not self._schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                for table in TABLES:
+                    conn.executescript(SCHEMA.format(table=table))
+                self._schema_ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def read_tasks(self, db: str = "tasks", status: Optional[List[str]] = None) -> List[Task]:
+        return self.query(db, status=status)
+
+    def get(self, task_id: str, db: str = "tasks") -> Optional[Task]:
+        table = _table(db)
+        with self.connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM {table} WHERE id = ?", (task_id,)).fetchone()
+        return Task(**dict(zip(COLUMNS, row))) if row else None
+
+    def query(
+        self,
+        db: str = "tasks",
+        status: Optional[List[str]] = None,
+        owner: Optional[str] = None,
+        due_before: Optional[str] = None,
+    ) -> List[Task]:
+        return list(self.iter_tasks(db, status=status, owner=owner, due_before=due_before))
+
+    def iter_tasks(
+        self,
+        db: str = "tasks",
+        status: Optional[List[str]] = None,
+        owner: Optional[str] = None,
+        due_before: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[Union[Task, dict]]:
+        """Matching rows fetched lazily from a cursor; dicts with only `fields` when given."""
+        table = _table(db)
+        columns = [column for column in COLUMNS if column in fields] if fields else list(COLUMNS)
+        clauses, params = [], []
+        if status:
+            clauses.append(f"status IN ({', '.join('?' for _ in status)})")
+            params.extend(s.value if isinstance(s, StatusEnum) else s for s in status)
+        if owner is not None:
+            clauses.append("owner = ?")
+            params.append(owner)
+        if due_before is not None:
+            clauses.append("due_date != '' AND due_date < ?")
+            params.append(due_before)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.connect() as conn:
+            rows = conn.execute(f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY rowid", params)
+            for row in rows:
+                yield dict(zip(columns, row)) if fields else Task(**dict(zip(columns, row)))
+
+    def write_tasks(self, tasks: List[Task], db: str = "tasks") -> None:
+        table = _table(db)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in COLUMNS if column != "id")
+        sql = (
+            f"INSERT INTO {table} ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}"
+        )
+        with self.connect() as conn:
+            conn.executemany(sql, [_row(task) for task in tasks])
+
+    def archive_task(self, task_id: str, db: str = "tasks") -> None:
+        self.archive_tasks([task_id], db)
+
+    def archive_tasks(self, selection: Union[Iterable[str], Callable[[Task], bool]], db: str = "tasks") -> List[Task]:
+        """Move the selected tasks (ids or a predicate) to archived_tasks in one transaction."""
+        source = _table(db)
+        columns = ", ".join(COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in COLUMNS if column != "id")
+        with self.connect() as conn:
+            if callable(selection):
+                rows = conn.execute(f"SELECT {columns} FROM {source} ORDER BY rowid")
+                to_archive = [task for task in (Task(**dict(zip(COLUMNS, row))) for row in rows) if selection(task)]
+            else:
+                rows = (
+                    conn.execute(f"SELECT {columns} FROM {source} WHERE id = ?", (task_id,)).fetchone()
+                    for task_id in dict.fromkeys(selection)
+                )
+                to_archive = [Task(**dict(zip(COLUMNS, row))) for row in rows if row]
+            conn.executemany(
+                f"INSERT INTO archived_tasks ({columns}) VALUES ({', '.join('?' for _ in COLUMNS)}) "
+                f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                [_row(task) for task in to_archive],
+            )
+            conn.executemany(f"DELETE FROM {source} WHERE id = ?", [(task.id,) for task in to_archive])
+        return to_archive
+
+    def import_tasks(self, tasks: List[Task], db: str = "tasks") -> None:
+        """Replace the content of `db` with `tasks` in a single transaction."""
+        table = _table(db)
+        with self.connect() as conn:
+            conn.execute(f"DELETE FROM {table}")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+                [_row(task) for task in tasks],
+            )
+
+    def get_tasks(self) -> List[Task]:
+        return self.read_tasks()
+
+    def add_task(self, task: Task) -> None:
+        self.write_tasks([task])
+
+    def get_completed_tasks(self) -> List[Task]:
+        return self.read_tasks("archived_tasks")
+
+    def add_completed_task(self, task: Task) -> None:
+        self.write_tasks([task], "archived_tasks")
+
+
+def _table(db: str) -> str:
+    if db not in TABLES:
+        raise ValueError(f"Unknown db '{db}', expected one of {', '.join(TABLES)}")
+    return db
+
+
+def _row(task: Task) -> tuple:
+    data = task.model_dump(mode="json")
+    return tuple(data[column] for column in COLUMNS)
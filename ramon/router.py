@@ -0,0 +1,142 @@
+import datetime
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, NamedTuple, Optional
+from pydantic_ai.messages import Message, ModelTextResponse, UserPrompt
+from .models import Database, StatusEnum, summarize_tasks
+
+
+@dataclass
+class Intent:
+    """
+    A formulaic request answered without the model. `patterns` must match the
+    whole normalized prompt (see `normalize`); `handle` gets the match and
+    returns the reply, or None to hand the prompt to the agent after all.
+    """
+
+    name: str
+    patterns: list[re.Pattern]
+    handle: Callable[[Database, re.Match], Optional[str]]
+
+
+class Routed(NamedTuple):
+    intent: str
+    reply: str
+
+    def messages(self, prompt: str) -> list[Message]:
+        """The exchange as history, so the agent knows about it on later turns."""
+        return [UserPrompt(prompt), ModelTextResponse(self.reply)]
+
+
+class RouterStats(NamedTuple):
+    hits: int
+    misses: int
+    routed_seconds: float
+    agent_seconds: float
+
+    @property
+    def hit_rate(self) -> float:
+        prompts = self.hits + self.misses
+        return self.hits / prompts if prompts else 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        """Estimated time saved: routed prompts at the average agent turn, minus routing them."""
+        if not self.misses:
+            return 0.0
+        return self.hits * self.agent_seconds / self.misses - self.routed_seconds
+
+
+def normalize(prompt: str) -> str:
+    # Case is kept for task ids, patterns ignore it
+    return " ".join(prompt.split()).rstrip("?!. ")
+
+
+def _work_on(db: Database, match: re.Match) -> str:
+    # Same as `ramon summary --smart`
+    return summarize_tasks(db.columns(status=["to_do", "in_progress"]), smart=True)
+
+
+def _summary(db: Database, match: re.Match) -> str:
+    return summarize_tasks(db.columns())
+
+
+def _archive_completed(db: Database, match: re.Match) -> str:
+    archived = db.archive_tasks(lambda task: task.status == "completed")
+    return f"Archived {len(archived)} completed tasks."
+
+
+def _complete(db: Database, match: re.Match) -> Optional[str]:
+    reference = match["task"].strip("'\"")
+    task = db.get(reference)
+    if task is None:
+        named = [task for task in db.iter_tasks() if task.task.lower() == reference.lower()]
+        if len(named) != 1:
+            return None  # unknown or ambiguous: let the agent work it out
+        task = named[0]
+    db.write_tasks([task.model_copy(update={
+        "status": StatusEnum.completed,
+        "completed_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    })])
+    return f"Marked '{task.task}' (ID: {task.id}) as completed."
+
+
+INTENTS = [
+    Intent("work_on", [
+        re.compile(r"(?i)what (do|should) i (need to )?work on( today| now| next)?"),
+        re.compile(r"(?i)what('s| is) (on my plate|next)( today)?"),
+    ], _work_on),
+    Intent("summary", [
+        re.compile(r"(?i)(show( me)? )?(a |the |my )?(task )?summary( of (my |the )?tasks)?"),
+        re.compile(r"(?i)summari[sz]e (my |the )?tasks"),
+    ], _summary),
+    Intent("archive_completed", [
+        re.compile(r"(?i)archive (all )?(the |my )?(completed|done) tasks"),
+    ], _archive_completed),
+    Intent("complete", [
+        re.compile(r"(?i)(mark|set) (task )?(?P<task>.+?) (as )?(completed|complete|done)"),
+        re.compile(r"(?i)(complete|finish) task (?P<task>.+)"),
+    ], _complete),
+]
+
+
+class IntentRouter:
+    """
+    Answers the prompts matching one of `intents` directly from the task
+    database, skipping the model round trip. RAMON_ROUTER_INTENTS picks
+    the intents by name (comma separated, all by default, "none" to
+    route nothing). Only whole-prompt matches are routed; anything else, or
+    anything an intent can't resolve unambiguously, goes to the agent.
+    """
+
+    def __init__(self, intents: Optional[list[Intent]] = None):
+        if intents is None:
+            names = os.getenv("RAMON_ROUTER_INTENTS", "").strip()
+            enabled = None if not names else {name.strip() for name in names.split(",")}
+            intents = [intent for intent in INTENTS if enabled is None or intent.name in enabled]
+        self.intents = intents
+        self._hits = self._misses = 0
+        self._routed_seconds = self._agent_seconds = 0.0
+
+    def route(self, prompt: str, db: Database) -> Optional[Routed]:
+        start = time.perf_counter()
+        text = normalize(prompt)
+        for intent in self.intents:
+            for pattern in intent.patterns:
+                if match := pattern.fullmatch(text):
+                    reply = intent.handle(db, match)
+                    if reply is not None:
+                        self._hits += 1
+                        self._routed_seconds += time.perf_counter() - start
+                        return Routed(intent.name, reply)
+        self._misses += 1
+        return None
+
+    def record_agent_turn(self, seconds: float) -> None:
+        """Time taken by a prompt the router passed on, for the savings estimate."""
+        self._agent_seconds += seconds
+
+    def stats(self) -> RouterStats:
+        return RouterStats(self._hits, self._misses, self._routed_seconds, self._agent_seconds)
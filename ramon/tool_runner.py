@@ -0,0 +1,46 @@
+import asyncio
+import inspect
+import os
+from typing import Any, Callable, Optional
+
+
+class ToolRunner:
+    """
+    Runs the tool calls of the agent. pydantic_ai starts every call of a
+    model response at once; this keeps at most `max_concurrency` of them
+    (RAMON_TOOL_CONCURRENCY, default 8) running, moves sync tools to threads
+    so they overlap with the rest instead of blocking the event loop, and
+    orders the calls that write the task database: a write waits for every
+    call that started before it, and calls started after it wait for it. So
+    reads overlap with each other, and results match running the calls one
+    by one in the order the model gave them.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max_concurrency or int(os.getenv('RAMON_TOOL_CONCURRENCY', '8'))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._last_write: Optional[asyncio.Future] = None
+        self._since_write: set[asyncio.Future] = set()
+
+    async def run(self, call: Callable[[], Any], writes: bool = False, on_start: Optional[Callable[[], None]] = None) -> Any:
+        """Run `call` (sync or async, without arguments) once the calls it must follow are done."""
+        done = asyncio.get_running_loop().create_future()
+        # No await before this point: calls are ordered as they arrive
+        after = [self._last_write] if self._last_write else []
+        if writes:
+            after += self._since_write
+            self._last_write, self._since_write = done, set()
+        else:
+            self._since_write.add(done)
+        try:
+            if after:
+                await asyncio.wait(after)
+            async with self._semaphore:
+                if on_start:
+                    on_start()
+                if inspect.iscoroutinefunction(call):
+                    return await call()
+                return await asyncio.to_thread(call)
+        finally:
+            done.set_result(None)
+            self._since_write.discard(done)
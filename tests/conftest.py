@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import patch
+from ramon.models import Task, StatusEnum
+from ramon.plugins import jira_async
+from ramon.plugins.jira import issue_cache
+from tests.jira_server import JiraStandIn
+
+def make_task(id: str, **fields) -> Task:
+    """A task with every field filled in; pass only the ones a test cares about."""
+    return Task(**{
+        "id": id,
+        "task": f"Task {id}",
+        "owner": "User",
+        "priority": "medium",
+        "description": "Details",
+        "due_date": "2024-03-20",
+        "completed_at": "",
+        "metadata": "",
+        "status": StatusEnum.to_do,
+        **fields,
+    })
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'  # the Jira client and the agent use asyncio primitives, like pydantic_ai
+
+@pytest.fixture
+def jira_server():
+    """A Jira stand-in with no issues, which the Jira plugins are pointed at."""
+    server = JiraStandIn().start()
+    with patch.dict('os.environ', {'JIRA_SERVER': server.url, 'JIRA_EMAIL': 'test@example.com', 'JIRA_TOKEN': 'test-token'}):
+        yield server
+    server.stop()
+
+@pytest.fixture
+async def close_clients():
+    issue_cache.clear()
+    yield
+    await jira_async.aclose_jira_instances()
+    issue_cache.clear()
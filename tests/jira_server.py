@@ -0,0 +1,292 @@
+"""
+A local stand-in for the parts of the JIRA REST API ramon uses, served over
+real HTTP on 127.0.0.1 so both JIRA clients are tested end to end, and
+loaded by `benchmarks.bench_jira`. It can also be run on its own:
+
+    uv run python -m tests.jira_server --port 8080 --issues 1000 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ISSUE_PATH = re.compile(r'^/rest/api/2/issue/([^/]+)$')
+COMMENT_PATH = re.compile(r'^/rest/api/2/issue/([^/]+)/comment$')
+PROJECT_PATH = re.compile(r'^/rest/api/2/project/([^/]+)$')
+FIELDS = ('summary', 'description', 'status', 'assignee', 'priority', 'comment', 'updated')
+JQL_KEYS = re.compile(r'key in \(([^)]*)\)')
+JQL_UPDATED = re.compile(r'updated >= "-(\d+)m"')
+
+
+class JiraStandIn:
+    """
+    In-memory issues behind a threaded HTTP server. `latency` (seconds) is
+    added to every response, plus up to `jitter` more at random. A share
+    `error_rate` of the requests fail with 500, and `rate_limit_rate` with
+    429 and `retry_after`. `requests` records (method, path),
+    `max_in_flight` the most requests handled at the same time and
+    `connections` the TCP connections opened by clients.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: str = '0',
+        port: int = 0,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.issues: dict[str, dict] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._next_id = 1
+        self._rate_limited = 0
+        self._retry_after = retry_after
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def add_issue(self, key: str, status: str = 'To Do', assignee: str | None = None, **fields) -> dict:
+        issue = {
+            'key': key,
+            'fields': {
+                'status': {'name': status},
+                'assignee': {'displayName': assignee} if assignee else None,
+                'comment': {'comments': []},
+                'updated': _now(),
+                **fields,
+            },
+        }
+        self.issues[key] = issue
+        return issue
+
+    def add_comment(self, key: str, body: str, author: str = 'Ramon', created: str | None = None) -> dict:
+        comment = {'author': {'displayName': author}, 'body': body, 'created': created or _now()}
+        fields = self.issues[key]['fields']
+        fields['comment']['comments'].append(comment)
+        fields['updated'] = _now()
+        return comment
+
+    def add_issues(self, project: str, count: int, comments: int = 0) -> list[str]:
+        """`count` issues `PROJECT-1`... with `comments` comments each, for load tests."""
+        keys = [f'{project}-{n}' for n in range(1, count + 1)]
+        for key in keys:
+            self.add_issue(key, status='In Progress', assignee='John Doe', summary=f'Issue {key}', priority={'name': 'Medium'})
+            for n in range(comments):
+                self.add_comment(key, f'Comment {n} on {key}')
+        return keys
+
+    def rate_limit(self, requests: int, retry_after: str = '0') -> None:
+        """Answer the next `requests` requests with 429 and this Retry-After."""
+        self._rate_limited, self._retry_after = requests, retry_after
+
+    def _fault(self) -> int | None:
+        """The status of an injected failure for the next request, if any."""
+        with self._lock:
+            if self._rate_limited > 0:
+                self._rate_limited -= 1
+                return 429
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+    def _create(self, fields: dict) -> dict:
+        with self._lock:
+            # The `jira` library sends the project id, looked up by key (the same here)
+            project = fields['project'].get('key') or fields['project']['id']
+            key = f"{project}-{self._next_id}"
+            self._next_id += 1
+        self.add_issue(key, summary=fields['summary'], description=fields['description'])
+        return {'id': key, 'key': key}
+
+    def update_issue(self, key: str, **fields) -> None:
+        """Change an issue like someone else would, bumping `updated`."""
+        self.issues[key]['fields'].update(fields, updated=_now())
+
+    def start(self) -> 'JiraStandIn':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, method: str, path: str, query: dict, body) -> tuple[int, object]:
+        if method == 'GET' and path == '/rest/api/2/serverInfo':
+            # The `jira` library asks once per client
+            return 200, {'baseUrl': self.url, 'version': '1001.0.0', 'versionNumbers': [1001, 0, 0], 'deploymentType': 'Cloud'}
+        if method == 'GET' and path == '/rest/api/2/field':
+            return 200, [
+                {'id': field, 'key': field, 'name': field.capitalize(), 'custom': False, 'clauseNames': [field]}
+                for field in FIELDS
+            ]
+        if method == 'GET' and (match := PROJECT_PATH.match(path)):
+            return 200, {'id': match[1], 'key': match[1], 'name': match[1]}
+        if method == 'GET' and (match := ISSUE_PATH.match(path)):
+            issue = self.issues.get(match[1].upper())
+            if not issue:
+                return 404, {'errorMessages': ['Issue does not exist or you do not have permission to see it.']}
+            fields = query.get('fields', [''])[0].split(',')
+            return 200, _project(issue, fields)
+        if method == 'POST' and path == '/rest/api/2/search':
+            keys = re.findall(r'"([^"]+)"', JQL_KEYS.search(body['jql'])[1])
+            matches = [self.issues[key] for key in keys if key in self.issues]
+            if updated := JQL_UPDATED.search(body['jql']):
+                since = datetime.now(timezone.utc) - timedelta(minutes=int(updated[1]))
+                matches = [issue for issue in matches if _parse(issue['fields']['updated']) >= since]
+            start, size = body.get('startAt', 0), min(body.get('maxResults', 50), 100)
+            page = [_project(issue, body.get('fields', [])) for issue in matches[start:start + size]]
+            return 200, {'startAt': start, 'maxResults': size, 'total': len(matches), 'issues': page}
+        if (match := COMMENT_PATH.match(path)) and match[1].upper() not in self.issues:
+            return 404, {'errorMessages': ['Issue does not exist']}
+        if method == 'GET' and match:
+            comments = self.issues[match[1].upper()]['fields']['comment']['comments']
+            if query.get('orderBy', [''])[0] == '-created':
+                comments = sorted(comments, key=lambda comment: comment['created'], reverse=True)
+            start, size = int(query.get('startAt', ['0'])[0]), min(int(query.get('maxResults', ['50'])[0]), 100)
+            return 200, {'startAt': start, 'maxResults': size, 'total': len(comments), 'comments': comments[start:start + size]}
+        if method == 'POST' and match:
+            return 201, self.add_comment(match[1].upper(), body['body'])
+        if method == 'POST' and path == '/rest/api/2/issue':
+            return 201, self._create(body['fields'])
+        if method == 'POST' and path == '/rest/api/2/issue/bulk':
+            issues, errors = [], []
+            for n, update in enumerate(body['issueUpdates']):
+                if len(update['fields'].get('summary', '')) <= 255:
+                    issues.append(self._create(update['fields']))
+                else:
+                    errors.append({
+                        'status': 400,
+                        'failedElementNumber': n,
+                        'elementErrors': {'errorMessages': [], 'errors': {'summary': 'Summary must be less than 255 characters.'}},
+                    })
+            return (201 if issues else 400), {'issues': issues, 'errors': errors}
+        return 404, {'errorMessages': [f'No stand-in for {method} {path}']}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f+0000')
+
+
+def _parse(timestamp: str) -> datetime:
+    return datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%S.%f%z')
+
+
+def _project(issue: dict, fields: list[str]) -> dict:
+    return {'key': issue['key'], 'fields': {field: issue['fields'].get(field) for field in fields if field}}
+
+
+def _handler(server: JiraStandIn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like JIRA Cloud
+        # Send headers and body in one write, or delayed ACKs add ~40ms per response
+        wbufsize = 64 * 1024
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with server._lock:
+                server.connections += 1
+
+        def do_GET(self):
+            self._respond('GET')
+
+        def do_POST(self):
+            self._respond('POST')
+
+        def _respond(self, method: str) -> None:
+            url = urlparse(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+            with server._lock:
+                server.requests.append((method, url.path))
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                delay = server.latency + server.jitter * server._random.random()
+            fault = server._fault()
+            headers = {'Content-Type': 'application/json'}
+            try:
+                time.sleep(delay)
+                if fault == 429:
+                    status, payload = 429, {'errorMessages': ['Rate limit exceeded']}
+                    headers['Retry-After'] = server._retry_after
+                elif fault:
+                    status, payload = fault, {'errorMessages': ['Injected failure']}
+                else:
+                    try:
+                        status, payload = server.handle(method, url.path, parse_qs(url.query), body)
+                    except (KeyError, TypeError, ValueError) as e:
+                        status, payload = 400, {'errorMessages': [f'Bad request: {e!r}']}
+            finally:
+                with server._lock:
+                    server.in_flight -= 1
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--project", default="LOAD")
+    parser.add_argument("--issues", type=int, default=1_000)
+    parser.add_argument("--comments", type=int, default=5, help="comments per issue")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many more seconds at random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--retry-after", default="1", help="Retry-After of the 429s")
+    args = parser.parse_args()
+
+    server = JiraStandIn(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        port=args.port,
+    )
+    server.add_issues(args.project, args.issues, args.comments)
+    print(f"Serving {args.issues} {args.project} issues on {server.url}, Ctrl-C to stop")
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
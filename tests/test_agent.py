@@ -5,13 +5,17 @@ from pydantic_ai import models
 
 
 
-from ramon.models import Database
-from ramon.agent import JiraClient, Deps
+from pydantic_ai.messages import ModelTextResponse, ToolReturn
+from pydantic_ai.models.test import TestModel
+from types import SimpleNamespace
+from pydantic_ai import ModelRetry
+from ramon.models import Database, StatusEnum
+from ramon.agent import JiraClient, Deps, agent, get_tasks, search_tasks, stream_reply
+from tests.conftest import make_task
 
 pytestmark = pytest.mark.anyio
 models.ALLOW_MODEL_REQUESTS = False
 
-
 @pytest.fixture
 def temp_tasks_file(tmp_path):
     tasks_file = tmp_path / "tasks.json"
@@ -81,3 +85,78 @@ def deps(temp_tasks_file):
 #                 timestamp=IsNow(tz=timezone.utc),
 #             ),
 #         ]
+
+
+async def test_stream_reply_writes_text_and_reports_tools(deps):
+    tools, chunks = [], []
+    deps.on_tool = tools.append
+
+    with agent.override(model=TestModel(call_tools=['get_task_by_id'], custom_result_text="All done for today")):
+        new_messages = await stream_reply("What is task-1?", deps, [], chunks.append)
+
+    assert tools == ['get_task_by_id']
+    assert "".join(chunks) == "All done for today"
+    assert [message.role for message in new_messages] == [
+        'user', 'model-structured-response', 'tool-return', 'model-text-response'
+    ]
+    assert isinstance(new_messages[2], ToolReturn)
+    assert new_messages[-1] == ModelTextResponse("All done for today", timestamp=new_messages[-1].timestamp)
+
+async def test_stream_reply_keeps_history_like_run(deps):
+    with agent.override(model=TestModel(call_tools=[], custom_result_text="Hi")):
+        streamed = await stream_reply("Hello", deps, [], lambda _: None)
+        ran = (await agent.run("Hello", deps=deps)).new_messages()
+
+    assert [(m.role, m.content) for m in streamed] == [(m.role, m.content) for m in ran]
+
+@pytest.fixture
+def backlog(tmp_path):
+    db = Database(tasks_file=tmp_path / "tasks.json", archived_tasks_file=tmp_path / "archived_tasks.json")
+    db.write_tasks([
+        make_task(
+            f"t{i}", task=f"Task {i}", owner="ana" if i % 2 else "bob", priority="High",
+            description="x" * 500, due_date=f"2024-04-{30 - i:02d}" if i % 5 else "",
+            metadata="Sprint 4", status=StatusEnum.in_progress if i % 3 == 0 else StatusEnum.to_do
+        )
+        for i in range(1, 26)
+    ])
+    return SimpleNamespace(deps=Deps(db, JiraClient()))
+
+async def test_get_tasks_pages_compact_rows(backlog):
+    first = await get_tasks(backlog, limit=10)
+
+    assert first["total"] == 25
+    assert first["status_counts"] == {"to_do": 17, "in_progress": 8}
+    assert first["tasks"][0] == {"id": "t1", "task": "Task 1", "owner": "ana", "status": "to_do", "due_date": "2024-04-29"}
+    assert first["next_cursor"] == "10"
+
+    ids = [task["id"] for task in first["tasks"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = await get_tasks(backlog, limit=10, cursor=cursor)
+        ids += [task["id"] for task in page["tasks"]]
+        cursor = page["next_cursor"]
+    assert ids == [f"t{i}" for i in range(1, 26)]
+
+async def test_get_tasks_fields_filters_and_sort(backlog):
+    page = await get_tasks(backlog, status=["to_do"], owner="ana", fields=["id", "due_date"], sort_by="due_date", limit=4)
+
+    assert page["total"] == 9 and page["status_counts"] == {"to_do": 9}
+    assert page["tasks"] == [
+        {"id": "t23", "due_date": "2024-04-07"},
+        {"id": "t19", "due_date": "2024-04-11"},
+        {"id": "t17", "due_date": "2024-04-13"},
+        {"id": "t13", "due_date": "2024-04-17"},
+    ]
+    last = await get_tasks(backlog, status=["to_do"], owner="ana", fields=["id"], sort_by="-due_date", cursor="8")
+    assert last == {"total": 9, "status_counts": {"to_do": 9}, "tasks": [{"id": "t25"}], "next_cursor": None}
+
+    with pytest.raises(ModelRetry):
+        await get_tasks(backlog, fields=["id", "colour"])
+
+async def test_search_tasks_returns_the_best_matches(backlog):
+    hits = await search_tasks(backlog, "task 7", status=["to_do"], limit=3)
+
+    assert len(hits) == 3
+    assert hits[0]["id"] == "t7" and set(hits[0]) == {"id", "task", "owner", "status", "due_date", "score"}
+    assert all(hit["status"] == "to_do" for hit in hits)
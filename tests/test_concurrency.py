@@ -0,0 +1,100 @@
+import pytest
+import multiprocessing
+import os
+from ramon.models import Database, StatusEnum
+from tests.conftest import make_task
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork and fcntl")
+
+WRITERS = 4
+WRITES = 25
+
+def open_database(tmp_path, journal: bool) -> Database:
+    return Database(
+        tasks_file=tmp_path / "tasks.json",
+        archived_tasks_file=tmp_path / "archived_tasks.json",
+        journal=journal,
+        journal_max_entries=10,
+        max_write_retries=200
+    )
+
+def writer(tmp_path, journal: bool, worker: int) -> None:
+    db = open_database(tmp_path, journal)
+    for i in range(WRITES):
+        status = StatusEnum.completed if i % 5 == 0 else StatusEnum.to_do
+        db.write_tasks([make_task(f"{worker}-{i}", status=status)])
+
+def archiver(tmp_path, journal: bool) -> None:
+    db = open_database(tmp_path, journal)
+    for _ in range(WRITES):
+        db.archive_tasks(lambda task: task.status == "completed")
+
+def run(processes) -> None:
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_concurrent_writers_lose_no_updates(tmp_path, journal):
+    context = multiprocessing.get_context("fork")
+    run([context.Process(target=writer, args=(tmp_path, journal, worker)) for worker in range(WRITERS)])
+
+    db = open_database(tmp_path, journal)
+    ids = {task.id for task in db.read_tasks()}
+    assert ids == {f"{worker}-{i}" for worker in range(WRITERS) for i in range(WRITES)}
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_concurrent_archiving_loses_and_duplicates_nothing(tmp_path, journal):
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=writer, args=(tmp_path, journal, worker)) for worker in range(WRITERS)]
+    processes.append(context.Process(target=archiver, args=(tmp_path, journal)))
+    run(processes)
+
+    db = open_database(tmp_path, journal)
+    db.archive_tasks(lambda task: task.status == "completed")
+    tasks = [task.id for task in db.read_tasks()]
+    archived = [task.id for task in db.read_tasks("archived_tasks")]
+    assert len(tasks) + len(archived) == WRITERS * WRITES
+    assert set(tasks) | set(archived) == {f"{worker}-{i}" for worker in range(WRITERS) for i in range(WRITES)}
+    assert len(archived) == WRITERS * WRITES // 5
+
+def test_conflicting_write_is_retried(tmp_path):
+    db = open_database(tmp_path, journal=False)
+    other = open_database(tmp_path, journal=False)
+    db.write_tasks([make_task("1", status=StatusEnum.completed), make_task("2")])
+    seen = []
+
+    def completed(task):
+        if not seen:
+            other.write_tasks([make_task("3")])  # lands between our read and our write
+        seen.append(task.id)
+        return task.status == "completed"
+
+    db.archive_tasks(completed)
+
+    assert seen == ["1", "2", "1", "2", "3"]  # the conflict made it start over
+    fresh = open_database(tmp_path, journal=False)
+    assert [task.id for task in fresh.read_tasks()] == ["2", "3"]
+    assert [task.id for task in fresh.read_tasks("archived_tasks")] == ["1"]
+
+def test_torn_journal_line_is_dropped_on_append(tmp_path):
+    db = open_database(tmp_path, journal=True)
+    db.write_tasks([make_task("1")])
+    with open(tmp_path / "tasks.journal.jsonl", "a") as f:
+        f.write('{"op": "upsert", "task": {"id": "bro')
+
+    db.write_tasks([make_task("2")])
+
+    assert (tmp_path / "tasks.journal.jsonl").read_text().count("\n") == 2
+    assert [task.id for task in open_database(tmp_path, journal=True).read_tasks()] == ["1", "2"]
+
+def test_create_files_never_truncates(tmp_path):
+    db = open_database(tmp_path, journal=False)
+    db.create_files()
+    assert (tmp_path / "tasks.json").read_text() == "[]"
+    db.write_tasks([make_task("1")])
+    open_database(tmp_path, journal=False).create_files()
+    assert [task.id for task in open_database(tmp_path, journal=False).read_tasks()] == ["1"]
+    assert sorted(path.name for path in tmp_path.iterdir() if path.name.endswith(".tmp")) == []
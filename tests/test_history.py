@@ -0,0 +1,72 @@
+import pytest
+from pydantic_ai import models
+from pydantic_ai.messages import ModelStructuredResponse, ModelTextResponse, ToolCall, ToolReturn, UserPrompt
+from pydantic_ai.models.test import TestModel
+from ramon.agent import Deps, JiraClient, agent
+from ramon.history import ChatHistory, message_tokens
+from ramon.models import Database
+
+models.ALLOW_MODEL_REQUESTS = False
+
+def turn(n: int, payload: str = "") -> list:
+    return [
+        UserPrompt(f"Question {n}"),
+        ModelStructuredResponse(calls=[ToolCall.from_dict("get_tasks", {"status": ["to_do"]})]),
+        ToolReturn("get_tasks", [{"id": str(i), "task": payload} for i in range(3)]),
+        ModelTextResponse(f"Answer {n}"),
+    ]
+
+def test_recent_turns_are_kept_and_old_tool_returns_cut_short():
+    history = ChatHistory(keep_turns=3, max_tool_chars=50)
+    for n in range(3):
+        history.add_turn(turn(n, "x" * 100))
+
+    messages = history.messages()
+
+    assert len(messages) == 12
+    assert messages[2].content.startswith('[{"id":"0"')
+    assert messages[2].content.endswith("more characters elided, call get_tasks again if needed]")
+    assert len(messages[2].content) < 150
+    assert messages[6].content != messages[10].content  # the latest turn stays whole
+    assert messages[10].content[0]["task"] == "x" * 100
+    assert history.stats().elided_tool_returns == 2
+
+def test_old_turns_are_folded_into_a_summary():
+    history = ChatHistory(keep_turns=2, max_summary_chars=120)
+    for n in range(5):
+        history.add_turn(turn(n))
+
+    summary, *rest = history.messages()
+
+    assert isinstance(summary, UserPrompt)
+    assert summary.content == (
+        "Summary of the 3 earlier turns of this conversation (the first 1 left out):\n"
+        "- User: Question 1 | tools: get_tasks | Ramon: Answer 1\n"
+        "- User: Question 2 | tools: get_tasks | Ramon: Answer 2"
+    )
+    assert [m.content for m in rest if isinstance(m, UserPrompt)] == ["Question 3", "Question 4"]
+
+def test_request_size_stays_bounded():
+    history = ChatHistory(keep_turns=4, max_tool_chars=100, max_summary_chars=300)
+    sizes = []
+    for n in range(30):
+        sizes.append(sum(map(message_tokens, history.messages())))
+        history.add_turn(turn(n, "x" * 2000))
+
+    assert max(sizes[15:]) - min(sizes[15:]) <= 5  # only turn numbers grow
+    stats = history.stats()
+    assert stats.turns == 30 and stats.folded_turns == 26
+    assert stats.tokens_saved > 10 * stats.tokens_sent
+
+@pytest.mark.anyio
+async def test_agent_runs_on_managed_history(tmp_path):
+    deps = Deps(Database(tasks_file=tmp_path / "tasks.json", archived_tasks_file=tmp_path / "archived.json"), JiraClient())
+    history = ChatHistory(keep_turns=2)
+    with agent.override(model=TestModel(call_tools=[])):
+        for n in range(4):
+            result = await agent.run(f"Question {n}", deps=deps, message_history=history.messages())
+            history.add_turn(result.new_messages())
+
+    assert result.all_messages()[0].role == "system"
+    assert "Summary of the 1 earlier turns" in result.all_messages()[1].content
+    assert history.stats().turns == 4
@@ -1,7 +1,14 @@
 import pytest
 from unittest.mock import Mock, patch
+from jira import JIRAError
 from ramon.plugins.jira import (
+    close_jira_instances,
+    create_issues_in_jira,
     get_jira_instance,
+    get_jira_issues,
+    get_jira_statuses,
+    issue_cache,
+    IssueCache,
     get_task_status_in_jira,
     get_task_assignee_in_jira,
     add_comment_to_jira_issue,
@@ -9,6 +16,7 @@ from ramon.plugins.jira import (
     open_jira_issue,
     get_jira_issue_url,
 )
+from tests.conftest import make_task
 
 @pytest.fixture
 def mock_env_vars():
@@ -24,66 +32,215 @@ def mock_jira():
     with patch('ramon.plugins.jira.JIRA') as mock:
         yield mock
 
+@pytest.fixture(autouse=True)
+def reset_jira_instances():
+    close_jira_instances()
+    issue_cache.clear()
+    yield
+    close_jira_instances()
+    issue_cache.clear()
+
 def test_get_jira_instance(mock_env_vars, mock_jira):
     get_jira_instance()
     mock_jira.assert_called_once_with(
         server='https://test.atlassian.net',
-        basic_auth=('test@example.com', 'test-token')
+        basic_auth=('test@example.com', 'test-token'),
+        timeout=30.0,
     )
+    adapter = mock_jira.return_value._session.mount.call_args.args[1]
+    assert adapter._pool_maxsize == 10
+
+def test_get_jira_instance_is_shared(mock_env_vars, mock_jira):
+    assert get_jira_instance() is get_jira_instance()
+    get_task_status_in_jira('TEST-1')
+    get_task_assignee_in_jira('TEST-2')
+    mock_jira.assert_called_once()
+
+def test_get_jira_instance_per_credentials(mock_env_vars, mock_jira):
+    get_jira_instance()
+    with patch.dict('os.environ', {'JIRA_TOKEN': 'other-token', 'JIRA_POOL_SIZE': '2', 'JIRA_TIMEOUT': '5'}):
+        get_jira_instance()
+    assert mock_jira.call_count == 2
+    assert mock_jira.call_args.kwargs['timeout'] == 5.0
+
+def test_close_jira_instances(mock_env_vars, mock_jira):
+    get_jira_instance()
+    close_jira_instances()
+    mock_jira.return_value.close.assert_called_once()
+    get_jira_instance()
+    assert mock_jira.call_count == 2
 
 def test_get_task_status_in_jira(mock_env_vars, mock_jira):
     # Setup mock issue
     mock_issue = Mock()
-    mock_issue.fields.status.name = 'In Progress'
+    mock_issue.raw = {'fields': {'status': {'name': 'In Progress'}}}
     mock_jira.return_value.issue.return_value = mock_issue
 
     status = get_task_status_in_jira('TEST-123')
     assert status == 'In Progress'
-    mock_jira.return_value.issue.assert_called_once_with('TEST-123')
+    mock_jira.return_value.issue.assert_called_once_with('TEST-123', fields='status,updated')
 
 def test_get_task_assignee_in_jira_with_assignee(mock_env_vars, mock_jira):
     # Setup mock issue with assignee
     mock_issue = Mock()
-    mock_issue.fields.assignee.displayName = 'John Doe'
+    mock_issue.raw = {'fields': {'assignee': {'displayName': 'John Doe'}}}
     mock_jira.return_value.issue.return_value = mock_issue
 
     assignee = get_task_assignee_in_jira('TEST-123')
     assert assignee == 'John Doe'
-    mock_jira.return_value.issue.assert_called_once_with('TEST-123')
+    mock_jira.return_value.issue.assert_called_once_with('TEST-123', fields='assignee,updated')
 
 def test_get_task_assignee_in_jira_unassigned(mock_env_vars, mock_jira):
     # Setup mock issue without assignee
     mock_issue = Mock()
-    mock_issue.fields.assignee = None
+    mock_issue.raw = {'fields': {'assignee': None}}
     mock_jira.return_value.issue.return_value = mock_issue
 
     assignee = get_task_assignee_in_jira('TEST-123')
     assert assignee == 'Unassigned'
-    mock_jira.return_value.issue.assert_called_once_with('TEST-123')
+    mock_jira.return_value.issue.assert_called_once_with('TEST-123', fields='assignee,updated')
 
 def test_add_comment_to_jira_issue(mock_env_vars, mock_jira):
     add_comment_to_jira_issue('TEST-123', 'Test comment')
     mock_jira.return_value.add_comment.assert_called_once_with('TEST-123', 'Test comment')
 
 def test_load_comments_for_jira_issue(mock_env_vars, mock_jira):
-    # Setup mock comments
-    mock_comment1 = Mock()
-    mock_comment1.author.displayName = 'John Doe'
-    mock_comment1.body = 'First comment'
-    
-    mock_comment2 = Mock()
-    mock_comment2.author.displayName = 'Jane Smith'
-    mock_comment2.body = 'Second comment'
+    mock_jira.return_value.server_url = 'https://test.atlassian.net'
+    mock_jira.return_value._session.get.return_value.json.return_value = {'startAt': 0, 'total': 2, 'comments': [
+        {'author': {'displayName': 'John Doe'}, 'body': 'First comment', 'created': '2024-03-02T10:00:00.000+0000'},
+        {'author': {'displayName': 'Jane Smith'}, 'body': 'Second comment', 'created': '2024-03-01T10:00:00.000+0000'},
+    ]}
+
+    comments = load_comments_for_jira_issue('TEST-123')
+    assert comments == ['from: John Doe, message: First comment', 'from: Jane Smith, message: Second comment']
+    mock_jira.return_value._session.get.assert_called_once_with(
+        'https://test.atlassian.net/rest/api/2/issue/TEST-123/comment',
+        params={'startAt': 0, 'maxResults': 20, 'orderBy': '-created'},
+    )
+    mock_jira.return_value.issue.assert_not_called()
+
+    assert load_comments_for_jira_issue('TEST-123', since='2024-03-02') == ['from: John Doe, message: First comment']
+    assert load_comments_for_jira_issue('TEST-123', limit=1, max_chars=5) == [
+        'from: John Doe, message: First... [8 more characters]'
+    ]
+
+def search_result(issues, total):
+    return {'issues': [{'key': key, 'fields': fields} for key, fields in issues], 'total': total}
+
+def test_get_jira_issues(mock_env_vars, mock_jira):
+    search = mock_jira.return_value.search_issues
+    search.side_effect = [
+        search_result([('TEST-1', {'status': {'name': 'Done'}, 'assignee': {'displayName': 'John Doe'}})], total=2),
+        search_result([('TEST-2', {'status': {'name': 'To Do'}, 'assignee': None})], total=2),
+    ]
+
+    issues = get_jira_issues(['TEST-1', 'test-2', 'TEST-1'])
+
+    assert issues == {
+        'TEST-1': {'status': 'Done', 'assignee': 'John Doe'},
+        'TEST-2': {'status': 'To Do', 'assignee': 'Unassigned'},
+    }
+    assert search.call_count == 2
+    jql = search.call_args.args[0]
+    assert jql == 'key in ("TEST-1", "TEST-2")'
+    assert search.call_args.kwargs['startAt'] == 1
+    assert search.call_args.kwargs['fields'] == ['status', 'assignee', 'updated']
+    mock_jira.return_value.issue.assert_not_called()
+
+def test_get_jira_issues_fields(mock_env_vars, mock_jira):
+    mock_jira.return_value.search_issues.return_value = search_result([('TEST-1', {
+        'summary': 'Fix it',
+        'comment': {'comments': [{'author': {'displayName': 'Jane Smith'}, 'body': 'On it'}]},
+    })], total=1)
+
+    issues = get_jira_issues(['TEST-1'], ['summary', 'comment'])
+
+    assert issues == {'TEST-1': {'summary': 'Fix it', 'comment': ['from: Jane Smith, message: On it']}}
+    assert get_jira_issues([]) == {}
+    mock_jira.return_value.search_issues.assert_called_once()
+
+def test_get_jira_statuses(mock_env_vars, mock_jira):
+    mock_jira.return_value.search_issues.return_value = search_result(
+        [('TEST-1', {'status': {'name': 'In Progress'}})], total=1
+    )
+    assert get_jira_statuses(['TEST-1', 'TEST-404']) == {'TEST-1': 'In Progress', 'TEST-404': 'Not found'}
+    mock_jira.return_value.search_issues.assert_called_once()
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
 
+    def __call__(self):
+        return self.now
+
+def test_issue_cache_ttl_and_revalidation():
+    clock = FakeClock()
+    cache = IssueCache(default_ttl=10, ttls={'assignee': 100}, clock=clock)
+    cache.put('TEST-1', {'status': 'Done', 'assignee': 'John Doe'}, updated='t1')
+
+    assert cache.plan(['TEST-1', 'TEST-2'], ['status']) == ({'TEST-1': {'status': 'Done'}}, [], ['TEST-2'])
+    clock.now = 50
+    assert cache.plan(['TEST-1'], ['assignee']) == ({'TEST-1': {'assignee': 'John Doe'}}, [], [])
+    assert cache.plan(['TEST-1'], ['status', 'assignee']) == ({}, ['TEST-1'], [])
+    assert cache.revalidate('TEST-1', ['status'], 't1') == {'status': 'Done'}
+    assert cache.plan(['TEST-1'], ['status']) == ({'TEST-1': {'status': 'Done'}}, [], [])
+
+    clock.now = 100
+    assert cache.revalidate('TEST-1', ['status'], 't2') is None
+    cache.put('TEST-1', {'status': 'To Do'}, updated='t2')
+    assert cache.plan(['TEST-1'], ['assignee']) == ({}, [], ['TEST-1'])  # dropped with the old version
+
+    assert cache.info() == (3, 1, 3, 1)
+    assert cache.info().hit_rate == 4 / 7
+
+def test_issue_cache_lru_and_invalidate():
+    cache = IssueCache(max_issues=2)
+    cache.put('A-1', {'status': 'Done'}, 't')
+    cache.put('A-2', {'status': 'Done'}, 't')
+    cache.plan(['A-1'], ['status'])
+    cache.put('A-3', {'status': 'Done'}, 't')
+    assert cache.plan(['A-1', 'A-2', 'A-3'], ['status'])[2] == ['A-2']
+    cache.invalidate('A-1')
+    assert cache.plan(['A-1'], ['status'])[2] == ['A-1']
+
+def test_repeated_lookups_are_cached(mock_env_vars, mock_jira):
     mock_issue = Mock()
-    mock_issue.fields.comment.comments = [mock_comment1, mock_comment2]
+    mock_issue.raw = {'fields': {'status': {'name': 'Done'}, 'updated': 't1'}}
     mock_jira.return_value.issue.return_value = mock_issue
+    mock_jira.return_value.search_issues.return_value = search_result([], total=0)
 
-    comments = load_comments_for_jira_issue('TEST-123')
-    assert len(comments) == 2
-    assert comments[0] == 'from: John Doe, message: First comment'
-    assert comments[1] == 'from: Jane Smith, message: Second comment'
-    mock_jira.return_value.issue.assert_called_once_with('TEST-123')
+    assert get_task_status_in_jira('TEST-1') == 'Done'
+    assert get_task_status_in_jira('test-1') == 'Done'
+    assert get_jira_statuses(['TEST-1']) == {'TEST-1': 'Done'}
+    mock_jira.return_value.issue.assert_called_once()
+    mock_jira.return_value.search_issues.assert_not_called()
+
+    add_comment_to_jira_issue('TEST-1', 'Done!')
+    get_task_status_in_jira('TEST-1')
+    assert mock_jira.return_value.issue.call_count == 2
+
+def test_create_issues_in_jira(mock_env_vars, mock_jira):
+    created = Mock()
+    created.key = 'TEST-1'
+    mock_jira.return_value.create_issues.return_value = [
+        {'status': 'Success', 'issue': created, 'error': None},
+        {'status': 'Error', 'issue': None, 'error': {'summary': 'Too long'}},
+    ]
+    tasks = [
+        make_task(str(i), priority="", description=description)
+        for i, description in enumerate(["Details", "", "Details"])
+    ]
+
+    results = create_issues_in_jira('TEST', tasks)
+
+    assert results == [
+        (True, 'TEST-1'),
+        (False, 'Missing project key, summary or description'),
+        (False, "Failed to create issue: {'summary': 'Too long'}"),
+    ]
+    [fields_list] = mock_jira.return_value.create_issues.call_args.args
+    assert [fields['summary'] for fields in fields_list] == ['Task 0', 'Task 2']
+    assert fields_list[0]['priority'] == {'name': 'Medium'}
 
 @patch('webbrowser.open')
 def test_open_jira_issue(mock_webbrowser, mock_env_vars):
@@ -92,4 +249,36 @@ def test_open_jira_issue(mock_webbrowser, mock_env_vars):
 
 def test_get_jira_issue_url(mock_env_vars):
     url = get_jira_issue_url('TEST-123')
-    assert url == 'https://test.atlassian.net/browse/TEST-123'
\ No newline at end of file
+    assert url == 'https://test.atlassian.net/browse/TEST-123'
+
+def test_client_against_stand_in_reuses_connection(jira_server):
+    keys = jira_server.add_issues('LOAD', 250)
+    assert get_task_status_in_jira('LOAD-1') == 'In Progress'
+    jira_server.requests.clear()
+    connections = jira_server.connections
+
+    issue_cache.clear()
+    statuses = get_jira_statuses(keys)
+
+    assert list(statuses.values()) == ['In Progress'] * 250
+    # the jira library looks the field ids up once per client
+    assert jira_server.requests == [('GET', '/rest/api/2/field')] + [('POST', '/rest/api/2/search')] * 3
+    assert jira_server.connections == connections
+
+def test_injected_failures_reach_the_caller(jira_server):
+    jira_server.add_issues('LOAD', 1)
+    get_jira_instance()
+    jira_server.error_rate = 1.0
+    with pytest.raises(JIRAError) as error:
+        get_task_status_in_jira('LOAD-1')
+    assert error.value.status_code == 500
+
+def test_comments_against_stand_in_fetch_one_page(jira_server):
+    [key] = jira_server.add_issues('LOAD', 1, comments=200)
+    get_jira_instance()
+    jira_server.requests.clear()
+
+    comments = load_comments_for_jira_issue(key, limit=3)
+
+    assert comments == [f'from: Ramon, message: Comment {n} on {key}' for n in (199, 198, 197)]
+    assert jira_server.requests == [('GET', f'/rest/api/2/issue/{key}/comment')]
@@ -0,0 +1,164 @@
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from ramon.agent import Deps, JiraClient, create_jira_tickets
+from ramon.models import Database
+from ramon.plugins import jira_async
+from ramon.plugins.jira import issue_cache
+from tests.conftest import make_task
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def jira_server(jira_server, monkeypatch):
+    jira_server.add_issue('TEST-1', status='In Progress', assignee='John Doe')
+    jira_server.add_issue('TEST-2')
+    monkeypatch.setenv('JIRA_MAX_CONCURRENCY', '4')
+    return jira_server
+
+async def test_get_task_status_and_assignee(jira_server, close_clients):
+    assert await jira_async.get_task_status_in_jira('TEST-1') == 'In Progress'
+    assert await jira_async.get_task_assignee_in_jira('TEST-1') == 'John Doe'
+    assert await jira_async.get_task_assignee_in_jira('TEST-2') == 'Unassigned'
+    assert jira_server.requests == [('GET', '/rest/api/2/issue/TEST-1')] * 2 + [('GET', '/rest/api/2/issue/TEST-2')]
+
+async def test_shared_client_per_loop(jira_server, close_clients):
+    assert jira_async.get_async_jira_instance() is jira_async.get_async_jira_instance()
+
+async def test_comments(jira_server, close_clients):
+    await jira_async.add_comment_to_jira_issue('TEST-1', 'Looking into it')
+    assert await jira_async.load_comments_for_jira_issue('TEST-1') == ['from: Ramon, message: Looking into it']
+
+async def test_create_issue(jira_server, close_clients):
+    task = make_task("task-1", task="Write docs", description="All of them")
+    assert await jira_async.create_issue_in_jira('DOC', task) == (True, 'DOC-1')
+    assert jira_server.issues['DOC-1']['fields']['summary'] == 'Write docs'
+    assert await jira_async.create_issue_in_jira('', task) == (False, '')
+
+async def test_get_jira_issues_pages_concurrently(jira_server, close_clients):
+    keys = [f'BULK-{i}' for i in range(250)]
+    for key in keys:
+        jira_server.add_issue(key, status='Done')
+
+    issues = await jira_async.get_jira_issues(keys + ['BULK-404'], ['status'])
+
+    assert list(issues) == keys
+    assert issues['BULK-7'] == {'status': 'Done'}
+    assert jira_server.requests == [('POST', '/rest/api/2/search')] * 3
+    assert await jira_async.get_jira_statuses(['test-1', 'NOPE-1']) == {'TEST-1': 'In Progress', 'NOPE-1': 'Not found'}
+
+async def test_independent_calls_overlap_within_the_limit(jira_server, close_clients):
+    jira_server.latency = 0.1
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(jira_async.get_task_status_in_jira('TEST-1') for _ in range(8)))
+    elapsed = time.perf_counter() - start
+
+    assert statuses == ['In Progress'] * 8
+    assert jira_server.max_in_flight == 4  # JIRA_MAX_CONCURRENCY
+    assert elapsed < 0.1 * 8 / 2
+
+async def test_cached_lookups_skip_the_network(jira_server, close_clients):
+    await jira_async.get_jira_issues(['TEST-1', 'TEST-2'], ['status'])
+    assert await jira_async.get_task_status_in_jira('TEST-1') == 'In Progress'
+    assert await jira_async.get_jira_statuses(['TEST-2']) == {'TEST-2': 'To Do'}
+    assert jira_server.requests == [('POST', '/rest/api/2/search')]
+    assert issue_cache.info().hits == 2
+
+async def test_cache_revalidates_with_updated(jira_server, close_clients):
+    with patch.object(issue_cache, 'default_ttl', 0):
+        assert await jira_async.get_jira_statuses(['TEST-1', 'TEST-2']) == {'TEST-1': 'In Progress', 'TEST-2': 'To Do'}
+        jira_server.update_issue('TEST-2', status={'name': 'Done'})
+        assert await jira_async.get_jira_statuses(['TEST-1', 'TEST-2']) == {'TEST-1': 'In Progress', 'TEST-2': 'Done'}
+
+    # fetch, revalidate both by `updated` in one search, fetch the changed one
+    assert jira_server.requests == [('POST', '/rest/api/2/search')] * 3
+    assert issue_cache.info().revalidations == 1
+
+async def test_comment_invalidates_cache(jira_server, close_clients):
+    assert await jira_async.load_comments_for_jira_issue('TEST-1') == []
+    await jira_async.add_comment_to_jira_issue('TEST-1', 'Looking into it')
+    assert await jira_async.load_comments_for_jira_issue('TEST-1') == ['from: Ramon, message: Looking into it']
+
+async def test_comments_are_paginated_newest_first(jira_server, close_clients):
+    for day in range(1, 29):
+        for hour in range(10):
+            jira_server.add_comment('TEST-2', f'Day {day} hour {hour}', created=f'2024-02-{day:02d}T{hour:02d}:00:00.000+0000')
+
+    comments = await jira_async.load_comments_for_jira_issue('TEST-2', limit=150)
+    assert len(comments) == 150
+    assert comments[:2] == ['from: Ramon, message: Day 28 hour 9', 'from: Ramon, message: Day 28 hour 8']
+    assert jira_server.requests == [('GET', '/rest/api/2/issue/TEST-2/comment')] * 2
+
+    recent = await jira_async.load_comments_for_jira_issue('TEST-2', since='2024-02-27')
+    assert len(recent) == 20 and recent[-1] == 'from: Ramon, message: Day 27 hour 0'
+    assert len(jira_server.requests) == 3
+
+async def test_long_comments_are_truncated(jira_server, close_clients):
+    jira_server.add_comment('TEST-1', 'x' * 5000)
+    [comment] = await jira_async.load_comments_for_jira_issue('TEST-1', max_chars=100)
+    assert comment == f"from: Ramon, message: {'x' * 100}... [4900 more characters]"
+
+async def test_create_issues_in_bulk(jira_server, close_clients):
+    tasks = [make_task(str(i)) for i in range(120)]
+    tasks[5] = make_task("5", description="")
+    tasks[70] = make_task("70", task="x" * 300)
+
+    results = await jira_async.create_issues_in_jira('BULK', tasks)
+
+    assert results[5] == (False, "Missing project key, summary or description")
+    assert results[70] == (False, "Failed to create issue: {'summary': 'Summary must be less than 255 characters.'}")
+    assert sum(ok for ok, _ in results) == 118
+    for task, (ok, key) in zip(tasks, results):
+        if ok:  # chunks run concurrently, keys map back by position
+            assert jira_server.issues[key]['fields']['summary'] == task.task
+    assert jira_server.requests == [('POST', '/rest/api/2/issue/bulk')] * 3
+
+async def test_create_issues_short_bulk_response(jira_server, close_clients, monkeypatch):
+    async def short_response(fields_list):
+        # Second element failed, the last one is missing from the response
+        return {
+            'issues': [{'key': 'BULK-1'}, {'key': 'BULK-3'}],
+            'errors': [{'failedElementNumber': 1, 'elementErrors': {'errors': {'summary': 'Too long'}}}],
+        }
+
+    monkeypatch.setattr(jira_async.get_async_jira_instance(), 'create_issues', short_response)
+
+    results = await jira_async.create_issues_in_jira('BULK', [make_task(str(i)) for i in range(4)])
+
+    assert results == [
+        (True, 'BULK-1'),
+        (False, "Failed to create issue: {'summary': 'Too long'}"),
+        (True, 'BULK-3'),
+        (False, 'No result from Jira'),
+    ]
+
+async def test_rate_limited_requests_are_retried(jira_server, close_clients):
+    jira_server.rate_limit(2, retry_after='0')
+    assert await jira_async.get_task_status_in_jira('TEST-1') == 'In Progress'
+    assert len(jira_server.requests) == 3
+    assert jira_async.get_async_jira_instance().retries == 2
+
+    with patch.dict('os.environ', {'JIRA_MAX_RETRIES': '1', 'JIRA_TOKEN': 'other-token'}):
+        jira_server.rate_limit(2, retry_after='0')
+        with pytest.raises(jira_async.httpx.HTTPStatusError):
+            await jira_async.get_task_status_in_jira('TEST-2')
+
+async def test_create_jira_tickets_tool_updates_metadata(jira_server, close_clients, tmp_path):
+    db = Database(tasks_file=tmp_path / "tasks.json", archived_tasks_file=tmp_path / "archived_tasks.json")
+    db.write_tasks([make_task("1"), make_task("2", metadata="Sprint 4"), make_task("3", metadata="JIRA Reference: OLD-1")])
+    ctx = SimpleNamespace(deps=Deps(db, JiraClient()))
+
+    results = await create_jira_tickets(ctx, 'NEW', ["1", "2", "3", "404"])
+
+    assert results == {
+        "1": "NEW-1",
+        "2": "NEW-2",
+        "3": "Skipped, it already has a ticket: JIRA Reference: OLD-1",
+        "404": "Task not found",
+    }
+    fresh = Database(tasks_file=db.tasks_file, archived_tasks_file=db.archived_tasks_file)
+    assert [task.metadata for task in fresh.read_tasks()] == [
+        "JIRA Reference: NEW-1", "Sprint 4; JIRA Reference: NEW-2", "JIRA Reference: OLD-1"
+    ]
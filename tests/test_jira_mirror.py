@@ -0,0 +1,115 @@
+import threading
+import time
+import httpx
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from click.testing import CliRunner
+from ramon import cli
+from ramon.agent import Deps, JiraClient, get_jira_issues, get_jira_statuses, get_jira_task_status
+from ramon.models import Database
+from ramon.plugins.jira import issue_cache
+from ramon.plugins.jira_mirror import JiraMirror, start_background_sync
+from tests.conftest import make_task
+
+pytestmark = pytest.mark.anyio
+
+LAST_WEEK = '2024-03-01T10:00:00.000000+0000'
+
+@pytest.fixture
+def jira_server(jira_server):
+    for i in range(1, 6):
+        jira_server.add_issue(f'TEST-{i}', status='To Do', assignee='John Doe', summary=f'Issue {i}', updated=LAST_WEEK)
+    return jira_server
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(tasks_file=tmp_path / "tasks.json", archived_tasks_file=tmp_path / "archived_tasks.json")
+    db.write_tasks([make_task(str(i), metadata=f"Sprint 4; JIRA Reference: TEST-{i}") for i in range(1, 5)] + [make_task("5")])
+    return db
+
+async def test_sync_only_fetches_changed_issues(jira_server, close_clients, db, tmp_path):
+    mirror = JiraMirror(tmp_path / "jira_mirror.json")
+
+    assert await mirror.sync(db) == (4, 4, 0)
+    jira_server.update_issue('TEST-2', status={'name': 'Done'})
+    db.write_tasks([make_task("1"), make_task("5", metadata="JIRA Reference: test-5")])
+    jira_server.requests.clear()
+
+    # TEST-5 is new, only TEST-2 changed, TEST-1 is no longer referenced
+    assert await mirror.sync(db) == (4, 2, 1)
+    assert len(jira_server.requests) == 2
+    assert mirror.lookup(['TEST-2', 'TEST-3', 'TEST-5', 'TEST-1'], ['status', 'summary']) == {
+        'TEST-2': {'status': 'Done', 'summary': 'Issue 2'},
+        'TEST-3': {'status': 'To Do', 'summary': 'Issue 3'},
+        'TEST-5': {'status': 'To Do', 'summary': 'Issue 5'},
+    }
+
+    # Another process sees the same mirror
+    assert JiraMirror(mirror.path).lookup(['TEST-2'], ['status']) == {'TEST-2': {'status': 'Done'}}
+
+async def test_tools_answer_from_a_fresh_mirror(jira_server, close_clients, db, tmp_path):
+    mirror = JiraMirror(tmp_path / "jira_mirror.json", max_age=60)
+    await mirror.sync(db)
+    jira_server.requests.clear()
+    ctx = SimpleNamespace(deps=Deps(db, JiraClient(mirror=mirror)))
+
+    assert await get_jira_task_status(ctx, 'test-1') == 'To Do'
+    assert await get_jira_statuses(ctx, ['TEST-1', 'TEST-2']) == {'TEST-1': 'To Do', 'TEST-2': 'To Do'}
+    assert await get_jira_issues(ctx, ['TEST-3'], ['assignee']) == {'TEST-3': {'assignee': 'John Doe'}}
+    assert jira_server.requests == []
+
+    # Unmirrored issues and fields go to Jira
+    assert await get_jira_statuses(ctx, ['TEST-1', 'TEST-5']) == {'TEST-1': 'To Do', 'TEST-5': 'To Do'}
+    assert await get_jira_issues(ctx, ['TEST-1'], ['updated']) == {'TEST-1': {'updated': LAST_WEEK}}
+    assert len(jira_server.requests) == 2
+
+async def test_stale_mirror_is_not_used(jira_server, close_clients, db, tmp_path):
+    mirror = JiraMirror(tmp_path / "jira_mirror.json", max_age=60)
+    await mirror.sync(db)
+    jira_server.update_issue('TEST-1', status={'name': 'Done'})
+
+    with patch('ramon.plugins.jira_mirror.time.time', return_value=time.time() + 61):
+        assert not mirror.is_fresh()
+        assert await JiraClient(mirror=mirror).get_task_status('TEST-1') == 'Done'
+
+def test_background_sync(jira_server, db, tmp_path):
+    mirror = JiraMirror(tmp_path / "jira_mirror.json")
+    stop = start_background_sync(mirror, db, interval=0.05)
+    try:
+        deadline = time.time() + 5
+        while not mirror.is_fresh() and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        stop()
+    assert mirror.lookup(['TEST-4'], ['assignee']) == {'TEST-4': {'assignee': 'John Doe'}}
+
+def test_background_sync_reports_failures(jira_server, db, tmp_path, capsys):
+    jira_server.error_rate = 1.0
+    errors = []
+    failed = threading.Event()
+
+    def on_error(error):
+        errors.append(error)
+        failed.set()
+
+    stop = start_background_sync(JiraMirror(tmp_path / "jira_mirror.json"), db, interval=0.05, on_error=on_error)
+    try:
+        assert failed.wait(5)
+    finally:
+        stop()
+    assert isinstance(errors[0], httpx.HTTPStatusError)
+    assert capsys.readouterr().out == ""  # nothing printed into the chat
+
+def test_sync_jira_command(jira_server, db, tmp_path, monkeypatch):
+    mirror_file = tmp_path / "jira_mirror.json"
+    monkeypatch.setattr(cli, "Database", lambda: db)
+    monkeypatch.setattr(cli, "JiraMirror", lambda: JiraMirror(mirror_file))
+    issue_cache.clear()
+
+    assert "sync-jira" in CliRunner().invoke(cli.cli, ["--help"]).output
+    result = CliRunner().invoke(cli.cli, ["sync-jira"])
+
+    assert result.exit_code == 0, result.output
+    assert result.output == f"Synced 4 linked Jira issues into {mirror_file}: 4 fetched, 0 no longer linked.\n"
+    assert set(JiraMirror(mirror_file).lookup(["TEST-1", "TEST-4"], ["status"])) == {"TEST-1", "TEST-4"}
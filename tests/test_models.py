@@ -1,7 +1,13 @@
 import pytest
 import json
-from ramon.models import Task, Database, StatusEnum
+import threading
+from pydantic import ValidationError
+from datetime import date, timedelta
+from ramon.models import (
+    Task, Database, StatusEnum, TaskColumns, TaskIndex, decode_tasks, encode_tasks, iter_json_array, summarize_tasks
+)
 from ramon.agent import JiraClient
+from tests.conftest import make_task
 
 @pytest.fixture
 def sample_task():
@@ -231,4 +237,381 @@ def test_archive_task_data_integrity(setup_database):
     
     # Compare all fields
     for key in original_task:
-        assert original_task[key] == archived_task[key], f"Field {key} does not match" 
\ No newline at end of file
+        assert original_task[key] == archived_task[key], f"Field {key} does not match" 
+
+# Journal Tests
+@pytest.fixture
+def journal_database(setup_database):
+    setup_database.journal = True
+    return setup_database
+
+def journal_file(db, name="tasks"):
+    return db.tasks_file.with_name(f"{name}.journal.jsonl")
+
+def read_journal(db, name="tasks"):
+    return [json.loads(line) for line in journal_file(db, name).read_text().splitlines()]
+
+def test_journal_write_appends_without_rewriting_snapshot(journal_database, sample_task):
+    db = journal_database
+    snapshot = db.tasks_file.read_text()
+
+    db.write_tasks([sample_task])
+
+    assert db.tasks_file.read_text() == snapshot
+    assert read_journal(db) == [{"op": "upsert", "task": sample_task.model_dump(mode="json")}]
+    assert [task.id for task in db.read_tasks()] == ["1", "2", "task-1"]
+
+def test_journal_replays_updates_in_place(journal_database):
+    db = journal_database
+    task = db.read_tasks()[0].model_copy(update={"status": StatusEnum.completed})
+
+    db.write_tasks([task])
+
+    tasks = db.read_tasks()
+    assert [task.id for task in tasks] == ["1", "2"]
+    assert tasks[0].status == StatusEnum.completed
+
+def test_journal_archive(journal_database):
+    db = journal_database
+    db.archive_task("1")
+
+    assert read_journal(db) == [{"op": "archive", "id": "1"}]
+    assert [task.id for task in db.read_tasks()] == ["2"]
+    assert [task.id for task in db.read_tasks("archived_tasks")] == ["1"]
+
+def test_journal_ignores_torn_last_line(journal_database, sample_task):
+    db = journal_database
+    db.write_tasks([sample_task])
+    with open(journal_file(db), "a") as f:
+        f.write('{"op": "upsert", "task": {"id": "bro')
+
+    assert [task.id for task in db.read_tasks()] == ["1", "2", "task-1"]
+
+def test_compact(journal_database, sample_task):
+    db = journal_database
+    db.write_tasks([sample_task])
+    db.archive_task("1")
+
+    db.compact()
+    db.compact("archived_tasks")
+
+    assert not journal_file(db).exists()
+    assert not journal_file(db, "archived_tasks").exists()
+    with open(db.tasks_file, "r", encoding='utf-8') as f:
+        assert [task["id"] for task in json.load(f)] == ["2", "task-1"]
+    with open(db.archived_tasks_file, "r", encoding='utf-8') as f:
+        assert [task["id"] for task in json.load(f)] == ["1"]
+
+def test_journal_compacts_past_threshold(journal_database, sample_task):
+    db = journal_database
+    db.journal_max_entries = 2
+    db.write_tasks([sample_task])
+    db.write_tasks([sample_task.model_copy(update={"id": "task-2"})])
+
+    for thread in threading.enumerate():
+        if thread.name.startswith("ramon-compact-"):
+            thread.join()
+
+    assert not journal_file(db).exists()
+    with open(db.tasks_file, "r", encoding='utf-8') as f:
+        assert [task["id"] for task in json.load(f)] == ["1", "2", "task-1", "task-2"]
+
+def test_full_write_folds_existing_journal(journal_database, sample_task):
+    db = journal_database
+    db.write_tasks([sample_task])
+    db.journal = False
+
+    db.write_tasks([sample_task.model_copy(update={"id": "task-2"})])
+
+    assert not journal_file(db).exists()
+    assert [task.id for task in db.read_tasks()] == ["1", "2", "task-1", "task-2"]
+
+
+# Cache Tests
+def test_read_tasks_is_cached(setup_database):
+    db = setup_database
+    first = db.read_tasks()
+    second = db.read_tasks()
+    assert first == second
+    assert db.cache_info() == (1, 1)
+
+def test_cache_survives_own_writes(setup_database, sample_task):
+    db = setup_database
+    db.read_tasks()
+    db.write_tasks([sample_task])
+    db.archive_task("1")
+
+    assert [task.id for task in db.read_tasks()] == ["2", "task-1"]
+    assert [task.id for task in db.read_tasks("archived_tasks")] == ["1"]
+    assert db.cache_info().misses == 2  # one parse per file
+
+def test_cache_survives_own_journal_writes(journal_database, sample_task):
+    db = journal_database
+    db.read_tasks()
+    db.write_tasks([sample_task])
+    db.archive_task("1")
+
+    assert [task.id for task in db.read_tasks()] == ["2", "task-1"]
+    assert db.cache_info().misses == 1  # archiving only appends to archived_tasks
+
+def test_cache_invalidated_by_external_change(setup_database, sample_task):
+    db = setup_database
+    db.read_tasks()
+
+    other = Database(tasks_file=db.tasks_file, archived_tasks_file=db.archived_tasks_file)
+    other.write_tasks([sample_task])
+
+    assert [task.id for task in db.read_tasks()] == ["1", "2", "task-1"]
+    assert db.cache_info() == (0, 2)
+
+def test_cached_tasks_are_not_shared_with_callers(setup_database):
+    db = setup_database
+    db.read_tasks().clear()
+    assert len(db.read_tasks()) == 2
+
+
+# Index Tests
+def test_task_index_query():
+    index = TaskIndex([
+        make_task("a", owner="Alice", due_date="2024-01-10"),
+        make_task("b", owner="Bob", due_date="2024-01-05", status=StatusEnum.blocked),
+        make_task("c", owner="Alice", due_date="2024-02-01", status=StatusEnum.in_progress),
+        make_task("d", owner="Alice", due_date=""),
+    ])
+    assert index.get("b").owner == "Bob"
+    assert index.get("missing") is None
+    assert [task.id for task in index.query()] == ["a", "b", "c", "d"]
+    assert [task.id for task in index.query(owner="Alice")] == ["a", "c", "d"]
+    assert [task.id for task in index.query(status=["blocked", StatusEnum.in_progress])] == ["b", "c"]
+    assert [task.id for task in index.query(due_before="2024-01-31")] == ["a", "b"]
+    assert [task.id for task in index.query(status=["to_do"], owner="Alice", due_before="2024-12-31")] == ["a"]
+    assert index.query(status=["not-a-status"]) == []
+
+def test_task_index_maintained_on_upsert_and_remove():
+    index = TaskIndex([make_task("a"), make_task("b")])
+    index.upsert([make_task("a", status=StatusEnum.completed, owner="Bob", due_date="2023-01-01")])
+    index.remove("b")
+
+    assert [task.id for task in index.query(status=["completed"])] == ["a"]
+    assert index.query(status=["to_do"]) == []
+    assert index.query(owner="User") == []
+    assert [task.id for task in index.query(due_before="2024-01-01")] == ["a"]
+    assert len(index) == 1
+
+def test_task_index_built_in_bulk_keeps_last_duplicate():
+    index = TaskIndex([make_task("b", due_date="2024-02-01"), make_task("a"), make_task("b", owner="Bob", due_date="")])
+
+    assert [task.id for task in index.query()] == ["b", "a"]
+    assert [task.id for task in index.query(owner="Bob")] == ["b"]
+    assert index.query(owner="User", due_before="2024-12-31") == [index.get("a")]
+
+def test_snapshot_writes_update_the_warm_index(setup_database, sample_task):
+    db = setup_database
+    index = db._load("tasks")
+    db.write_tasks([sample_task.model_copy(update={"status": StatusEnum.blocked})])
+    db.archive_task("1")
+
+    assert db._load("tasks") is index  # changed in place, not rebuilt
+    assert [task.id for task in db.query(status=["blocked"])] == ["task-1"]
+    assert db.get("1") is None
+
+def test_database_get_and_query(setup_database, sample_task):
+    db = setup_database
+    db.write_tasks([sample_task.model_copy(update={"owner": "test-user"})])
+
+    assert db.get("task-1").task == "Test task"
+    assert db.get("missing") is None
+    assert [task.id for task in db.query(status=["to_do"])] == ["1", "task-1"]
+    assert [task.id for task in db.query(owner="test-user")] == ["task-1"]
+    assert [task.id for task in db.query(due_before="2024-01-01")] == ["1", "2"]
+
+def test_journal_writes_keep_indexes_current(journal_database, sample_task):
+    db = journal_database
+    db.query()
+    db.write_tasks([sample_task.model_copy(update={"status": StatusEnum.blocked})])
+    db.archive_task("1")
+
+    assert [task.id for task in db.query(status=["blocked"])] == ["task-1"]
+    assert db.get("1") is None
+    assert db.cache_info().misses == 1
+
+
+# Bulk Archive Tests
+def test_archive_tasks_by_predicate(setup_database):
+    db = setup_database
+    archived = db.archive_tasks(lambda task: task.status == "completed")
+
+    assert [task.id for task in archived] == ["2"]
+    assert [task.id for task in db.read_tasks()] == ["1"]
+    assert [task.id for task in db.read_tasks("archived_tasks")] == ["2"]
+
+def test_archive_tasks_by_ids(setup_database, sample_task):
+    db = setup_database
+    db.write_tasks([sample_task])
+    archived = db.archive_tasks(["task-1", "1", "missing", "1"])
+
+    assert [task.id for task in archived] == ["task-1", "1"]
+    assert [task.id for task in db.read_tasks()] == ["2"]
+    assert {task.id for task in db.read_tasks("archived_tasks")} == {"1", "task-1"}
+    assert not db.tasks_file.with_name(".archive-pending.json").exists()
+
+def test_archive_tasks_journal(journal_database):
+    db = journal_database
+    db.archive_tasks(["1", "2"])
+
+    assert db.read_tasks() == []
+    assert [task.id for task in db.read_tasks("archived_tasks")] == ["1", "2"]
+
+def test_interrupted_archive_is_completed_on_next_load(setup_database):
+    db = setup_database
+    task = db.get("1")
+    # Simulate a crash after the archive was written but before tasks.json was
+    db.write_tasks([task], "archived_tasks")
+    db.tasks_file.with_name(".archive-pending.json").write_text(
+        json.dumps({"db": "tasks", "tasks": [task.model_dump(mode="json")]})
+    )
+
+    restarted = Database(tasks_file=db.tasks_file, archived_tasks_file=db.archived_tasks_file)
+    assert [task.id for task in restarted.read_tasks()] == ["2"]
+    assert [task.id for task in restarted.read_tasks("archived_tasks")] == ["1"]
+    assert not db.tasks_file.with_name(".archive-pending.json").exists()
+
+
+# Codec Tests
+def test_encode_tasks_matches_legacy_format(sample_task):
+    legacy = json.dumps([sample_task.model_dump()], ensure_ascii=False, indent=4)
+    assert encode_tasks([sample_task]).decode() == legacy
+
+def test_decode_tasks_round_trip(sample_task):
+    assert decode_tasks(encode_tasks([sample_task], indent=None)) == [sample_task]
+
+def test_decode_tasks_validates():
+    with pytest.raises(ValidationError):
+        decode_tasks(b'[{"id": "1"}]')
+
+def test_compact_json(setup_database, sample_task):
+    db = setup_database
+    db.compact_json = True
+    db.write_tasks([sample_task])
+
+    assert "\n" not in db.tasks_file.read_text()
+    reopened = Database(tasks_file=db.tasks_file, archived_tasks_file=db.archived_tasks_file)
+    assert [task.id for task in reopened.read_tasks()] == ["1", "2", "task-1"]
+
+
+# Streaming Tests
+@pytest.fixture
+def streaming_database(setup_database):
+    setup_database.stream_min_bytes = 0
+    return setup_database
+
+def test_iter_json_array(tmp_path):
+    path = tmp_path / "items.json"
+    items = [{"id": str(i), "text": "é" * i} for i in range(50)]
+    path.write_text(json.dumps(items, ensure_ascii=False, indent=4), encoding="utf-8")
+    assert list(iter_json_array(path, chunk_size=7)) == items
+
+    path.write_text(" [ ] ")
+    assert list(iter_json_array(path)) == []
+
+    path.write_text('[{"id": "1"}, {"id"')
+    with pytest.raises(ValueError):
+        list(iter_json_array(path))
+
+def test_iter_tasks_streams_with_filters(streaming_database):
+    db = streaming_database
+    tasks = list(db.iter_tasks(status=["completed"]))
+    assert [task.id for task in tasks] == ["2"]
+    assert isinstance(tasks[0], Task)
+    assert db.cache_info() == (0, 0)  # nothing was loaded whole
+
+def test_iter_tasks_fields(streaming_database):
+    db = streaming_database
+    assert list(db.iter_tasks(fields=["id", "status"])) == [
+        {"id": "1", "status": "to_do"},
+        {"id": "2", "status": "completed"},
+    ]
+    db.stream_min_bytes = 1 << 30
+    assert list(db.iter_tasks(owner="User", fields=["id", "status"])) == [
+        {"id": "1", "status": "to_do"},
+        {"id": "2", "status": "completed"},
+    ]
+
+def test_iter_tasks_uses_warm_cache(streaming_database):
+    db = streaming_database
+    db.read_tasks()
+    assert [task.id for task in db.iter_tasks()] == ["1", "2"]
+    assert db.cache_info() == (1, 1)
+
+def test_iter_tasks_applies_journal(streaming_database, sample_task):
+    db = streaming_database
+    db.journal = True
+    db.write_tasks([sample_task, db.get("1").model_copy(update={"owner": "Bob"})])
+    db.archive_tasks(["2"])
+    db.write_tasks([db.get("2", "archived_tasks")])  # "2" comes back, at the end
+
+    cold = Database(tasks_file=db.tasks_file, archived_tasks_file=db.archived_tasks_file, stream_min_bytes=0)
+    assert [(task.id, task.owner) for task in cold.iter_tasks()] == [
+        ("1", "Bob"), ("task-1", "test-user"), ("2", "User")
+    ]
+    assert cold.cache_info() == (0, 0)
+    assert [task.id for task in cold.read_tasks()] == ["1", "task-1", "2"]
+
+# Summary Tests
+def test_task_columns_due():
+    columns = TaskColumns([make_task("a", due_date="2024-03-20"), make_task("b", due_date=""), make_task("c", due_date="next week")])
+    assert list(columns.due) == [date(2024, 3, 20).toordinal(), 0, 0]
+
+def test_task_columns_where():
+    columns = TaskColumns([
+        make_task("a", owner="Alice", due_date="2024-01-10"),
+        make_task("b", owner="Bob", due_date="2024-01-05", status=StatusEnum.blocked),
+        make_task("c", owner="Alice", due_date="2024-02-01", status=StatusEnum.in_progress),
+        {"id": "d", "task": "Task d", "owner": "Alice", "status": "to_do", "due_date": ""},
+    ])
+    assert len(columns) == 4
+    assert list(columns.due) == [date(2024, 1, 10).toordinal(), date(2024, 1, 5).toordinal(), date(2024, 2, 1).toordinal(), 0]
+    assert columns.where() == [0, 1, 2, 3]
+    assert columns.where(status=["to_do"]) == [0, 3]
+    assert columns.where(owner="Alice", due_after=date(2024, 1, 10)) == [2]
+    assert columns.where(status=[StatusEnum.to_do], owner="Alice", due_after=date(2024, 1, 1)) == [0]
+
+def test_summarize_tasks():
+    tasks = [make_task("a", due_date="2024-01-10"), make_task("b", due_date="")]
+    assert summarize_tasks(tasks) == (
+        "- Task a (ID: a, Owner: User), due 2024-01-10\n"
+        "- Task b (ID: b, Owner: User), due \n"
+    )
+    assert summarize_tasks(TaskColumns(tasks)) == summarize_tasks(tasks)
+    assert summarize_tasks([]) == ""
+
+def test_summarize_tasks_smart():
+    tomorrow = date.today() + timedelta(days=1)
+    tasks = [
+        make_task("a", due_date=tomorrow.isoformat()),
+        make_task("b", due_date="2000-01-01"),
+        make_task("c", due_date=""),
+        make_task("d", status=StatusEnum.in_progress),
+        make_task("e", status=StatusEnum.completed, due_date=tomorrow.isoformat()),
+    ]
+    assert summarize_tasks(tasks, smart=True) == (
+        "Immediate Priorities:\n"
+        f"- Task a, due {tomorrow.strftime('%b %d, %Y')}\n"
+        "\nRecurring Reminders:\nNone currently scheduled.\n"
+        "\nContextual Relevance:\n"
+        "- Task d, ongoing task.\n"
+    )
+
+def test_database_columns(setup_database, sample_task):
+    db = setup_database
+    columns = db.columns()
+    assert columns.ids == ["1", "2"]
+    assert db.columns() is columns  # kept with the cached index
+    db.write_tasks([sample_task])
+    assert db.columns().ids == ["1", "2", "task-1"]
+    assert db.columns(status=["completed"]).ids == ["2"]
+
+    db.stream_min_bytes = 0
+    db._cache.clear()
+    assert db.columns(status=["to_do"]).ids == ["1", "task-1"]
+    assert db.cache_info().misses == 1
@@ -0,0 +1,129 @@
+import pytest
+import json
+from datetime import date
+from ramon.models import Database
+from ramon.repositories.partitioned_archive import PartitionedArchive
+from tests.conftest import make_task
+
+@pytest.fixture
+def archive(tmp_path):
+    return PartitionedArchive(tmp_path / "archived_tasks")
+
+@pytest.fixture
+def partitioned_database(tmp_path):
+    tasks_file = tmp_path / "tasks.json"
+    tasks_file.write_text(json.dumps([make_task("1").model_dump(), make_task("2").model_dump()]))
+    return Database(
+        tasks_file=tasks_file,
+        archived_tasks_file=tmp_path / "archived_tasks.json",
+        archived_tasks_dir=tmp_path / "archived_tasks",
+        partitioned_archive=True
+    )
+
+def test_append_writes_current_month_partition(archive):
+    archive.append([make_task("1")])
+    archive.append([make_task("2")])
+
+    month = date.today().strftime("%Y-%m")
+    assert archive.partitions() == [{"name": month, "file": f"{month}.json", "count": 2}]
+    assert [task.id for task in archive.load()] == ["1", "2"]
+
+def test_append_only_touches_its_partition(archive):
+    archive.append([make_task("1")], month="2024-01")
+    old_partition = archive.directory / "2024-01.json"
+    mtime = old_partition.stat().st_mtime_ns
+
+    archive.append([make_task("2")], month="2024-02")
+
+    assert old_partition.stat().st_mtime_ns == mtime
+    assert [partition["name"] for partition in archive.partitions()] == ["2024-01", "2024-02"]
+
+def test_load_since_skips_older_partitions(archive):
+    archive.append([make_task("1")], month="2024-01")
+    archive.append([make_task("2")], month="2024-02")
+    archive.append([make_task("3")], month="2024-03")
+    (archive.directory / "2024-01.json").write_text("not json")  # never read
+
+    assert [task.id for task in archive.load(since="2024-02-15")] == ["2", "3"]
+
+def test_upsert_updates_in_place(archive):
+    archive.append([make_task("1")], month="2024-01")
+    archive.upsert([make_task("1").model_copy(update={"owner": "Bob"}), make_task("2")])
+
+    assert archive.partitions()[0] == {"name": "2024-01", "file": "2024-01.json", "count": 1}
+    assert [(task.id, task.owner) for task in archive.load()] == [("1", "Bob"), ("2", "User")]
+
+def test_upsert_only_reads_the_partitions_holding_the_tasks(archive, monkeypatch):
+    for month in range(1, 13):
+        archive.append([make_task(str(month))], month=f"2023-{month:02d}")
+    read = []
+    load_partition = archive._load_partition
+    monkeypatch.setattr(archive, "_load_partition", lambda name: read.append(name) or load_partition(name))
+
+    archive.upsert([make_task("3").model_copy(update={"owner": "Bob"}), make_task("13")])
+
+    assert read == ["2023-03"]  # "13" starts the current month's partition
+    assert [task.owner for task in archive.load() if task.id == "3"] == ["Bob"]
+    assert [partition["count"] for partition in archive.partitions()] == [1] * 13
+
+def test_upsert_reads_ids_missing_from_an_older_manifest(archive):
+    archive.append([make_task("1")], month="2024-01")
+    manifest = json.loads(archive.manifest_file.read_text())
+    archive.manifest_file.write_text(json.dumps({"partitions": manifest["partitions"]}))
+
+    archive.upsert([make_task("1").model_copy(update={"owner": "Bob"})])
+
+    assert [partition["name"] for partition in archive.partitions()] == ["2024-01"]
+    assert json.loads(archive.manifest_file.read_text())["ids"] == {"1": "2024-01"}
+
+def test_import_tasks_by_completion_month(archive):
+    archive.import_tasks([
+        make_task("1", completed_at="2024-05-02T10:00:00"),
+        make_task("2", due_date="2024-04-30"),
+        make_task("3", due_date=""),
+    ])
+    assert [partition["name"] for partition in archive.partitions()] == ["0000-00", "2024-04", "2024-05"]
+
+def test_database_archives_into_partitions(partitioned_database):
+    db = partitioned_database
+    db.archive_tasks(["1"])
+
+    assert [task.id for task in db.read_tasks()] == ["2"]
+    assert [task.id for task in db.read_tasks("archived_tasks")] == ["1"]
+    assert json.loads(db.archived_tasks_file.read_text()) == []
+    assert [task.id for task in db.query("archived_tasks", since=date.today().isoformat())] == ["1"]
+    assert db.query("archived_tasks", since="2999-01-01") == []
+
+def test_archiving_again_replaces_the_older_copy(partitioned_database):
+    db = partitioned_database
+    archive = PartitionedArchive(db.archived_tasks_dir)
+    archive.append([make_task("1")], month="2024-01")
+    db.archive_tasks(["1"])
+
+    assert [task.id for task in db.read_tasks("archived_tasks")] == ["1"]
+    assert [partition["name"] for partition in archive.partitions()] == ["2024-01"]
+
+def test_interrupted_archive_completed_in_a_later_month(partitioned_database):
+    db = partitioned_database
+    task = db.get("1")
+    # Crashed last month after writing the archive, before tasks.json
+    PartitionedArchive(db.archived_tasks_dir).append([task], month="2024-01")
+    db.tasks_file.with_name(".archive-pending.json").write_text(
+        json.dumps({"db": "tasks", "tasks": [task.model_dump(mode="json")]})
+    )
+
+    restarted = Database(
+        tasks_file=db.tasks_file, archived_tasks_file=db.archived_tasks_file,
+        archived_tasks_dir=db.archived_tasks_dir, partitioned_archive=True,
+    )
+    assert [task.id for task in restarted.read_tasks()] == ["2"]
+    assert [task.id for task in restarted.read_tasks("archived_tasks")] == ["1"]
+    assert [partition["name"] for partition in PartitionedArchive(db.archived_tasks_dir).partitions()] == ["2024-01"]
+
+def test_partition_archive(partitioned_database):
+    db = partitioned_database
+    db.archived_tasks_file.write_text(json.dumps([make_task("9", completed_at="2024-02-01").model_dump()]))
+
+    assert db.partition_archive() == 1
+    assert [task.id for task in db.read_tasks("archived_tasks")] == ["9"]
+    assert [task.id for task in db.query("archived_tasks", since="2024-02-01")] == ["9"]
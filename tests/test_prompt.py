@@ -0,0 +1,67 @@
+import pytest
+from datetime import date
+from ramon.models import Database, StatusEnum, TaskColumns
+from ramon.prompt import TaskPromptBuilder, estimate_tokens, render_tasks
+from tests.conftest import make_task
+
+TODAY = date(2024, 3, 20)
+
+TASKS = [
+    make_task("later", due_date="2024-05-01"),
+    make_task("done", status=StatusEnum.completed, due_date="2024-03-01"),
+    make_task("soon", due_date="2024-03-22"),
+    make_task("undated", due_date=""),
+    make_task("late", status=StatusEnum.blocked, due_date="2024-03-10"),
+    make_task("ongoing", status=StatusEnum.in_progress, due_date=""),
+]
+
+def test_render_tasks_by_priority():
+    assert render_tasks(TaskColumns(TASKS), 1000, TODAY) == (
+        "In progress:\n- Task ongoing (ID: ongoing, Owner: User), due \n"
+        "Overdue:\n- Task late (ID: late, Owner: User), due 2024-03-10\n"
+        "Due soon:\n- Task soon (ID: soon, Owner: User), due 2024-03-22\n"
+        "Other open tasks:\n"
+        "- Task later (ID: later, Owner: User), due 2024-05-01\n"
+        "- Task undated (ID: undated, Owner: User), due \n"
+        "Completed or canceled:\n- Task done (ID: done, Owner: User), due 2024-03-01\n"
+    )
+
+def test_render_tasks_within_budget():
+    tasks = TASKS + [make_task(f"bulk-{i}", due_date="2024-06-01") for i in range(10_000)]
+
+    text = render_tasks(TaskColumns(tasks), 100, TODAY)
+
+    assert estimate_tokens(text) <= 100 + 30  # the "not shown" line comes on top
+    assert text.startswith("In progress:\n- Task ongoing")
+    assert "Task late" in text and "Task done" not in text
+    assert text.endswith("use search_tasks or get_tasks to look them up.\n")
+    shown = text.count("\n- ")
+    assert f"Not shown: {len(tasks) - shown} more tasks (" in text
+    assert "1 completed" in text
+
+def test_builder_renders_once_per_db_version(tmp_path):
+    db = Database(tasks_file=tmp_path / "tasks.json", archived_tasks_file=tmp_path / "archived_tasks.json")
+    db.write_tasks(TASKS)
+    builder = TaskPromptBuilder(budget_tokens=1000)
+
+    first = builder.render(db, TODAY)
+    assert builder.render(db, TODAY) is first
+    assert builder.builds == 1
+
+    db.write_tasks([make_task("new", status=StatusEnum.in_progress, due_date="")])
+    assert "Task new" in builder.render(db, TODAY)
+    assert builder.render(db, date(2024, 3, 21)) and builder.builds == 3
+
+@pytest.mark.parametrize("engine", ["json", "sqlite"])
+def test_data_version_changes_on_write(tmp_path, engine):
+    db = Database(
+        tasks_file=tmp_path / "tasks.json",
+        archived_tasks_file=tmp_path / "archived_tasks.json",
+        sqlite_file=tmp_path / "tasks.db",
+        engine=engine,
+    )
+    db.write_tasks(TASKS[:1])
+    version = db.data_version()
+    assert db.data_version() == version
+    db.write_tasks(TASKS[1:2])
+    assert db.data_version() != version
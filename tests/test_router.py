@@ -0,0 +1,74 @@
+import pytest
+from ramon.models import Database, StatusEnum, summarize_tasks
+from ramon.router import INTENTS, IntentRouter, RouterStats
+from tests.conftest import make_task
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(tasks_file=tmp_path / "tasks.json", archived_tasks_file=tmp_path / "archived_tasks.json")
+    db.write_tasks([
+        make_task("aB1", task="Write report"),
+        make_task("cD2", task="Review PR", status=StatusEnum.in_progress),
+        make_task("eF3", task="Call vendor"),
+        make_task("gH4", task="Call vendor"),
+        make_task("iJ5", task="Ship release", status=StatusEnum.completed),
+    ])
+    return db
+
+def test_formulaic_prompts_are_answered_locally(db):
+    router = IntentRouter(INTENTS)
+
+    work_on = router.route("  What do I need to work on?", db)
+    summary = router.route("show me a summary", db)
+    archived = router.route("Archive completed tasks.", db)
+
+    assert work_on.intent == "work_on"
+    assert work_on.reply == summarize_tasks(db.columns(status=["to_do", "in_progress"]), smart=True)
+    assert summary.intent == "summary" and "Write report" in summary.reply
+    assert archived.reply == "Archived 1 completed tasks."
+    assert db.get("iJ5") is None
+    assert [m.content for m in work_on.messages("What do I need to work on?")] == [
+        "What do I need to work on?", work_on.reply
+    ]
+
+def test_mark_complete_by_id_or_unique_title(db):
+    router = IntentRouter(INTENTS)
+
+    by_id = router.route("mark aB1 as done", db)
+    by_title = router.route("Mark 'review pr' complete", db)
+
+    assert by_id.reply == "Marked 'Write report' (ID: aB1) as completed."
+    assert by_title.reply == "Marked 'Review PR' (ID: cD2) as completed."
+    assert db.get("aB1").status == db.get("cD2").status == StatusEnum.completed
+    assert db.get("aB1").completed_at
+
+def test_ambiguous_prompts_go_to_the_agent(db):
+    router = IntentRouter(INTENTS)
+
+    assert router.route("mark call vendor as done", db) is None  # two tasks with that title
+    assert router.route("mark nothing like this as done", db) is None
+    assert router.route("What do I need to work on after lunch, and why?", db) is None
+    assert db.get("eF3").status == db.get("gH4").status == StatusEnum.to_do
+    assert router.stats().misses == 3
+
+def test_intents_are_configurable(db, monkeypatch):
+    monkeypatch.setenv("RAMON_ROUTER_INTENTS", "summary, work_on")
+    assert [intent.name for intent in IntentRouter().intents] == ["work_on", "summary"]
+    assert IntentRouter().route("Archive completed tasks", db) is None
+
+    monkeypatch.setenv("RAMON_ROUTER_INTENTS", "none")
+    assert IntentRouter().route("summary", db) is None
+
+def test_stats_estimate_the_time_saved(db):
+    router = IntentRouter(INTENTS)
+    router.route("summary", db)
+    router.route("summary", db)
+    router.route("Plan my week", db)
+    router.record_agent_turn(3.0)
+
+    stats = router.stats()
+
+    assert (stats.hits, stats.misses) == (2, 1)
+    assert stats.hit_rate == pytest.approx(2 / 3)
+    assert 5.9 < stats.saved_seconds < 6.0
+    assert RouterStats(1, 0, 0.01, 0.0).saved_seconds == 0.0  # nothing to compare with yet
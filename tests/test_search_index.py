@@ -0,0 +1,80 @@
+import pytest
+from ramon.models import Database, StatusEnum
+from ramon.repositories.search_index import SearchIndex
+from tests.conftest import make_task
+
+TASKS = [
+    make_task("a", task="Budget proposal", description="Numbers for Q3 budget"),
+    make_task("b", task="Team offsite", description="Book a venue, check the budget"),
+    make_task("c", task="Release notes", description="Draft the notes", status=StatusEnum.completed, owner="bob"),
+    make_task("d", task="Proposal review", description="Review the hiring proposal"),
+]
+
+@pytest.fixture(params=["json", "journal", "sqlite"])
+def db(request, tmp_path):
+    db = Database(
+        tasks_file=tmp_path / "tasks.json", archived_tasks_file=tmp_path / "archived_tasks.json",
+        sqlite_file=tmp_path / "tasks.db", engine="sqlite" if request.param == "sqlite" else "json",
+        journal=request.param == "journal",
+    )
+    db.write_tasks(TASKS)
+    return db
+
+def test_ranks_matches_and_filters(db):
+    hits = db.search("budget proposal")
+
+    assert [hit["id"] for hit in hits] == ["a", "d", "b"]
+    assert hits[0] == {
+        "id": "a", "task": "Budget proposal", "owner": "User", "status": "to_do", "due_date": "2024-03-20",
+        "score": hits[0]["score"],
+    }
+    assert hits[0]["score"] > hits[1]["score"] > hits[2]["score"] > 0
+    assert [hit["id"] for hit in db.search("Bob", status=["completed"])] == ["c"]
+    assert db.search("notes", status=["to_do"]) == []
+    assert len(db.search("budget proposal", limit=1)) == 1
+    assert db.search("nothing like it") == []
+
+def test_follows_our_writes(db):
+    db.search("budget")
+    db.write_tasks([make_task("a", task="Holiday plan"), make_task("e", task="Budget approval")])
+    db.archive_task("b")
+
+    assert [hit["id"] for hit in db.search("budget")] == ["e"]
+    assert [hit["id"] for hit in db.search("holiday")] == ["a"]
+    assert SearchIndex.load(db.tasks_file.with_suffix(".search.json")).version == db.data_version()
+
+def test_writes_are_saved_by_the_next_search(db):
+    db.search("budget")
+    path = db.tasks_file.with_suffix(".search.json")
+    saved = path.stat().st_mtime_ns
+    db.write_tasks([make_task("e", task="Budget approval")])
+    db.archive_task("a")
+
+    assert path.stat().st_mtime_ns == saved
+    assert [hit["id"] for hit in db.search("budget")] == ["e", "b"]
+    assert SearchIndex.load(path).version == db.data_version()
+    assert not db._search["tasks"].dirty
+
+def test_persisted_and_caught_up_across_processes(db, tmp_path):
+    db.search("budget")
+    other = Database(
+        tasks_file=db.tasks_file, archived_tasks_file=db.archived_tasks_file,
+        sqlite_file=db.sqlite_file, engine=db.engine, journal=db.journal,
+    )
+    other.write_tasks([make_task("b", task="Team offsite", description="Venue only")])
+    index = SearchIndex.load(db.tasks_file.with_suffix(".search.json"))
+
+    assert len(index) == 4  # saved by the first search, before the other write
+    assert [hit["id"] for hit in db.search("budget")] == ["a"]
+    # Only the changed task was indexed again
+    assert index.sync(other.iter_tasks(fields=SearchIndex.FIELDS)) == 1
+
+def test_index_file_is_reused_when_current(tmp_path, monkeypatch):
+    db = Database(tasks_file=tmp_path / "tasks.json", archived_tasks_file=tmp_path / "archived_tasks.json")
+    db.write_tasks(TASKS)
+    db.search("budget")
+    fresh = Database(tasks_file=db.tasks_file, archived_tasks_file=db.archived_tasks_file)
+    monkeypatch.setattr(fresh, "iter_tasks", lambda *args, **kwargs: pytest.fail("the tasks were read"))
+
+    assert [hit["id"] for hit in fresh.search("budget")] == ["a", "b"]
+    assert fresh.cache_info().misses == 0
@@ -0,0 +1,98 @@
+import pytest
+import json
+import sqlite3
+from ramon.models import Database, StatusEnum
+from ramon.repositories.sqlite_task_repository import SqliteTaskRepository
+from tests.conftest import make_task
+
+@pytest.fixture
+def sqlite_database(tmp_path):
+    return Database(
+        tasks_file=tmp_path / "tasks.json",
+        archived_tasks_file=tmp_path / "archived_tasks.json",
+        sqlite_file=tmp_path / "tasks.db",
+        engine="sqlite"
+    )
+
+def test_write_and_read_tasks(sqlite_database):
+    sqlite_database.write_tasks([make_task("1"), make_task("2")])
+    tasks = sqlite_database.read_tasks()
+    assert [task.id for task in tasks] == ["1", "2"]
+    assert tasks[0] == make_task("1")
+
+def test_upsert_keeps_insertion_order(sqlite_database):
+    sqlite_database.write_tasks([make_task("1"), make_task("2")])
+    sqlite_database.write_tasks([make_task("1", status=StatusEnum.completed), make_task("3")])
+    tasks = sqlite_database.read_tasks()
+    assert [task.id for task in tasks] == ["1", "2", "3"]
+    assert tasks[0].status == StatusEnum.completed
+
+def test_read_tasks_filters_by_status(sqlite_database):
+    sqlite_database.write_tasks([make_task("1"), make_task("2", status=StatusEnum.blocked)])
+    tasks = sqlite_database.read_tasks(status=["blocked"])
+    assert [task.id for task in tasks] == ["2"]
+
+def test_query(tmp_path):
+    repository = SqliteTaskRepository(tmp_path / "tasks.db")
+    repository.write_tasks([
+        make_task("1", owner="Alice", due_date="2024-01-10"),
+        make_task("2", owner="Bob", due_date="2024-01-05"),
+        make_task("3", owner="Alice", due_date="2024-02-01", status=StatusEnum.in_progress),
+        make_task("4", owner="Alice", due_date=""),
+    ])
+    assert [task.id for task in repository.query(owner="Alice")] == ["1", "3", "4"]
+    assert [task.id for task in repository.query(due_before="2024-01-31")] == ["1", "2"]
+    assert [task.id for task in repository.query(status=[StatusEnum.in_progress], owner="Alice")] == ["3"]
+
+def test_indexes_exist(sqlite_database):
+    sqlite_database.read_tasks()
+    with sqlite3.connect(sqlite_database.sqlite_file) as conn:
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    for table in ("tasks", "archived_tasks"):
+        for column in ("status", "owner", "due_date"):
+            assert f"{table}_{column}_idx" in indexes
+
+def test_archive_task(sqlite_database):
+    sqlite_database.write_tasks([make_task("1"), make_task("2")])
+    sqlite_database.archive_task("1")
+    assert [task.id for task in sqlite_database.read_tasks()] == ["2"]
+    assert [task.id for task in sqlite_database.read_tasks("archived_tasks")] == ["1"]
+
+def test_archive_nonexistent_task(sqlite_database):
+    sqlite_database.write_tasks([make_task("1")])
+    sqlite_database.archive_task("nonexistent-id")
+    assert len(sqlite_database.read_tasks()) == 1
+    assert sqlite_database.read_tasks("archived_tasks") == []
+
+def test_unknown_db(sqlite_database):
+    with pytest.raises(ValueError):
+        sqlite_database.read_tasks("other")
+
+def test_migrate_to_sqlite(sqlite_database):
+    sqlite_database.tasks_file.write_text(json.dumps([make_task("1").model_dump(), make_task("2").model_dump()]))
+    sqlite_database.archived_tasks_file.write_text(json.dumps([make_task("3").model_dump()]))
+
+    assert sqlite_database.migrate_to_sqlite() == (2, 1)
+    assert [task.id for task in sqlite_database.read_tasks()] == ["1", "2"]
+    assert [task.id for task in sqlite_database.read_tasks("archived_tasks")] == ["3"]
+
+    # Migrating again replaces rather than duplicates
+    assert sqlite_database.migrate_to_sqlite() == (2, 1)
+    assert len(sqlite_database.read_tasks()) == 2
+
+def test_unknown_engine(tmp_path):
+    with pytest.raises(ValueError):
+        Database(tasks_file=tmp_path / "tasks.json", engine="mongo")
+
+def test_get(sqlite_database):
+    sqlite_database.write_tasks([make_task("1"), make_task("2")])
+    assert sqlite_database.get("2") == make_task("2")
+    assert sqlite_database.get("missing") is None
+
+def test_archive_tasks(sqlite_database):
+    sqlite_database.write_tasks([make_task("1"), make_task("2", status=StatusEnum.completed), make_task("3")])
+
+    assert [task.id for task in sqlite_database.archive_tasks(["3", "missing"])] == ["3"]
+    assert [task.id for task in sqlite_database.archive_tasks(lambda task: task.status == "completed")] == ["2"]
+    assert [task.id for task in sqlite_database.read_tasks()] == ["1"]
+    assert [task.id for task in sqlite_database.read_tasks("archived_tasks")] == ["3", "2"]
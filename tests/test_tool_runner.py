@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+import pytest
+from pydantic_ai import models
+from pydantic_ai.models.test import TestModel
+from ramon.agent import Deps, JiraClient, agent
+from ramon.models import Database
+from ramon.tool_runner import ToolRunner
+from tests.conftest import make_task
+
+pytestmark = pytest.mark.anyio
+models.ALLOW_MODEL_REQUESTS = False
+
+async def test_sync_and_async_calls_overlap_within_the_limit():
+    runner = ToolRunner(max_concurrency=3)
+    # Each call waits for two others to be running: fewer at a time would
+    # break the barrier, and `peak` catches more
+    barrier = threading.Barrier(3, timeout=5)
+    lock = threading.Lock()
+    running = peak = 0
+
+    def track(change: int):
+        nonlocal running, peak
+        with lock:
+            running += change
+            peak = max(peak, running)
+
+    def blocking():
+        track(1)
+        barrier.wait()
+        track(-1)
+
+    async def waiting():
+        track(1)
+        await asyncio.to_thread(barrier.wait)
+        track(-1)
+
+    await asyncio.gather(*(runner.run(blocking if i % 2 else waiting) for i in range(6)))
+
+    assert peak == 3
+
+async def test_writes_are_ordered_like_sequential_calls():
+    runner = ToolRunner()
+    log = []
+
+    def call(name: str, delay: float):
+        def run():
+            log.append(f"start {name}")
+            time.sleep(delay)
+            log.append(f"end {name}")
+        return run
+
+    await asyncio.gather(
+        runner.run(call("read 1", 0.05)),
+        runner.run(call("read 2", 0.02)),
+        runner.run(call("write 1", 0.01), writes=True),
+        runner.run(call("write 2", 0.01), writes=True),
+        runner.run(call("read 3", 0.01)),
+    )
+
+    assert log.index("start write 1") > max(log.index("end read 1"), log.index("end read 2"))
+    assert log.index("start write 2") > log.index("end write 1")
+    assert log.index("start read 3") > log.index("end write 2")
+
+async def test_a_turn_runs_its_reads_concurrently(tmp_path, monkeypatch):
+    db = Database(tasks_file=tmp_path / "tasks.json", archived_tasks_file=tmp_path / "archived_tasks.json")
+    db.write_tasks([make_task("a")])
+    get = db.get
+    log = []
+    get_started, statuses_started = threading.Event(), threading.Event()
+
+    # Each read waits until the other one started, which only happens if they overlap
+    def waiting_get(*args, **kwargs):
+        log.append("start get")
+        get_started.set()
+        statuses_started.wait(timeout=5)
+        log.append("end get")
+        return get(*args, **kwargs)
+
+    async def waiting_statuses(task_keys):
+        log.append("start statuses")
+        statuses_started.set()
+        await asyncio.to_thread(get_started.wait, timeout=5)
+        log.append("end statuses")
+        return {key: "Done" for key in task_keys}
+
+    monkeypatch.setattr(db, "get", waiting_get)
+    jira = JiraClient()
+    monkeypatch.setattr(jira, "get_statuses", waiting_statuses)
+    started = []
+    deps = Deps(db, jira, on_tool=started.append)
+
+    with agent.override(model=TestModel(call_tools=["get_task_by_id", "get_jira_statuses", "current_date_time"])):
+        await agent.run("What's up?", deps=deps)
+
+    assert sorted(started) == ["current_date_time", "get_jira_statuses", "get_task_by_id"]
+    # Both reads started before either finished
+    assert sorted(log[:2]) == ["start get", "start statuses"]
+    assert sorted(log[2:]) == ["end get", "end statuses"]